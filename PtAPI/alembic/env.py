@@ -19,6 +19,13 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# Mesmo banco da aplicação: DATABASE_URL (.env) tem precedência sobre o alembic.ini
+from dotenv import load_dotenv
+
+load_dotenv()
+if os.getenv("DATABASE_URL"):
+    config.set_main_option("sqlalchemy.url", os.environ["DATABASE_URL"].replace("%", "%%"))
+
 # Importar Base e todos os modelos da nova estrutura
 from config.db import Base
 
@@ -27,6 +34,10 @@ from models.usuario import Usuario
 from models.cliente import Cliente, ClienteFisica, ClienteJuridica
 from models.socio import SocioRepresentante
 from models.contratos import Contratos, Imovel, Contratado
+from models.busca import BuscaDocumento, BuscaTrigrama
+from models.ocupacao import OcupacaoResumo
+from models.faturamento import Cobranca, FaturamentoExecucao
+from models.notificacao import Notificacao
 
 # Usar o metadata da Base que contém todos os modelos
 target_metadata = Base.metadata
@@ -0,0 +1,191 @@
+"""esquema inicial
+
+Revision ID: 1a0c5e7b3d29
+Revises:
+Create Date: 2026-10-17 02:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1a0c5e7b3d29'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Tabelas como eram antes das migrações seguintes (sem índices de busca, versões etc.)
+    op.create_table(
+        'usuarios',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('nome', sa.String(), nullable=False),
+        sa.Column('senha', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('cpf', sa.String(), nullable=False),
+        sa.Column('rg', sa.String(), nullable=False),
+        sa.Column('data_de_nascimento', sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_usuarios_id', 'usuarios', ['id'])
+    op.create_index('ix_usuarios_email', 'usuarios', ['email'], unique=True)
+    op.create_index('ix_usuarios_cpf', 'usuarios', ['cpf'], unique=True)
+    op.create_index('ix_usuarios_rg', 'usuarios', ['rg'], unique=True)
+
+    op.create_table(
+        'clientes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tipo', sa.String(length=50), nullable=False),
+        sa.Column('nome', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('status', sa.Unicode(length=255), nullable=False),
+        sa.Column('senha', sa.String(), nullable=False),
+        sa.Column('telefone', sa.String(), nullable=False),
+        sa.Column('endereco', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_clientes_email', 'clientes', ['email'], unique=True)
+
+    op.create_table(
+        'clientes_fisica',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('cpf', sa.String(), nullable=False),
+        sa.Column('rg', sa.String(), nullable=False),
+        sa.Column('data_de_nascimento', sa.Date(), nullable=False),
+        sa.ForeignKeyConstraint(['id'], ['clientes.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_clientes_fisica_cpf', 'clientes_fisica', ['cpf'], unique=True)
+    op.create_index('ix_clientes_fisica_rg', 'clientes_fisica', ['rg'], unique=True)
+
+    op.create_table(
+        'clientes_juridica',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('cnpj', sa.String(), nullable=False),
+        sa.Column('razao_social', sa.String(), nullable=False),
+        sa.Column('nome_fantasia', sa.String(), nullable=False),
+        sa.Column('inscricao_estadual', sa.String(), nullable=True),
+        sa.Column('endereco_comercial', sa.String(), nullable=False),
+        sa.Column('data_fundacao', sa.Date(), nullable=True),
+        sa.ForeignKeyConstraint(['id'], ['clientes.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_clientes_juridica_cnpj', 'clientes_juridica', ['cnpj'], unique=True)
+
+    op.create_table(
+        'socios_representantes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('empresa_id', sa.Integer(), nullable=False),
+        sa.Column('pessoa_fisica_id', sa.Integer(), nullable=False),
+        sa.Column('cargo', sa.Unicode(length=255), nullable=False),
+        sa.Column('data_admissao', sa.Date(), nullable=True),
+        sa.ForeignKeyConstraint(['empresa_id'], ['clientes_juridica.id']),
+        sa.ForeignKeyConstraint(['pessoa_fisica_id'], ['clientes_fisica.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    op.create_table(
+        'contratados',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('nome', sa.String(), nullable=False),
+        sa.Column('senha', sa.String(), nullable=False),
+        sa.Column('servico', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    op.create_table(
+        'contratos',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('cliente_id', sa.Integer(), nullable=False),
+        sa.Column('contratado_id', sa.Integer(), nullable=False),
+        sa.Column('detalhes', sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(['cliente_id'], ['clientes.id']),
+        sa.ForeignKeyConstraint(['contratado_id'], ['contratados.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    op.create_table(
+        'imoveis',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('rua', sa.String(), nullable=False),
+        sa.Column('numero', sa.String(), nullable=True),
+        sa.Column('complemento', sa.String(), nullable=True),
+        sa.Column('bairro', sa.String(), nullable=False),
+        sa.Column('municipio', sa.String(), nullable=False),
+        sa.Column('estado', sa.String(length=2), nullable=False),
+        sa.Column('cep', sa.String(), nullable=False),
+        sa.Column('area_total_m2', sa.Float(), nullable=False),
+        sa.Column('status_ocupacao', sa.Unicode(length=255), nullable=False),
+        sa.Column('cliente_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['cliente_id'], ['clientes.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    op.create_table(
+        'imovel_unidades',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('imovel_id', sa.Integer(), nullable=False),
+        sa.Column('nome_unidade', sa.String(), nullable=False),
+        sa.Column('area_m2', sa.Float(), nullable=False),
+        sa.Column('descricao', sa.Text(), nullable=True),
+        sa.Column('contrato_id', sa.Integer(), nullable=True),
+        sa.Column('status', sa.Unicode(length=255), nullable=False),
+        sa.ForeignKeyConstraint(['contrato_id'], ['contratos.id']),
+        sa.ForeignKeyConstraint(['imovel_id'], ['imoveis.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    op.create_table(
+        'registro_matriculas',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('imovel_id', sa.Integer(), nullable=False),
+        sa.Column('matricula', sa.String(), nullable=False),
+        sa.Column('cartorio', sa.String(), nullable=False),
+        sa.Column('cnm', sa.String(), nullable=True),
+        sa.Column('inscricao_municipal', sa.String(), nullable=True),
+        sa.Column('data_registro', sa.DateTime(), nullable=True),
+        sa.Column('atual', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['imovel_id'], ['imoveis.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    op.create_table(
+        'contas_servicos',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('imovel_id', sa.Integer(), nullable=False),
+        sa.Column('tipo', sa.Unicode(length=255), nullable=False),
+        sa.Column('numero_conta', sa.String(), nullable=False),
+        sa.Column('fornecedor', sa.String(), nullable=True),
+        sa.Column('status', sa.Unicode(length=255), nullable=False),
+        sa.Column('observacoes', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['imovel_id'], ['imoveis.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('contas_servicos')
+    op.drop_table('registro_matriculas')
+    op.drop_table('imovel_unidades')
+    op.drop_table('imoveis')
+    op.drop_table('contratos')
+    op.drop_table('contratados')
+    op.drop_table('socios_representantes')
+    op.drop_index('ix_clientes_juridica_cnpj', table_name='clientes_juridica')
+    op.drop_table('clientes_juridica')
+    op.drop_index('ix_clientes_fisica_rg', table_name='clientes_fisica')
+    op.drop_index('ix_clientes_fisica_cpf', table_name='clientes_fisica')
+    op.drop_table('clientes_fisica')
+    op.drop_index('ix_clientes_email', table_name='clientes')
+    op.drop_table('clientes')
+    op.drop_index('ix_usuarios_rg', table_name='usuarios')
+    op.drop_index('ix_usuarios_cpf', table_name='usuarios')
+    op.drop_index('ix_usuarios_email', table_name='usuarios')
+    op.drop_index('ix_usuarios_id', table_name='usuarios')
+    op.drop_table('usuarios')
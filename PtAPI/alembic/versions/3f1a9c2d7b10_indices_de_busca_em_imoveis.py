@@ -0,0 +1,46 @@
+"""indices de busca em imoveis
+
+Revision ID: 3f1a9c2d7b10
+Revises: 1a0c5e7b3d29
+Create Date: 2026-10-17 02:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1a9c2d7b10'
+down_revision: Union[str, Sequence[str], None] = '1a0c5e7b3d29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Filtros de GET /imoveis; o `id` no fim atende a paginação por cursor sem ordenação extra
+    op.create_index('ix_imoveis_cliente_id_id', 'imoveis', ['cliente_id', 'id'])
+    op.create_index('ix_imoveis_estado_municipio_bairro_id', 'imoveis', ['estado', 'municipio', 'bairro', 'id'])
+    op.create_index('ix_imoveis_status_ocupacao_id', 'imoveis', ['status_ocupacao', 'id'])
+    op.create_index('ix_imoveis_area_total_m2', 'imoveis', ['area_total_m2'])
+    # text_pattern_ops: permite LIKE 'prefixo%' usar o índice em qualquer collation
+    op.create_index('ix_imoveis_cep', 'imoveis', ['cep'], postgresql_ops={'cep': 'text_pattern_ops'})
+
+    # FKs das tabelas filhas (carregamento de relacionamentos por imovel_id)
+    op.create_index('ix_imovel_unidades_imovel_id', 'imovel_unidades', ['imovel_id'])
+    op.create_index('ix_registro_matriculas_imovel_id', 'registro_matriculas', ['imovel_id'])
+    op.create_index('ix_contas_servicos_imovel_id', 'contas_servicos', ['imovel_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contas_servicos_imovel_id', table_name='contas_servicos')
+    op.drop_index('ix_registro_matriculas_imovel_id', table_name='registro_matriculas')
+    op.drop_index('ix_imovel_unidades_imovel_id', table_name='imovel_unidades')
+    op.drop_index('ix_imoveis_cep', table_name='imoveis')
+    op.drop_index('ix_imoveis_area_total_m2', table_name='imoveis')
+    op.drop_index('ix_imoveis_status_ocupacao_id', table_name='imoveis')
+    op.drop_index('ix_imoveis_estado_municipio_bairro_id', table_name='imoveis')
+    op.drop_index('ix_imoveis_cliente_id_id', table_name='imoveis')
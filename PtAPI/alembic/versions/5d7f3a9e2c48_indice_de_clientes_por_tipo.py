@@ -0,0 +1,33 @@
+"""indice de clientes por tipo
+
+Revision ID: 5d7f3a9e2c48
+Revises: 8c4e2b6d1f35
+Create Date: 2026-10-17 03:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d7f3a9e2c48'
+down_revision: Union[str, Sequence[str], None] = '8c4e2b6d1f35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_clientes_tipo_id', 'clientes', ['tipo', 'id'])
+    # FKs de socios_representantes: carregamento de participacoes/socios em lote
+    op.create_index('ix_socios_representantes_empresa_id', 'socios_representantes', ['empresa_id'])
+    op.create_index('ix_socios_representantes_pessoa_fisica_id', 'socios_representantes', ['pessoa_fisica_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_socios_representantes_pessoa_fisica_id', table_name='socios_representantes')
+    op.drop_index('ix_socios_representantes_empresa_id', table_name='socios_representantes')
+    op.drop_index('ix_clientes_tipo_id', table_name='clientes')
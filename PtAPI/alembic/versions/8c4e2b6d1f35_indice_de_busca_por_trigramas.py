@@ -0,0 +1,46 @@
+"""indice de busca por trigramas
+
+Revision ID: 8c4e2b6d1f35
+Revises: 3f1a9c2d7b10
+Create Date: 2026-10-17 03:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4e2b6d1f35'
+down_revision: Union[str, Sequence[str], None] = '3f1a9c2d7b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Usadas pelo backend "tabela" de services/busca; popular com `python -m services.busca`
+    op.create_table(
+        'busca_documentos',
+        sa.Column('tipo', sa.String(length=20), nullable=False),
+        sa.Column('entidade_id', sa.Integer(), nullable=False),
+        sa.Column('rotulo', sa.String(), nullable=False),
+        sa.Column('texto', sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint('tipo', 'entidade_id'),
+    )
+    op.create_table(
+        'busca_trigramas',
+        sa.Column('trigrama', sa.String(length=3), nullable=False),
+        sa.Column('tipo', sa.String(length=20), nullable=False),
+        sa.Column('entidade_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('trigrama', 'tipo', 'entidade_id'),
+    )
+    op.create_index('ix_busca_trigramas_documento', 'busca_trigramas', ['tipo', 'entidade_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_busca_trigramas_documento', table_name='busca_trigramas')
+    op.drop_table('busca_trigramas')
+    op.drop_table('busca_documentos')
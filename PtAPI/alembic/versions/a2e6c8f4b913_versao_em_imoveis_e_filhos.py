@@ -0,0 +1,34 @@
+"""versao em imoveis e filhos
+
+Revision ID: a2e6c8f4b913
+Revises: 5d7f3a9e2c48
+Create Date: 2026-10-17 04:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2e6c8f4b913'
+down_revision: Union[str, Sequence[str], None] = '5d7f3a9e2c48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# version_id_col de Imovel e filhos (ETag de GET /imoveis/{id})
+TABELAS = ('imoveis', 'imovel_unidades', 'registro_matriculas', 'contas_servicos')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for tabela in TABELAS:
+        op.add_column(tabela, sa.Column('versao', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for tabela in reversed(TABELAS):
+        with op.batch_alter_table(tabela) as batch_op:
+            batch_op.drop_column('versao')
@@ -0,0 +1,40 @@
+"""resumo de ocupacao
+
+Revision ID: c7b1d4e9a265
+Revises: a2e6c8f4b913
+Create Date: 2026-10-17 05:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7b1d4e9a265'
+down_revision: Union[str, Sequence[str], None] = 'a2e6c8f4b913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Mantida por services/ocupacao; popular com `python -m services.ocupacao` após o upgrade
+    op.create_table(
+        'ocupacao_resumo',
+        sa.Column('nivel', sa.String(length=20), nullable=False),
+        sa.Column('chave', sa.String(), nullable=False),
+        sa.Column('imoveis_ocupados', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('imoveis_desocupados', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('unidades_ocupadas', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('unidades_desocupadas', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('area_ocupada_m2', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('area_desocupada_m2', sa.Float(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('nivel', 'chave'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('ocupacao_resumo')
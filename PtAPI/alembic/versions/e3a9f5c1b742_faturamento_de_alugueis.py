@@ -0,0 +1,69 @@
+"""faturamento de alugueis
+
+Revision ID: e3a9f5c1b742
+Revises: c7b1d4e9a265
+Create Date: 2026-10-17 08:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a9f5c1b742'
+down_revision: Union[str, Sequence[str], None] = 'c7b1d4e9a265'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Condições de aluguel em contratos (services/faturamento)
+COLUNAS_CONTRATO = (
+    sa.Column('valor_aluguel', sa.Numeric(12, 2), nullable=True),
+    sa.Column('dia_vencimento', sa.Integer(), nullable=True),
+    sa.Column('data_inicio', sa.Date(), nullable=True),
+    sa.Column('data_fim', sa.Date(), nullable=True),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for coluna in COLUNAS_CONTRATO:
+        op.add_column('contratos', coluna)
+
+    op.create_table(
+        'cobrancas',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('contrato_id', sa.Integer(), nullable=False),
+        sa.Column('competencia', sa.Date(), nullable=False),
+        sa.Column('valor', sa.Numeric(12, 2), nullable=False),
+        sa.Column('vencimento', sa.Date(), nullable=False),
+        sa.Column('status', sa.Unicode(length=255), nullable=False),
+        sa.Column('criado_em', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['contrato_id'], ['contratos.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('contrato_id', 'competencia', name='uq_cobrancas_contrato_competencia'),
+    )
+    op.create_index('ix_cobrancas_competencia_contrato', 'cobrancas', ['competencia', 'contrato_id'])
+
+    op.create_table(
+        'faturamento_execucoes',
+        sa.Column('competencia', sa.Date(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('ultimo_contrato_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('cobrancas_geradas', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('lotes', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('iniciada_em', sa.DateTime(), nullable=False),
+        sa.Column('concluida_em', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('competencia'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('faturamento_execucoes')
+    op.drop_index('ix_cobrancas_competencia_contrato', table_name='cobrancas')
+    op.drop_table('cobrancas')
+    with op.batch_alter_table('contratos') as batch_op:
+        for coluna in reversed(COLUNAS_CONTRATO):
+            batch_op.drop_column(coluna.name)
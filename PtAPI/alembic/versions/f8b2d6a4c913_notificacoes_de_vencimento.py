@@ -0,0 +1,56 @@
+"""notificacoes de vencimento
+
+Revision ID: f8b2d6a4c913
+Revises: e3a9f5c1b742
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8b2d6a4c913'
+down_revision: Union[str, Sequence[str], None] = 'e3a9f5c1b742'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Vencimentos varridos por services/notificacoes
+    op.add_column('contas_servicos', sa.Column('dia_vencimento', sa.Integer(), nullable=True))
+    op.create_index('ix_contas_servicos_dia_vencimento_id', 'contas_servicos', ['dia_vencimento', 'id'])
+    op.create_index('ix_cobrancas_status_vencimento_id', 'cobrancas', ['status', 'vencimento', 'id'])
+
+    op.create_table(
+        'notificacoes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('chave', sa.String(), nullable=False),
+        sa.Column('destinatario', sa.String(), nullable=False),
+        sa.Column('assunto', sa.String(), nullable=False),
+        sa.Column('corpo', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('tentativas', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('proxima_tentativa_em', sa.DateTime(), nullable=False),
+        sa.Column('erro', sa.Text(), nullable=True),
+        sa.Column('criado_em', sa.DateTime(), nullable=False),
+        sa.Column('enviado_em', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('chave'),
+    )
+    op.create_index('ix_notificacoes_status_proxima_tentativa', 'notificacoes', ['status', 'proxima_tentativa_em', 'id'])
+    op.create_index('ix_notificacoes_destinatario_enviado_em', 'notificacoes', ['destinatario', 'enviado_em'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notificacoes_destinatario_enviado_em', table_name='notificacoes')
+    op.drop_index('ix_notificacoes_status_proxima_tentativa', table_name='notificacoes')
+    op.drop_table('notificacoes')
+    op.drop_index('ix_cobrancas_status_vencimento_id', table_name='cobrancas')
+    op.drop_index('ix_contas_servicos_dia_vencimento_id', table_name='contas_servicos')
+    with op.batch_alter_table('contas_servicos') as batch_op:
+        batch_op.drop_column('dia_vencimento')
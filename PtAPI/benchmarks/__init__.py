@@ -0,0 +1 @@
+"""Inicialização do pacote benchmarks"""
@@ -0,0 +1,76 @@
+"""Benchmark: camada síncrona (threadpool) x assíncrona (AsyncSession)
+
+Executa a mesma consulta de GET /imoveis/{id} sob carga concorrente nos dois
+modos, contra o banco de DATABASE_URL (use um banco local):
+
+- sync: SessionLocal dentro do threadpool do anyio (mesmo limite de 40
+  threads que o Starlette usa para rotas `def`)
+- async: AsyncSessionLocal direto no event loop, limitado apenas pelo pool
+
+Uso:
+    python -m benchmarks.async_vs_sync --requisicoes 2000 --concorrencia 10 50 200
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import anyio
+from sqlalchemy import select
+
+from benchmarks.estatisticas import resumo_latencias
+from config import db as config_db
+from models.contratos import Imovel
+
+
+def _consulta_sync(imovel_id: int):
+    with config_db.SessionLocal() as db:
+        return db.execute(select(Imovel).where(Imovel.id == imovel_id)).scalar_one_or_none()
+
+
+async def _consulta_async(imovel_id: int):
+    async with config_db.AsyncSessionLocal() as db:
+        return (await db.execute(select(Imovel).where(Imovel.id == imovel_id))).scalar_one_or_none()
+
+
+async def _rodar(modo: str, requisicoes: int, concorrencia: int, max_id: int) -> dict:
+    latencias = []
+    fila = iter(range(requisicoes))
+    rng = random.Random(42)
+
+    async def trabalhador():
+        for _ in fila:
+            imovel_id = rng.randint(1, max_id)
+            inicio = time.perf_counter()
+            if modo == "sync":
+                await anyio.to_thread.run_sync(_consulta_sync, imovel_id)
+            else:
+                await _consulta_async(imovel_id)
+            latencias.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+    duracao = time.perf_counter() - inicio
+    return {"modo": modo, "concorrencia": concorrencia, **resumo_latencias(latencias, duracao)}
+
+
+async def main(args) -> list:
+    config_db.obter_async_engine()
+    resultados = []
+    for concorrencia in args.concorrencia:
+        for modo in ("sync", "async"):
+            # aquecimento do pool antes de medir
+            await _rodar(modo, min(100, args.requisicoes), concorrencia, args.max_id)
+            resultados.append(await _rodar(modo, args.requisicoes, concorrencia, args.max_id))
+    await config_db.encerrar_async_engine()
+    config_db.db.dispose()
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requisicoes", type=int, default=2000)
+    parser.add_argument("--concorrencia", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--max-id", type=int, default=1000, help="ids de imóvel sorteados em 1..max-id")
+    print(json.dumps(asyncio.run(main(parser.parse_args())), indent=2))
@@ -0,0 +1,240 @@
+"""Benchmark de carga reproduzível: todas as rotas, em processo, por concorrência
+
+Dirige a aplicação inteira (middlewares, dependencies, serialização) via
+httpx + ASGITransport, sem rede, contra o banco de DATABASE_URL populado por
+benchmarks.dados_sinteticos. Cada cenário sorteia ids com uma semente
+própria, então duas execuções sobre os mesmos dados fazem as mesmas
+requisições. O resultado é um JSON com p50/p95/p99 e requisições por
+segundo por (cenário, concorrência), comparável entre commits:
+
+    python -m benchmarks.dados_sinteticos --recriar --imoveis 5000
+    python -m benchmarks.carga --concorrencia 1 10 50 --saida antes.json
+    # ... aplicar a mudança ...
+    python -m benchmarks.carga --concorrencia 1 10 50 --saida depois.json --comparar antes.json
+
+Cenários de escrita (marcados "escrita") alteram o banco; para comparar
+commits, repopule antes de cada execução ou filtre com --cenarios.
+O rate limit fica desligado e o log de requisição lenta também (podem ser
+reativados pelas variáveis de ambiente de sempre).
+"""
+import os
+
+os.environ.setdefault("RATE_LIMIT_ATIVO", "false")
+os.environ.setdefault("REQUISICAO_LENTA_MS", "0")
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import func, select
+
+from benchmarks import dados_sinteticos
+from benchmarks.estatisticas import resumo_latencias
+from config.db import SessionLocal, db as engine
+from models.cliente import Cliente
+from models.contratos import Imovel, ImovelUnidade
+from models.usuario import Usuario
+
+# (método, url, kwargs do httpx) a partir do sorteador do cenário e dos totais do banco
+Requisicao = Tuple[str, str, Dict]
+
+
+@dataclass(frozen=True)
+class Cenario:
+    nome: str
+    router: str
+    gerar: Callable[[random.Random, Dict[str, int]], Requisicao]
+    # fração de --requisicoes (login é caro de propósito: argon2)
+    peso: float = 1.0
+    escrita: bool = False
+
+
+def _imovel(rng, totais) -> int:
+    return rng.randint(1, max(1, totais["imoveis"]))
+
+
+def _estado(rng) -> str:
+    return rng.choice(list(dados_sinteticos.ESTADOS))
+
+
+CENARIOS: List[Cenario] = [
+    Cenario("auth_login", "auth", lambda rng, t: ("POST", "/auth/login", {"json": {
+        "email": dados_sinteticos.EMAIL_USUARIO.format(rng.randrange(max(1, t["usuarios"]))),
+        "senha": dados_sinteticos.SENHA_SINTETICA,
+    }}), peso=0.1),
+    Cenario("auth_usuarios", "auth", lambda rng, t: ("GET", "/auth/usuarios", {"params": {"limit": 100}})),
+    Cenario("imoveis_listar", "imoveis", lambda rng, t: ("GET", "/imoveis/", {"params": {"estado": _estado(rng), "limit": 50}})),
+    Cenario("imoveis_contagem", "imoveis", lambda rng, t: ("GET", "/imoveis/contagem", {"params": {"estado": _estado(rng)}})),
+    Cenario("imoveis_detalhe", "imoveis", lambda rng, t: ("GET", f"/imoveis/{_imovel(rng, t)}", {})),
+    Cenario("imoveis_detalhe_include", "imoveis", lambda rng, t: (
+        "GET", f"/imoveis/{_imovel(rng, t)}", {"params": {"include": "unidades,registros,contas"}})),
+    Cenario("imoveis_iptu_calc", "imoveis", lambda rng, t: (
+        "POST", f"/imoveis/{_imovel(rng, t)}/iptu/calc", {"json": {"valor_total_iptu": 1234.56, "desconto_cota_unica": 5}})),
+    Cenario("imoveis_criar_unidade", "imoveis", lambda rng, t: ("POST", f"/imoveis/{_imovel(rng, t)}/unidades", {"json": {
+        "nome_unidade": f"Bench {rng.randrange(10 ** 6)}", "area_m2": float(rng.randint(10, 200)),
+        "descricao": None, "contrato_id": None,
+    }}), escrita=True),
+    Cenario("imoveis_status", "imoveis", lambda rng, t: ("PATCH", f"/imoveis/{_imovel(rng, t)}/status", {
+        "json": {"status": rng.choice(["ocupado", "desocupado"])}}), escrita=True),
+    Cenario("clientes_listar", "clientes", lambda rng, t: ("GET", "/clientes/", {"params": {"limit": 50}})),
+    Cenario("clientes_detalhe", "clientes", lambda rng, t: (
+        "GET", f"/clientes/{rng.randint(1, max(1, t['clientes']))}", {})),
+    Cenario("busca", "busca", lambda rng, t: ("GET", "/busca", {"params": {
+        "q": rng.choice(dados_sinteticos.SOBRENOMES + dados_sinteticos.BAIRROS)}})),
+    Cenario("dashboard_ocupacao", "dashboard", lambda rng, t: ("GET", "/dashboard/ocupacao", {"params": {"agrupar": "municipio"}})),
+    Cenario("requisicao_listar", "requisicao", lambda rng, t: ("GET", "/requisicao/listar", {})),
+    Cenario("requisicao_criar", "requisicao", lambda rng, t: ("POST", "/requisicao/criar", {})),
+]
+
+
+def _totais() -> Dict[str, int]:
+    with SessionLocal() as sessao:
+        return {
+            "usuarios": sessao.scalar(select(func.count(Usuario.id))),
+            "clientes": sessao.scalar(select(func.count(Cliente.id))),
+            "imoveis": sessao.scalar(select(func.count(Imovel.id))),
+            "unidades": sessao.scalar(select(func.count(ImovelUnidade.id))),
+        }
+
+
+def _commit_atual() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _rodar(cliente: httpx.AsyncClient, cenario: Cenario, requisicoes: int, concorrencia: int,
+                 totais: Dict[str, int], semente: int) -> Dict:
+    # semente estável por cenário (hash() de str muda a cada processo)
+    rng = random.Random(semente ^ zlib.crc32(cenario.nome.encode()))
+    pedidos = [cenario.gerar(rng, totais) for _ in range(requisicoes)]
+    fila = iter(pedidos)
+    latencias: List[float] = []
+    status: Dict[str, int] = {}
+
+    async def trabalhador():
+        for metodo, url, kwargs in fila:
+            inicio = time.perf_counter()
+            resposta = await cliente.request(metodo, url, **kwargs)
+            latencias.append(time.perf_counter() - inicio)
+            chave = str(resposta.status_code)
+            status[chave] = status.get(chave, 0) + 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+    duracao = time.perf_counter() - inicio
+    erros = sum(qtd for codigo, qtd in status.items() if codigo.startswith("5"))
+    return {
+        "cenario": cenario.nome, "router": cenario.router, "concorrencia": concorrencia,
+        **resumo_latencias(latencias, duracao), "erros": erros, "status": status,
+    }
+
+
+async def _token(cliente: httpx.AsyncClient) -> str:
+    resposta = await cliente.post("/auth/login", json={
+        "email": dados_sinteticos.EMAIL_USUARIO.format(0), "senha": dados_sinteticos.SENHA_SINTETICA,
+    })
+    if resposta.status_code != 200:
+        raise SystemExit(f"Login do usuário sintético falhou ({resposta.status_code}): rode benchmarks.dados_sinteticos")
+    return resposta.json()["access_token"]
+
+
+async def executar(cenarios: List[Cenario], requisicoes: int, concorrencias: List[int], semente: int,
+                   aquecimento: int = 20) -> Dict:
+    from main import app
+
+    totais = _totais()
+    resultados = []
+    async with app.router.lifespan_context(app):
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://bench", timeout=None) as cliente:
+            cliente.headers["Authorization"] = f"Bearer {await _token(cliente)}"
+            for cenario in cenarios:
+                quantidade = max(1, int(requisicoes * cenario.peso))
+                await _rodar(cliente, cenario, min(aquecimento, quantidade), 1, totais, semente + 1)
+                for concorrencia in concorrencias:
+                    resultados.append(await _rodar(cliente, cenario, quantidade, concorrencia, totais, semente))
+    return {
+        "meta": {
+            "commit": _commit_atual(),
+            "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "banco": engine.dialect.name,
+            "totais": totais,
+            "semente": semente,
+            "requisicoes": requisicoes,
+        },
+        "resultados": resultados,
+    }
+
+
+def comparar(atual: Dict, base: Dict) -> List[Dict]:
+    """Variação (%) de rps e p95/p99 por (cenário, concorrência) presente nos dois resultados"""
+    anteriores = {(r["cenario"], r["concorrencia"]): r for r in base["resultados"]}
+
+    def variacao(novo: float, antigo: float) -> Optional[float]:
+        return round((novo / antigo - 1) * 100, 1) if antigo else None
+
+    linhas = []
+    for r in atual["resultados"]:
+        antes = anteriores.get((r["cenario"], r["concorrencia"]))
+        if antes is None:
+            continue
+        linhas.append({
+            "cenario": r["cenario"], "concorrencia": r["concorrencia"],
+            "rps_%": variacao(r["rps"], antes["rps"]),
+            "p95_%": variacao(r["p95_ms"], antes["p95_ms"]),
+            "p99_%": variacao(r["p99_ms"], antes["p99_ms"]),
+        })
+    return linhas
+
+
+def main(args) -> Dict:
+    if args.popular:
+        dados_sinteticos.recriar_banco()
+        dados_sinteticos.popular(dados_sinteticos.volumes_dos_argumentos(args), args.semente)
+
+    cenarios = CENARIOS
+    if args.cenarios:
+        desconhecidos = set(args.cenarios) - {c.nome for c in CENARIOS}
+        if desconhecidos:
+            raise SystemExit(f"Cenários desconhecidos: {', '.join(sorted(desconhecidos))}")
+        cenarios = [c for c in CENARIOS if c.nome in args.cenarios]
+    if args.somente_leitura:
+        cenarios = [c for c in cenarios if not c.escrita]
+
+    resultado = asyncio.run(executar(cenarios, args.requisicoes, args.concorrencia, args.semente))
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            base = json.load(arquivo)
+        resultado["comparacao"] = {"base": base["meta"].get("commit"), "variacoes": comparar(resultado, base)}
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+    return resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requisicoes", type=int, default=500, help="requisições por cenário e concorrência")
+    parser.add_argument("--concorrencia", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--cenarios", nargs="+", help=f"subconjunto de: {' '.join(c.nome for c in CENARIOS)}")
+    parser.add_argument("--somente-leitura", action="store_true", help="pula os cenários de escrita")
+    parser.add_argument("--saida", help="grava o JSON do resultado neste arquivo")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para calcular as variações")
+    parser.add_argument("--popular", action="store_true",
+                        help="recria o banco (apaga tudo) e popula com benchmarks.dados_sinteticos antes de medir")
+    dados_sinteticos.adicionar_argumentos(parser)
+    print(json.dumps(main(parser.parse_args()), indent=2, ensure_ascii=False))
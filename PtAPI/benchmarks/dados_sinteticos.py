@@ -0,0 +1,279 @@
+"""Gerador determinístico de dados sintéticos para benchmarks
+
+Popula o banco de DATABASE_URL com volumes configuráveis de Usuario,
+ClienteFisica/ClienteJuridica, Imovel, ImovelUnidade, RegistroMatricula,
+ContaServico, Contratado e Contratos (com condições de aluguel; o contrato N
+aluga a unidade N). Mesma semente + mesmos volumes = mesmas linhas, com os mesmos
+ids: os ids são atribuídos pelo gerador (banco recriado do zero), então os
+cenários de carga podem sortear ids sem consultar o banco.
+
+A inserção é em lote (executemany, sem RETURNING); o resumo de ocupação e o
+índice de busca em tabela são recalculados uma vez no final.
+
+ATENÇÃO: --recriar apaga TODAS as tabelas do banco. Use um banco descartável.
+
+Uso:
+    python -m benchmarks.dados_sinteticos --recriar --clientes 2000 --imoveis 10000
+"""
+import argparse
+import json
+import random
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterator, List
+
+from sqlalchemy import func, insert, select, text
+
+from config.db import Base, SessionLocal, criar_tabelas, db as engine
+from models.cliente import ClienteFisica, ClienteJuridica
+from models.contratos import ContaServico, Contratado, Contratos, Imovel, ImovelUnidade, RegistroMatricula
+from models.usuario import Usuario
+
+# Todos os usuários sintéticos usam esta senha (login nos cenários de carga)
+SENHA_SINTETICA = "Bench123!"
+EMAIL_USUARIO = "bench{}@exemplo.com"
+
+LOTE = 2000
+
+ESTADOS = {
+    "SP": ["Sao Paulo", "Campinas", "Santos", "Ribeirao Preto", "Sorocaba"],
+    "RJ": ["Rio de Janeiro", "Niteroi", "Petropolis"],
+    "MG": ["Belo Horizonte", "Uberlandia", "Juiz de Fora"],
+    "PR": ["Curitiba", "Londrina"],
+    "RS": ["Porto Alegre", "Caxias do Sul"],
+    "BA": ["Salvador"],
+}
+BAIRROS = ["Centro", "Jardim America", "Vila Nova", "Boa Vista", "Santa Cecilia", "Liberdade", "Industrial", "Alto da Serra"]
+RUAS = ["Rua das Flores", "Avenida Paulista", "Rua XV de Novembro", "Avenida Brasil", "Rua da Consolacao", "Travessa do Comercio"]
+NOMES = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Fabio", "Gabriela", "Heitor", "Isabela", "Joao", "Larissa", "Marcos"]
+SOBRENOMES = ["Silva", "Souza", "Oliveira", "Santos", "Pereira", "Costa", "Almeida", "Ferreira", "Ribeiro", "Gomes"]
+SERVICOS = ["Administracao", "Manutencao", "Limpeza", "Portaria"]
+FORNECEDORES = {"energia": "Companhia de Energia", "agua": "Saneamento Municipal", "telefonia": "Operadora", "outro": None}
+
+
+@dataclass(frozen=True)
+class Volumes:
+    usuarios: int = 200
+    clientes: int = 1000
+    fracao_juridica: float = 0.3
+    imoveis: int = 5000
+    unidades_por_imovel: int = 3
+    registros_por_imovel: int = 1
+    contas_por_imovel: int = 2
+    contratados: int = 20
+    contratos: int = 2000
+
+    @property
+    def clientes_juridica(self) -> int:
+        return int(round(self.clientes * self.fracao_juridica))
+
+
+def _nome(rng: random.Random) -> str:
+    return f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)}"
+
+
+def _usuarios(volumes: Volumes, senha_hash: str) -> Iterator[Dict]:
+    for n in range(volumes.usuarios):
+        yield {
+            "id": n + 1, "nome": f"Usuario Bench {n}", "senha": senha_hash, "email": EMAIL_USUARIO.format(n),
+            "cpf": f"9{n:010d}", "rg": f"BENCH{n:07d}", "data_de_nascimento": date(1970, 1, 1) + timedelta(days=n % 15000),
+        }
+
+
+def _clientes(rng: random.Random, volumes: Volumes):
+    """(pf, pj): ids 1..clientes, PJ intercaladas de forma determinística"""
+    pf, pj = [], []
+    juridicas = set(rng.sample(range(1, volumes.clientes + 1), volumes.clientes_juridica))
+    for cliente_id in range(1, volumes.clientes + 1):
+        comuns = {
+            "id": cliente_id, "email": f"cliente{cliente_id}@exemplo.com", "status": "ativo", "senha": "x",
+            "telefone": f"11{rng.randint(900000000, 999999999)}",
+            "endereco": f"{rng.choice(RUAS)}, {rng.randint(1, 3000)}",
+        }
+        if cliente_id in juridicas:
+            razao = f"{rng.choice(SOBRENOMES)} {rng.choice(['Comercio', 'Participacoes', 'Servicos'])} Ltda"
+            pj.append({
+                **comuns, "nome": razao, "cnpj": f"{cliente_id:08d}0001{cliente_id % 100:02d}", "razao_social": razao,
+                "nome_fantasia": razao.split(" ")[0], "inscricao_estadual": None, "endereco_comercial": comuns["endereco"],
+                "data_fundacao": date(1990, 1, 1) + timedelta(days=rng.randint(0, 12000)),
+            })
+        else:
+            pf.append({
+                **comuns, "nome": _nome(rng), "cpf": f"{cliente_id:011d}", "rg": f"RG{cliente_id:08d}",
+                "data_de_nascimento": date(1950, 1, 1) + timedelta(days=rng.randint(0, 20000)),
+            })
+    return pf, pj
+
+
+def _imoveis(rng: random.Random, volumes: Volumes) -> Iterator[Dict]:
+    estados = list(ESTADOS)
+    for imovel_id in range(1, volumes.imoveis + 1):
+        estado = rng.choice(estados)
+        yield {
+            "id": imovel_id, "rua": rng.choice(RUAS), "numero": str(rng.randint(1, 3000)), "complemento": None,
+            "bairro": rng.choice(BAIRROS), "municipio": rng.choice(ESTADOS[estado]), "estado": estado,
+            "cep": f"{rng.randint(1000000, 99999999):08d}", "area_total_m2": float(rng.randint(40, 2000)),
+            "status_ocupacao": "ocupado" if rng.random() < 0.6 else "desocupado",
+            "cliente_id": rng.randint(1, max(1, volumes.clientes)),
+        }
+
+
+def _filhos(rng: random.Random, volumes: Volumes):
+    """(unidades, registros, contas) com ids sequenciais por tabela"""
+    unidades, registros, contas = [], [], []
+    for imovel_id in range(1, volumes.imoveis + 1):
+        for n in range(volumes.unidades_por_imovel):
+            unidades.append({
+                "id": len(unidades) + 1, "imovel_id": imovel_id, "nome_unidade": f"Unidade {n + 1}",
+                "area_m2": float(rng.randint(20, 300)), "descricao": None, "contrato_id": None,
+                "status": "ocupado" if rng.random() < 0.55 else "desocupado",
+            })
+        for n in range(volumes.registros_por_imovel):
+            registros.append({
+                "id": len(registros) + 1, "imovel_id": imovel_id, "matricula": f"{imovel_id:07d}-{n}",
+                "cartorio": f"{rng.randint(1, 18)}o Oficio", "cnm": None, "inscricao_municipal": None,
+                "atual": n == volumes.registros_por_imovel - 1,
+            })
+        for n in range(volumes.contas_por_imovel):
+            tipo = rng.choice(list(FORNECEDORES))
+            contas.append({
+                "id": len(contas) + 1, "imovel_id": imovel_id, "tipo": tipo, "numero_conta": f"{imovel_id}{n:03d}",
+                "fornecedor": FORNECEDORES[tipo], "status": "ativo", "observacoes": None,
+            })
+    return unidades, registros, contas
+
+
+def _contratados(volumes: Volumes) -> Iterator[Dict]:
+    for n in range(volumes.contratados):
+        yield {"id": n + 1, "nome": f"Contratado Bench {n}", "senha": "x", "servico": SERVICOS[n % len(SERVICOS)]}
+
+
+def _contratos(rng: random.Random, volumes: Volumes) -> Iterator[Dict]:
+    """Contratos de aluguel: ~80% vigentes hoje, alguns já encerrados, vencimentos de 1 a 31"""
+    for contrato_id in range(1, volumes.contratos + 1):
+        inicio = date(2020, 1, 1) + timedelta(days=rng.randint(0, 2400))
+        encerrado = rng.random() < 0.2
+        yield {
+            "id": contrato_id, "cliente_id": rng.randint(1, max(1, volumes.clientes)),
+            "contratado_id": rng.randint(1, max(1, volumes.contratados)), "detalhes": f"Locacao {contrato_id}",
+            "valor_aluguel": Decimal(rng.randint(80000, 800000)) / 100,
+            "dia_vencimento": rng.choice([1, 5, 10, 15, 20, 25, 28, 30, 31]),
+            "data_inicio": inicio,
+            "data_fim": inicio + timedelta(days=rng.randint(180, 720)) if encerrado else None,
+        }
+
+
+def _em_lotes(linhas, tamanho: int = LOTE) -> Iterator[List[Dict]]:
+    lote = []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) == tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _ajustar_sequencias(sessao) -> None:
+    """PostgreSQL: ids explícitos não avançam as sequences; alinhar com max(id)"""
+    if engine.dialect.name != "postgresql":
+        return
+    for tabela in ("usuarios", "clientes", "imoveis", "imovel_unidades", "registro_matriculas", "contas_servicos",
+                   "contratados", "contratos"):
+        sessao.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{tabela}', 'id'), COALESCE((SELECT max(id) FROM {tabela}), 0) + 1, false)"
+        ))
+
+
+def popular(volumes: Volumes, semente: int = 42) -> Dict:
+    """Insere os dados sintéticos em um banco vazio; retorna contagens e tempo gasto"""
+    from services.busca import indice_busca, reconstruir_indice
+    from services.hashing import _hash_no_worker
+    from services.ocupacao import recalcular_ocupacao
+
+    rng = random.Random(semente)
+    inicio = time.perf_counter()
+    senha_hash, _ = _hash_no_worker(SENHA_SINTETICA)
+    pf, pj = _clientes(rng, volumes)
+    unidades, registros, contas = _filhos(random.Random(semente + 1), volumes)
+    for unidade in unidades[:volumes.contratos]:
+        unidade["contrato_id"] = unidade["id"]
+    rng_vencimentos = random.Random(semente + 4)
+    for conta in contas:
+        conta["dia_vencimento"] = rng_vencimentos.randint(1, 31)
+
+    with SessionLocal() as sessao:
+        if sessao.scalar(select(func.count(Usuario.id))):
+            raise SystemExit("Banco já tem usuários: use --recriar (apaga tudo) ou outro DATABASE_URL")
+        for modelo, linhas in (
+            (Usuario, _usuarios(volumes, senha_hash)),
+            (ClienteFisica, pf),
+            (ClienteJuridica, pj),
+            (Imovel, _imoveis(random.Random(semente + 2), volumes)),
+            (Contratado, _contratados(volumes)),
+            (Contratos, _contratos(random.Random(semente + 3), volumes)),
+            (ImovelUnidade, unidades),
+            (RegistroMatricula, registros),
+            (ContaServico, contas),
+        ):
+            for lote in _em_lotes(linhas):
+                sessao.execute(insert(modelo), lote)
+        _ajustar_sequencias(sessao)
+        sessao.commit()
+
+        # Derivados: uma passada cada, em vez de acompanhar linha a linha
+        grupos = recalcular_ocupacao(sessao)
+        if indice_busca.transacional:
+            reconstruir_indice(sessao)  # o índice em memória é montado na partida da API
+
+    return {
+        "semente": semente,
+        "volumes": asdict(volumes),
+        "linhas": {
+            "usuarios": volumes.usuarios, "clientes_fisica": len(pf), "clientes_juridica": len(pj),
+            "imoveis": volumes.imoveis, "unidades": len(unidades), "registros": len(registros), "contas": len(contas),
+            "contratados": volumes.contratados, "contratos": volumes.contratos,
+            "grupos_ocupacao": grupos,
+        },
+        "segundos": round(time.perf_counter() - inicio, 2),
+    }
+
+
+def recriar_banco() -> None:
+    criar_tabelas()  # registra todos os modelos no metadata
+    Base.metadata.drop_all(bind=engine)
+    criar_tabelas()
+
+
+def adicionar_argumentos(parser: argparse.ArgumentParser) -> None:
+    padrao = Volumes()
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--usuarios", type=int, default=padrao.usuarios)
+    parser.add_argument("--clientes", type=int, default=padrao.clientes)
+    parser.add_argument("--fracao-juridica", type=float, default=padrao.fracao_juridica)
+    parser.add_argument("--imoveis", type=int, default=padrao.imoveis)
+    parser.add_argument("--unidades-por-imovel", type=int, default=padrao.unidades_por_imovel)
+    parser.add_argument("--registros-por-imovel", type=int, default=padrao.registros_por_imovel)
+    parser.add_argument("--contas-por-imovel", type=int, default=padrao.contas_por_imovel)
+    parser.add_argument("--contratados", type=int, default=padrao.contratados)
+    parser.add_argument("--contratos", type=int, default=padrao.contratos)
+
+
+def volumes_dos_argumentos(args) -> Volumes:
+    return Volumes(
+        usuarios=args.usuarios, clientes=args.clientes, fracao_juridica=args.fracao_juridica, imoveis=args.imoveis,
+        unidades_por_imovel=args.unidades_por_imovel, registros_por_imovel=args.registros_por_imovel,
+        contas_por_imovel=args.contas_por_imovel, contratados=args.contratados, contratos=args.contratos,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    adicionar_argumentos(parser)
+    parser.add_argument("--recriar", action="store_true", help="apaga e recria todas as tabelas antes de popular")
+    args = parser.parse_args()
+    if args.recriar:
+        recriar_banco()
+    print(json.dumps(popular(volumes_dos_argumentos(args), args.semente), indent=2))
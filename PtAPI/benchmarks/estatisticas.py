@@ -0,0 +1,23 @@
+"""Resumo de latências usado pelos benchmarks"""
+import statistics
+from typing import Dict, List
+
+
+def percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+def resumo_latencias(latencias: List[float], duracao: float) -> Dict:
+    """rps e p50/p95/p99/média em ms de uma rodada que durou `duracao` segundos"""
+    return {
+        "requisicoes": len(latencias),
+        "rps": round(len(latencias) / duracao, 1) if duracao else 0.0,
+        "p50_ms": round(percentil(latencias, 50) * 1000, 3),
+        "p95_ms": round(percentil(latencias, 95) * 1000, 3),
+        "p99_ms": round(percentil(latencias, 99) * 1000, 3),
+        "media_ms": round(statistics.fmean(latencias) * 1000, 3) if latencias else 0.0,
+    }
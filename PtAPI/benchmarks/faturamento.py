@@ -0,0 +1,69 @@
+"""Benchmark do faturamento mensal (services/faturamento) sobre dados sintéticos
+
+Apaga as cobranças da competência, fatura do zero e depois reprocessa a
+mesma competência (todas as cobranças já existem: mede o custo da
+idempotência). Confere que há exatamente uma cobrança por contrato vigente.
+
+    python -m benchmarks.dados_sinteticos --recriar --imoveis 35000 --contratos 100000
+    python -m benchmarks.faturamento --competencia 2026-11 --lote 2000 5000
+"""
+import argparse
+import json
+import logging
+import time
+
+from sqlalchemy import delete, func, select
+
+from config.db import SessionLocal, db as engine
+from models.contratos import Contratos
+from models.faturamento import Cobranca, FaturamentoExecucao
+from serve import rss_mb
+from services.faturamento import competencia_de_texto, contratos_vigentes, faturar
+
+
+def _limpar(sessao, competencia) -> None:
+    sessao.execute(delete(Cobranca).where(Cobranca.competencia == competencia))
+    sessao.execute(delete(FaturamentoExecucao).where(FaturamentoExecucao.competencia == competencia))
+    sessao.commit()
+
+
+def medir(competencia, lote: int) -> dict:
+    with SessionLocal() as sessao:
+        _limpar(sessao, competencia)
+        vigentes = sessao.scalar(select(func.count(Contratos.id)).where(*contratos_vigentes(competencia)))
+
+        rss_antes = rss_mb()
+        inicio = time.perf_counter()
+        primeira = faturar(sessao, competencia, lote)
+        duracao = time.perf_counter() - inicio
+        rss_depois = rss_mb()
+
+        reprocessamento = faturar(sessao, competencia, lote, reprocessar=True)
+        cobrancas = sessao.scalar(select(func.count(Cobranca.id)).where(Cobranca.competencia == competencia))
+        distintas = sessao.scalar(
+            select(func.count(func.distinct(Cobranca.contrato_id))).where(Cobranca.competencia == competencia)
+        )
+    return {
+        "lote": lote,
+        "contratos_vigentes": vigentes,
+        "primeira": {**primeira, "contratos_por_s": round(primeira["contratos_percorridos"] / duracao) if duracao else None},
+        "reprocessamento": reprocessamento,
+        "rss_mb": {"antes": round(rss_antes or 0), "depois": round(rss_depois or 0)},
+        "consistente": cobrancas == distintas == vigentes,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--competencia", default="2026-11", help="AAAA-MM")
+    parser.add_argument("--lote", type=int, nargs="+", default=[2000])
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    competencia = competencia_de_texto(args.competencia)
+    resultado = {
+        "banco": engine.dialect.name,
+        "competencia": args.competencia,
+        "execucoes": [medir(competencia, lote) for lote in args.lote],
+    }
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
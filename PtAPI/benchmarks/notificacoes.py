@@ -0,0 +1,127 @@
+"""Benchmark dos lembretes de vencimento (services/notificacoes)
+
+Fatura a competência do mês de --hoje (se ainda não faturada), apaga a
+caixa de saída, agenda os lembretes da janela e entrega tudo para um
+servidor SMTP mínimo embutido (aceita e descarta; conta mensagens e
+conexões). Mede agendamento, entrega (mensagens/s) e a re-execução do
+agendador (deduplicação: nenhuma nova).
+
+    python -m benchmarks.dados_sinteticos --recriar --imoveis 34000 --contratos 100000
+    python -m benchmarks.notificacoes --hoje 2026-11-08 --antecedencia 10 --conexoes 1 4
+
+Com --smtp-externo, entrega no servidor de NOTIFICACAO_SMTP_HOST/PORTA.
+"""
+import argparse
+import json
+import logging
+import socketserver
+import threading
+from datetime import date
+
+from sqlalchemy import delete
+
+from config.db import SessionLocal, db as engine
+from models.notificacao import Notificacao
+from services.faturamento import faturar
+from services.notificacoes import EnviadorSMTP, agendar, entregar
+from services.rate_limit import PoliticaLimite
+
+
+class SumidouroSMTP(socketserver.ThreadingTCPServer):
+    """Servidor SMTP que aceita tudo e só conta (sem persistir nada)"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SessaoSMTP)
+        self.lock = threading.Lock()
+        self.mensagens = 0
+        self.conexoes = 0
+
+    def contar(self, campo: str) -> None:
+        with self.lock:
+            setattr(self, campo, getattr(self, campo) + 1)
+
+
+class _SessaoSMTP(socketserver.StreamRequestHandler):
+    def _responder(self, linha: str) -> None:
+        self.wfile.write(f"{linha}\r\n".encode())
+
+    def handle(self):
+        self.server.contar("conexoes")
+        self._responder("220 sumidouro ESMTP")
+        while True:
+            linha = self.rfile.readline()
+            if not linha:
+                return
+            comando = linha[:4].upper()
+            if comando == b"EHLO":
+                self._responder("250-sumidouro")
+                self._responder("250 8BITMIME")
+            elif comando == b"DATA":
+                self._responder("354 fim com <CRLF>.<CRLF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                self.server.contar("mensagens")
+                self._responder("250 OK")
+            elif comando == b"QUIT":
+                self._responder("221 tchau")
+                return
+            else:  # HELO, MAIL, RCPT, RSET, NOOP
+                self._responder("250 OK")
+
+
+def medir(hoje: date, antecedencia: int, conexoes: int, lote: int, limite: PoliticaLimite, smtp_externo: bool) -> dict:
+    sumidouro = None
+    if smtp_externo:
+        enviador = EnviadorSMTP(conexoes=conexoes)
+    else:
+        sumidouro = SumidouroSMTP()
+        threading.Thread(target=sumidouro.serve_forever, daemon=True).start()
+        enviador = EnviadorSMTP("127.0.0.1", sumidouro.server_address[1], conexoes=conexoes)
+
+    try:
+        with SessionLocal() as sessao:
+            sessao.execute(delete(Notificacao))
+            sessao.commit()
+            agendamento = agendar(sessao, hoje, antecedencia, lote)
+            entrega = entregar(sessao, enviador, lote, limite)
+            reagendamento = agendar(sessao, hoje, antecedencia, lote)
+    finally:
+        enviador.encerrar()
+        if sumidouro is not None:
+            sumidouro.shutdown()
+            sumidouro.server_close()
+
+    return {
+        "conexoes": conexoes,
+        "agendar": agendamento,
+        "entregar": {**entrega, "mensagens_por_s": round(entrega["enviadas"] / entrega["segundos"]) if entrega["segundos"] else None},
+        "agendar_de_novo": reagendamento,
+        "servidor": {"mensagens": sumidouro.mensagens, "conexoes": sumidouro.conexoes} if sumidouro else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hoje", default=f"{date.today():%Y-%m-%d}", help="AAAA-MM-DD")
+    parser.add_argument("--antecedencia", type=int, default=3)
+    parser.add_argument("--conexoes", type=int, nargs="+", default=[4])
+    parser.add_argument("--lote", type=int, default=500)
+    parser.add_argument("--limite", default="1000/day", help="limite por destinatário (formato do rate limit)")
+    parser.add_argument("--smtp-externo", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    hoje = date.fromisoformat(args.hoje)
+    with SessionLocal() as sessao:
+        faturamento = faturar(sessao, hoje.replace(day=1))
+    limite = PoliticaLimite.de_texto("notificacao", args.limite)
+    resultado = {
+        "banco": engine.dialect.name,
+        "hoje": args.hoje,
+        "faturamento": faturamento,
+        "execucoes": [medir(hoje, args.antecedencia, n, args.lote, limite, args.smtp_externo) for n in args.conexoes],
+    }
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
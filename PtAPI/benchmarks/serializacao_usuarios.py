@@ -0,0 +1,104 @@
+"""Microbenchmark: CPU por requisição de GET /auth/usuarios?limit=1000
+
+Compara, dentro do mesmo processo e sobre as mesmas linhas:
+
+- antes: objetos UsuarioResponse montados à mão, revalidados pelo
+  response_model e serializados pelo JSONResponse (json da stdlib)
+- depois: a rota atual, que serializa as linhas do select direto
+  (services/json_rapido, orjson quando instalado)
+
+Autenticação e rate limit ficam de fora (dependency sobrescrita) para
+isolar consulta + serialização. Usa o banco de DATABASE_URL e cria os
+usuários sintéticos que faltarem (use um banco local descartável).
+
+Uso:
+    python -m benchmarks.serializacao_usuarios --requisicoes 200 --usuarios 1000
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import date
+from typing import List
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert, select
+
+from config.auth import obter_usuario_atual
+from config.db import SessionLocal, criar_tabelas, get_db
+from main import app
+from models.usuario import Usuario
+from schemas.usuario_schema import UsuarioResponse
+from services.json_rapido import orjson
+
+_legado = APIRouter()
+
+
+@_legado.get("/_bench/usuarios-legado", response_model=List[UsuarioResponse], response_class=JSONResponse)
+def _listar_usuarios_legado(limit: int = 1000, db=Depends(get_db)):
+    """Caminho anterior: modelos à mão + revalidação do response_model + json da stdlib"""
+    linhas = db.execute(
+        select(Usuario.id, Usuario.nome, Usuario.email, Usuario.cpf).order_by(Usuario.id).limit(limit)
+    ).all()
+    return [UsuarioResponse(id=i, nome=n, email=e, cpf=c) for i, n, e, c in linhas]
+
+
+def _garantir_usuarios(quantidade: int) -> None:
+    with SessionLocal() as db:
+        existentes = db.scalar(select(func.count(Usuario.id)))
+        faltam = quantidade - existentes
+        if faltam <= 0:
+            return
+        db.execute(insert(Usuario), [
+            {
+                "nome": f"Usuario Bench {n}", "senha": "x", "email": f"bench{n}@exemplo.com",
+                "cpf": f"bench{n:011d}", "rg": f"benchrg{n}", "data_de_nascimento": date(1990, 1, 1),
+            }
+            for n in range(existentes, existentes + faltam)
+        ])
+        db.commit()
+
+
+def _medir(cliente: TestClient, url: str, requisicoes: int) -> dict:
+    for _ in range(min(20, requisicoes)):
+        cliente.get(url)  # aquecimento
+    cpu, parede = [], []
+    for _ in range(requisicoes):
+        inicio_cpu, inicio = time.process_time(), time.perf_counter()
+        resposta = cliente.get(url)
+        cpu.append(time.process_time() - inicio_cpu)
+        parede.append(time.perf_counter() - inicio)
+        assert resposta.status_code == 200, resposta.text
+    return {
+        "url": url,
+        "bytes": len(resposta.content),
+        "cpu_media_ms": round(statistics.fmean(cpu) * 1000, 3),
+        "cpu_mediana_ms": round(statistics.median(cpu) * 1000, 3),
+        "tempo_mediano_ms": round(statistics.median(parede) * 1000, 3),
+    }
+
+
+def main(args) -> dict:
+    criar_tabelas()
+    _garantir_usuarios(args.usuarios)
+    app.include_router(_legado)
+    app.dependency_overrides[obter_usuario_atual] = lambda: None
+    with TestClient(app) as cliente:
+        antes = _medir(cliente, f"/_bench/usuarios-legado?limit={args.limite}", args.requisicoes)
+        depois = _medir(cliente, f"/auth/usuarios?limit={args.limite}", args.requisicoes)
+    return {
+        "orjson": orjson is not None,
+        "antes": antes,
+        "depois": depois,
+        "reducao_cpu": f"{(1 - depois['cpu_media_ms'] / antes['cpu_media_ms']) * 100:.1f}%",
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requisicoes", type=int, default=200)
+    parser.add_argument("--usuarios", type=int, default=1000, help="usuários garantidos no banco")
+    parser.add_argument("--limite", type=int, default=1000)
+    print(json.dumps(main(parser.parse_args()), indent=2))
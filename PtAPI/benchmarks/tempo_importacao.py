@@ -0,0 +1,118 @@
+"""Orçamento de tempo de importação (partida a frio)
+
+Mede, em subprocessos novos (mediana de N execuções, sem contar a partida do
+interpretador), quanto custa:
+
+- import_main: `import main` (não cria app, engine nem rotas)
+- models: `import models` (Alembic, scripts, jobs)
+- create_app: `import main; main.create_app()` (o que um worker faz antes de atender)
+
+e verifica que dependências pesadas e raramente usadas continuam adiadas até
+o primeiro uso. Sai com código 1 se algum limite for estourado, para rodar
+em CI a cada mudança.
+
+Uso:
+    python -m benchmarks.tempo_importacao
+    python -m benchmarks.tempo_importacao --limite create_app=900 --repeticoes 9
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+# alvo -> (código, limite padrão em ms)
+ALVOS = {
+    "import_main": ("import main", 150),
+    "models": ("import models", 900),
+    "create_app": ("import main; main.create_app()", 1600),
+}
+
+# Nunca carregados só por montar a aplicação: o primeiro uso importa
+MODULOS_ADIADOS = (
+    "reportlab",        # PDFs de IPTU (services/pdf_iptu)
+    "passlib",          # hash de senhas (processos do executor de hashing)
+    "argon2",
+    "jose",             # JWT (config/auth, na primeira emissão/validação de token)
+    "sqlalchemy_utils", # substituído por models/tipos.ChoiceType
+    "httpx",            # só benchmarks/testes
+    "asyncpg",          # driver assíncrono: no primeiro uso do AsyncEngine
+    "aiosqlite",
+)
+
+_MEDIDOR = """
+import json, sys, time
+inicio = time.perf_counter()
+{codigo}
+duracao = time.perf_counter() - inicio
+print(json.dumps({{"ms": duracao * 1000, "modulos": sorted(sys.modules)}}))
+"""
+
+
+def _medir_uma_vez(codigo: str) -> Dict:
+    ambiente = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    ambiente.setdefault("DATABASE_URL", "sqlite:///:memory:")
+    saida = subprocess.run(
+        [sys.executable, "-c", _MEDIDOR.format(codigo=codigo)],
+        capture_output=True, text=True, check=True, env=ambiente,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def _mais_lentos(codigo: str, quantidade: int = 10) -> List[Dict]:
+    """Módulos com maior tempo próprio (python -X importtime)"""
+    ambiente = {**os.environ}
+    ambiente.setdefault("DATABASE_URL", "sqlite:///:memory:")
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo], capture_output=True, text=True, env=ambiente,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ).stderr
+    linhas = []
+    for linha in stderr.splitlines():
+        casamento = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)", linha)
+        if casamento:
+            linhas.append({"modulo": casamento.group(4), "proprio_ms": int(casamento.group(1)) / 1000})
+    return sorted(linhas, key=lambda l: l["proprio_ms"], reverse=True)[:quantidade]
+
+
+def verificar(repeticoes: int, limites: Dict[str, float]) -> Dict:
+    resultado = {"alvos": {}, "violacoes": []}
+    for alvo, (codigo, _) in ALVOS.items():
+        medidas = [_medir_uma_vez(codigo) for _ in range(repeticoes)]
+        mediana = statistics.median(m["ms"] for m in medidas)
+        carregados = [m for m in MODULOS_ADIADOS if m in medidas[-1]["modulos"]]
+        resultado["alvos"][alvo] = {
+            "mediana_ms": round(mediana, 1),
+            "limite_ms": limites[alvo],
+            "modulos": len(medidas[-1]["modulos"]),
+            "adiados_carregados": carregados,
+        }
+        if mediana > limites[alvo]:
+            resultado["violacoes"].append(f"{alvo}: {mediana:.0f} ms > limite de {limites[alvo]:.0f} ms")
+        for modulo in carregados:
+            resultado["violacoes"].append(f"{alvo}: '{modulo}' carregado na partida (deveria ser adiado)")
+    resultado["mais_lentos_create_app"] = _mais_lentos(ALVOS["create_app"][0])
+    return resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--limite", action="append", default=[], metavar="ALVO=MS",
+                        help=f"sobrescreve o limite de um alvo ({', '.join(ALVOS)})")
+    args = parser.parse_args()
+
+    limites = {alvo: float(limite) for alvo, (_, limite) in ALVOS.items()}
+    for item in args.limite:
+        alvo, _, valor = item.partition("=")
+        if alvo not in ALVOS or not valor:
+            parser.error(f"--limite inválido: {item}")
+        limites[alvo] = float(valor)
+
+    resultado = verificar(args.repeticoes, limites)
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    sys.exit(1 if resultado["violacoes"] else 0)
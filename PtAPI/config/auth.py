@@ -2,13 +2,13 @@
 import os
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
 from config.db import get_db
 from models.usuario import Usuario
+from services.cache_principal import cache_principal, snapshot_usuario
 
 # Carregar variáveis de ambiente
 SECRET_KEY = os.getenv("SECRET_KEY", "XtO1B5qaj5D6b3ogS1gZThYqrS2WSAqYcQ2WfUrRhxc")
@@ -22,22 +22,33 @@ def criar_token(usuario_id: int) -> str:
     """Cria um token JWT para o usuário"""
     expire = datetime.utcnow() + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
     to_encode = {"sub": str(usuario_id), "exp": expire}
+    from jose import jwt  # adiado: python-jose (+ ecdsa/rsa) só quando há token a emitir
+
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
-def verificar_token(token: str) -> Optional[int]:
-    """Verifica e decodifica um token JWT, retorna o ID do usuário"""
+def decodificar_token(token: str) -> Optional[dict]:
+    """Verifica e decodifica um token JWT, retorna o payload"""
+    from jose import JWTError, jwt
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        usuario_id: str = payload.get("sub")
-        if usuario_id is None:
-            return None
-        return int(usuario_id)
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         return None
 
 
+def verificar_token(token: str) -> Optional[int]:
+    """Verifica e decodifica um token JWT, retorna o ID do usuário"""
+    payload = decodificar_token(token)
+    if payload is None:
+        return None
+    usuario_id: str = payload.get("sub")
+    if usuario_id is None:
+        return None
+    return int(usuario_id)
+
+
 def obter_usuario_atual(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -45,6 +56,9 @@ def obter_usuario_atual(
     """
     Dependency para obter o usuário atual autenticado.
     Usar em rotas que requerem autenticação.
+
+    Retorna um snapshot somente leitura do usuário (sem o hash da senha),
+    servido do cache de principais enquanto o token for válido.
     
     Exemplo:
         @router.get("/protegida")
@@ -52,7 +66,12 @@ def obter_usuario_atual(
             return {"usuario_id": usuario_atual.id}
     """
     token = credentials.credentials
-    usuario_id = verificar_token(token)
+    usuario = cache_principal.obter(token)
+    if usuario is not None:
+        return usuario
+
+    payload = decodificar_token(token)
+    usuario_id = payload.get("sub") if payload else None
     
     if usuario_id is None:
         raise HTTPException(
@@ -61,7 +80,7 @@ def obter_usuario_atual(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    usuario = db.query(Usuario).filter(Usuario.id == usuario_id).first()
+    usuario = db.query(Usuario).filter(Usuario.id == int(usuario_id)).first()
     if usuario is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -69,4 +88,6 @@ def obter_usuario_atual(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    usuario = snapshot_usuario(usuario)
+    cache_principal.guardar(token, usuario, payload.get("exp"))
     return usuario
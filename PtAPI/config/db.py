@@ -1,33 +1,153 @@
 """Configuração do banco de dados"""
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 import os
 from dotenv import load_dotenv
 
+from config.pool import opcoes_engine, instrumentar_pool
+
+# Antes de tudo: os módulos de config/services leem o ambiente ao serem importados
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
-if not DATABASE_URL:
-    raise ValueError("DATABASE_URL não configurada. Adicione a variável no arquivo .env")
+
+
+def _exigir_url() -> str:
+    if not DATABASE_URL:
+        raise ValueError("DATABASE_URL não configurada. Adicione a variável no arquivo .env")
+    return DATABASE_URL
+
+
+# Drivers assíncronos equivalentes aos drivers síncronos usuais
+_DRIVERS_ASYNC = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def _url_async(url: str) -> str:
+    """Deriva a URL assíncrona a partir da síncrona (ex.: psycopg2 -> asyncpg)"""
+    url_obj = make_url(url)
+    backend = url_obj.get_backend_name()
+    if backend not in _DRIVERS_ASYNC:
+        raise ValueError(f"Sem driver assíncrono conhecido para '{backend}'. Defina ASYNC_DATABASE_URL")
+    return url_obj.set(drivername=_DRIVERS_ASYNC[backend]).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+
+def _ativar_fk_sqlite(engine):
+    """SQLite só valida FOREIGN KEY com o pragma; as rotas de criação dependem disso"""
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "connect")
+        def _pragma_fk(dbapi_conn, registro):
+            cursor = dbapi_conn.cursor()
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+
 
 # Base declarativa PRIMEIRO (antes de importar modelos)
 Base = declarative_base()
 
-# Engine
-db = create_engine(DATABASE_URL)
+# Engine (pool configurável via DB_POOL_* / DB_STATEMENT_TIMEOUT_MS, ver config/pool.py)
+# criado no primeiro uso: importar modelos (Alembic offline, scripts, testes)
+# não carrega o driver nem exige DATABASE_URL
+_engine = None
+
+
+def obter_engine():
+    """Retorna o Engine síncrono (criado sob demanda)"""
+    global _engine
+    if _engine is None:
+        url = _exigir_url()
+        engine = create_engine(url, **opcoes_engine(url))
+        instrumentar_pool(engine)
+        _ativar_fk_sqlite(engine)
+        SessionLocal.configure(bind=engine)
+        _engine = engine
+    return _engine
+
+
+class SessaoRoteada(Session):
+    """Session que lê de uma réplica quando `info["replica"]` existe (config/replicas.py)
+
+    Só SELECTs sem FOR UPDATE vão para a réplica; flush, INSERT/UPDATE/DELETE
+    e travas continuam no bind normal (primário). Sem réplica, igual a Session.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = self.info.get("replica")
+        if (
+            replica is not None and not self._flushing
+            and getattr(clause, "is_select", False) and getattr(clause, "_for_update_arg", None) is None
+        ):
+            return replica
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+class _FabricaSessoes(sessionmaker):
+    """sessionmaker que cria o engine ao abrir a primeira sessão"""
+
+    def __call__(self, **local_kw):
+        if _engine is None:
+            obter_engine()
+        return super().__call__(**local_kw)
+
 
 # SessionLocal para criar sessões
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=db)
+SessionLocal = _FabricaSessoes(class_=SessaoRoteada, autocommit=False, autoflush=False)
+
+
+def _descartar_pools_herdados():
+    """No processo filho de um fork: abandonar (sem fechar) as conexões do pai
+
+    Sockets herdados são do processo pai; usá-los nos dois lados corrompe o
+    protocolo. dispose(close=False) troca o pool por um novo e vazio sem
+    mandar nada pelas conexões antigas, que continuam válidas no pai.
+    """
+    if _engine is not None:
+        _engine.dispose(close=False)
+    if async_db is not None:
+        async_db.sync_engine.dispose(close=False)
+
+
+# Vale para qualquer fork (workers do servidor, multiprocessing), não só para serve.py
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_descartar_pools_herdados)
+
+
+def __getattr__(nome):
+    # `config.db.db` (engine síncrono) continua disponível pelo nome de sempre
+    if nome == "db":
+        return obter_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+
+# Engine/sessões assíncronas: criados no primeiro uso para que Alembic e
+# scripts síncronos não precisem do driver assíncrono instalado
+async_db = None
+AsyncSessionLocal = None
 
 
 def criar_tabelas():
-    """Cria todas as tabelas no banco de dados"""
+    """Cria todas as tabelas direto dos modelos (bancos descartáveis: benchmarks e testes)
+
+    Bancos de verdade usam `alembic upgrade head`; um banco criado por aqui e
+    mantido depois precisa de `alembic stamp head` antes da próxima migração.
+    """
     # Importar modelos AQUI para registrar no metadata
     from models.usuario import Usuario
     from models.cliente import Cliente, ClienteFisica, ClienteJuridica
     from models.socio import SocioRepresentante
     from models.contratos import Contratos, Imovel, Contratado
+    from models.busca import BuscaDocumento, BuscaTrigrama
+    from models.ocupacao import OcupacaoResumo
+    from models.faturamento import Cobranca, FaturamentoExecucao
+    from models.notificacao import Notificacao
     
-    Base.metadata.create_all(bind=db)
+    Base.metadata.create_all(bind=obter_engine())
     print(f"✅ Tabelas criadas: {list(Base.metadata.tables.keys())}")
 
 
@@ -39,3 +159,40 @@ def get_db():
     finally:
         database.close()
 
+
+def obter_async_engine():
+    """Retorna o AsyncEngine (criado sob demanda)"""
+    global async_db, AsyncSessionLocal
+    if async_db is None:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+        url = ASYNC_DATABASE_URL or _url_async(_exigir_url())
+        async_db = create_async_engine(url, **opcoes_engine(url, assincrono=True))
+        instrumentar_pool(async_db.sync_engine)
+        _ativar_fk_sqlite(async_db.sync_engine)
+        # expire_on_commit=False: objetos continuam legíveis após commit sem I/O implícito
+        AsyncSessionLocal = async_sessionmaker(
+            async_db, class_=AsyncSession, sync_session_class=SessaoRoteada,
+            autoflush=False, expire_on_commit=False,
+        )
+    return async_db
+
+
+def nova_sessao_async(**opcoes):
+    """Cria uma AsyncSession (para streams e tarefas fora da dependency)"""
+    obter_async_engine()
+    return AsyncSessionLocal(**opcoes)
+
+
+async def get_async_db():
+    """Dependency para injetar sessão assíncrona do banco em rotas async"""
+    async with nova_sessao_async() as database:
+        yield database
+
+
+async def encerrar_async_engine():
+    """Fecha o pool do AsyncEngine (chamar no shutdown da aplicação)"""
+    global async_db
+    if async_db is not None:
+        await async_db.dispose()
+        async_db = None
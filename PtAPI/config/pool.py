@@ -0,0 +1,188 @@
+"""Configuração e instrumentação do pool de conexões
+
+Variáveis de ambiente (valem para o engine síncrono e o assíncrono):
+- DB_POOL_SIZE: conexões mantidas abertas por processo (padrão: 5)
+- DB_MAX_OVERFLOW: conexões extras além do pool_size (padrão: 10)
+- DB_POOL_TIMEOUT: segundos esperando uma conexão livre antes de erro (padrão: 30)
+- DB_POOL_RECYCLE: recicla conexões mais velhas que N segundos, -1 desativa (padrão: 1800)
+- DB_POOL_PRE_PING: testa a conexão no checkout (padrão: true)
+- DB_STATEMENT_TIMEOUT_MS: timeout por statement no servidor, 0 desativa (padrão: 0; apenas PostgreSQL)
+"""
+import logging
+import os
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+from services.metricas import Histograma
+
+logger = logging.getLogger(__name__)
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "sim", "yes")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+
+class EstatisticasPool:
+    """Contadores de eventos do pool, independentes do driver"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.espera_checkout = Histograma()
+        self.checkouts = 0
+        self.checkins = 0
+        # acumulados: conexões abertas agora = em_uso + livres (status_pool)
+        self.conexoes_criadas = 0
+        self.conexoes_fechadas = 0
+        self.invalidacoes = 0
+        self.timeouts = 0
+        # falhas no checkout que não são espera esgotada (conexão recusada, autenticação...)
+        self.erros_checkout = 0
+        self.overflow_max = 0
+
+    def incrementar(self, campo: str, quantidade: int = 1) -> None:
+        with self._lock:
+            setattr(self, campo, getattr(self, campo) + quantidade)
+
+    def registrar_overflow(self, overflow: int) -> None:
+        with self._lock:
+            if overflow > self.overflow_max:
+                self.overflow_max = overflow
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            contadores = {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "conexoes_criadas": self.conexoes_criadas,
+                "conexoes_fechadas": self.conexoes_fechadas,
+                "invalidacoes": self.invalidacoes,
+                "timeouts": self.timeouts,
+                "erros_checkout": self.erros_checkout,
+                "overflow_max": self.overflow_max,
+            }
+        contadores["espera_checkout_s"] = self.espera_checkout.snapshot()
+        return contadores
+
+
+class _PoolInstrumentado:
+    """Mixin que mede o tempo de espera por conexão, os timeouts e as falhas de checkout"""
+
+    estatisticas: EstatisticasPool = None
+
+    def recreate(self):
+        # engine.dispose() recria o pool: manter o mesmo histórico de eventos
+        novo = super().recreate()
+        novo.estatisticas = self.estatisticas
+        return novo
+
+    def _do_get(self):
+        if self.estatisticas is None:
+            return super()._do_get()
+        inicio = time.perf_counter()
+        try:
+            conexao = super()._do_get()
+        except exc.TimeoutError:
+            # pool esgotado por mais que pool_timeout
+            self.estatisticas.incrementar("timeouts")
+            raise
+        except Exception:
+            self.estatisticas.incrementar("erros_checkout")
+            raise
+        self.estatisticas.espera_checkout.observar(time.perf_counter() - inicio)
+        self.estatisticas.registrar_overflow(max(0, self.overflow()))
+        return conexao
+
+
+class QueuePoolInstrumentado(_PoolInstrumentado, QueuePool):
+    pass
+
+
+class AsyncQueuePoolInstrumentado(_PoolInstrumentado, AsyncAdaptedQueuePool):
+    pass
+
+
+def opcoes_engine(url: str, assincrono: bool = False) -> Dict:
+    """kwargs para create_engine/create_async_engine a partir do ambiente"""
+    url_obj = make_url(url)
+    opcoes: Dict = {"pool_pre_ping": DB_POOL_PRE_PING}
+
+    # SQLite usa pools próprios (sem pool_size/overflow)
+    if url_obj.get_backend_name() != "sqlite":
+        opcoes.update(
+            poolclass=AsyncQueuePoolInstrumentado if assincrono else QueuePoolInstrumentado,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        if url_obj.get_backend_name() != "postgresql":
+            logger.warning("DB_STATEMENT_TIMEOUT_MS ignorado: suportado apenas em PostgreSQL")
+        elif url_obj.get_driver_name() == "asyncpg":
+            opcoes["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            opcoes["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return opcoes
+
+
+def instrumentar_pool(engine) -> EstatisticasPool:
+    """Registra listeners de pool no engine (síncrono) e retorna suas estatísticas"""
+    estatisticas = EstatisticasPool()
+    engine.pool.estatisticas = estatisticas
+
+    @event.listens_for(engine, "connect")
+    def _ao_conectar(dbapi_conn, registro):
+        estatisticas.incrementar("conexoes_criadas")
+
+    @event.listens_for(engine, "close")
+    def _ao_fechar(dbapi_conn, registro):
+        estatisticas.incrementar("conexoes_fechadas")
+
+    @event.listens_for(engine, "close_detached")
+    def _ao_fechar_desanexada(dbapi_conn):
+        estatisticas.incrementar("conexoes_fechadas")
+
+    @event.listens_for(engine, "checkout")
+    def _ao_checkout(dbapi_conn, registro, proxy):
+        estatisticas.incrementar("checkouts")
+
+    @event.listens_for(engine, "checkin")
+    def _ao_checkin(dbapi_conn, registro):
+        estatisticas.incrementar("checkins")
+
+    @event.listens_for(engine, "invalidate")
+    def _ao_invalidar(dbapi_conn, registro, excecao):
+        estatisticas.incrementar("invalidacoes")
+
+    @event.listens_for(engine, "soft_invalidate")
+    def _ao_invalidar_soft(dbapi_conn, registro, excecao):
+        estatisticas.incrementar("invalidacoes")
+
+    return estatisticas
+
+
+def status_pool(engine) -> Dict:
+    """Estado atual + histórico de eventos do pool de um engine"""
+    pool = engine.pool
+    estado = {"classe": type(pool).__name__, "status": pool.status()}
+    if hasattr(pool, "size"):
+        estado.update(
+            tamanho=pool.size(),
+            em_uso=pool.checkedout(),
+            livres=pool.checkedin(),
+            overflow=max(0, pool.overflow()),
+            max_overflow=getattr(pool, "_max_overflow", None),
+        )
+    estatisticas = getattr(pool, "estatisticas", None)
+    if estatisticas is not None:
+        estado["eventos"] = estatisticas.snapshot()
+    return estado
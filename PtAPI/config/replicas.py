@@ -0,0 +1,332 @@
+"""Réplicas de leitura: rotas só de leitura em réplicas, escritas no primário
+
+    DATABASE_REPLICA_URLS=postgresql+psycopg2://app@replica1/pt,postgresql+psycopg2://app@replica2/pt
+
+Rotas só de leitura (detalhe/listagem/contagem de imóveis, clientes,
+usuários, busca e painel) usam `get_db_leitura` / `get_async_db_leitura`:
+a sessão (config/db.SessaoRoteada) lê da réplica escolhida (rodízio entre as
+saudáveis) e manda flush, INSERT/UPDATE/DELETE e SELECT ... FOR UPDATE ao
+primário. Sem DATABASE_REPLICA_URLS tudo vai ao primário, como antes.
+
+- Ler a própria escrita: após uma escrita bem-sucedida (POST/PUT/PATCH/DELETE
+  com status < 400), o cliente lê do primário por REPLICA_JANELA_S segundos,
+  cobrindo o atraso da replicação. A resposta da escrita traz o cookie
+  `ler_primario` (prazo assinado com HMAC da SECRET_KEY, Max-Age = janela):
+  qualquer worker ou host valida o prazo sem estado compartilhado. Clientes
+  que não guardam cookies ficam marcados no processo que atendeu a escrita
+  (token de acesso, ou IP sem token) e, entre workers, podem mandar o header
+  `X-Ler-Primario: 1`.
+- Saúde: a conexão com a réplica é aberta (com pre-ping, DB_POOL_PRE_PING) antes
+  da rota; se falhar, a réplica fica fora por REPLICA_QUARENTENA_S e a leitura
+  vai para outra réplica ou para o primário. Desconexões durante uma consulta
+  também põem a réplica em quarentena (a requisição em curso falha).
+
+Variáveis de ambiente:
+- DATABASE_REPLICA_URLS: URLs síncronas separadas por vírgula (async derivada, como em config/db.py)
+- REPLICA_JANELA_S: segundos lendo do primário após uma escrita do cliente (padrão: 5)
+- REPLICA_QUARENTENA_S: segundos sem usar uma réplica após falha (padrão: 30)
+"""
+import hashlib
+import hmac
+import logging
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+
+from config.db import SessionLocal, _ativar_fk_sqlite, _url_async, nova_sessao_async
+from config.pool import instrumentar_pool, opcoes_engine, status_pool
+from services.cache_ttl import CacheTTL
+from services.rate_limit import identificar_cliente
+
+logger = logging.getLogger(__name__)
+
+DATABASE_REPLICA_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+REPLICA_JANELA_S = float(os.getenv("REPLICA_JANELA_S", "5"))
+REPLICA_QUARENTENA_S = float(os.getenv("REPLICA_QUARENTENA_S", "30"))
+
+_METODOS_ESCRITA = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+COOKIE_LEITURA_PROPRIA = "ler_primario"
+
+
+def _assinatura(prazo: str) -> str:
+    from config.auth import SECRET_KEY
+
+    return hmac.new(SECRET_KEY.encode(), f"{COOKIE_LEITURA_PROPRIA}:{prazo}".encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def marca_escrita(janela_s: float, agora: Optional[float] = None) -> str:
+    """Valor do cookie: prazo (epoch, para valer entre hosts) + assinatura"""
+    prazo = str(math.ceil((time.time() if agora is None else agora) + janela_s))
+    return f"{prazo}.{_assinatura(prazo)}"
+
+
+def marca_valida(valor: Optional[str], agora: Optional[float] = None) -> bool:
+    prazo, _, assinatura = (valor or "").partition(".")
+    if not prazo.isdigit() or not hmac.compare_digest(assinatura, _assinatura(prazo)):
+        return False
+    return int(prazo) >= (time.time() if agora is None else agora)
+
+
+class Replica:
+    """Uma réplica: engines síncrono/assíncrono (criados no primeiro uso) e estado de saúde"""
+
+    def __init__(self, indice: int, url: str, quarentena_s: float):
+        self.nome = f"replica{indice}"
+        self.url = url
+        self.quarentena_s = quarentena_s
+        self._engine = None
+        self._async_engine = None
+        self._lock = threading.Lock()
+        self.indisponivel_ate = 0.0
+        self.leituras = 0
+        self.falhas = 0
+        self.ultimo_erro: Optional[str] = None
+
+    @property
+    def disponivel(self) -> bool:
+        return time.monotonic() >= self.indisponivel_ate
+
+    def _preparar(self, engine) -> None:
+        instrumentar_pool(engine)
+        _ativar_fk_sqlite(engine)
+
+        @event.listens_for(engine, "handle_error")
+        def _erro(contexto):
+            if contexto.is_disconnect:
+                self.marcar_falha(contexto.original_exception)
+
+    def engine(self):
+        with self._lock:
+            if self._engine is None:
+                engine = create_engine(self.url, **opcoes_engine(self.url))
+                self._preparar(engine)
+                self._engine = engine
+            return self._engine
+
+    def async_engine(self):
+        with self._lock:
+            if self._async_engine is None:
+                from sqlalchemy.ext.asyncio import create_async_engine
+
+                url = _url_async(self.url)
+                engine = create_async_engine(url, **opcoes_engine(url, assincrono=True))
+                self._preparar(engine.sync_engine)
+                self._async_engine = engine
+            return self._async_engine
+
+    def marcar_falha(self, erro: BaseException) -> None:
+        with self._lock:
+            self.falhas += 1
+            self.indisponivel_ate = time.monotonic() + self.quarentena_s
+            self.ultimo_erro = f"{type(erro).__name__}: {erro}"[:200]
+        logger.warning(f"Réplica {self.nome} fora por {self.quarentena_s:.0f}s: {self.ultimo_erro}")
+
+    def registrar_leitura(self) -> None:
+        with self._lock:
+            self.leituras += 1
+
+    def descartar_pools_herdados(self) -> None:
+        if self._engine is not None:
+            self._engine.dispose(close=False)
+        if self._async_engine is not None:
+            self._async_engine.sync_engine.dispose(close=False)
+
+    async def encerrar(self) -> None:
+        if self._async_engine is not None:
+            await self._async_engine.dispose()
+            self._async_engine = None
+
+    def metricas(self) -> Dict:
+        with self._lock:
+            restante = max(0.0, self.indisponivel_ate - time.monotonic())
+            estado = {
+                "url": make_url(self.url).render_as_string(hide_password=True),
+                "disponivel": restante == 0,
+                "quarentena_restante_s": round(restante, 1),
+                "leituras": self.leituras,
+                "falhas": self.falhas,
+                "ultimo_erro": self.ultimo_erro,
+            }
+        pools = {}
+        if self._engine is not None:
+            pools["sync"] = status_pool(self._engine)
+        if self._async_engine is not None:
+            pools["async"] = status_pool(self._async_engine.sync_engine)
+        return {**estado, "pools": pools}
+
+
+class RoteadorLeitura:
+    """Escolhe a réplica de cada leitura (ou None = primário)"""
+
+    def __init__(self, urls: List[str], janela_s: float, quarentena_s: float):
+        self.replicas = [Replica(i, url, quarentena_s) for i, url in enumerate(urls)]
+        self.janela_s = janela_s
+        # cliente -> escreveu há menos de janela_s segundos (só neste processo; o cookie vale em todos)
+        self.escritas_recentes = CacheTTL(janela_s, max_itens=100_000)
+        self._lock = threading.Lock()
+        self._proxima = 0
+        self.leituras_primario = {"escrita_recente": 0, "forcado": 0, "sem_replica": 0}
+
+    @property
+    def ativo(self) -> bool:
+        return bool(self.replicas)
+
+    @staticmethod
+    def cliente(request: Request) -> str:
+        """Token de acesso (hash) quando houver; senão, o IP"""
+        autorizacao = request.headers.get("authorization")
+        if autorizacao:
+            return hashlib.blake2b(autorizacao.encode(), digest_size=16).hexdigest()
+        return identificar_cliente(request)
+
+    def registrar_escrita(self, request: Request) -> bytes:
+        """Marca o cliente neste processo e devolve o Set-Cookie da marca assinada"""
+        self.escritas_recentes.guardar(self.cliente(request), True)
+        cookie = (
+            f"{COOKIE_LEITURA_PROPRIA}={marca_escrita(self.janela_s)}; Max-Age={math.ceil(self.janela_s)}; "
+            "Path=/; HttpOnly; SameSite=Lax"
+        )
+        if request.url.scheme == "https":
+            cookie += "; Secure"
+        return cookie.encode("latin-1")
+
+    def _contar_primario(self, motivo: str) -> None:
+        with self._lock:
+            self.leituras_primario[motivo] += 1
+
+    def candidatas(self, request: Request) -> List[Replica]:
+        """Réplicas saudáveis a tentar, em rodízio; vazia quando a leitura deve ir ao primário"""
+        if not self.replicas:
+            return []
+        if request.headers.get("x-ler-primario", "").lower() in ("1", "true", "sim"):
+            self._contar_primario("forcado")
+            return []
+        if marca_valida(request.cookies.get(COOKIE_LEITURA_PROPRIA)) or self.escritas_recentes.obter(self.cliente(request)):
+            self._contar_primario("escrita_recente")
+            return []
+        with self._lock:
+            inicio = self._proxima
+            self._proxima = (self._proxima + 1) % len(self.replicas)
+        ordem = self.replicas[inicio:] + self.replicas[:inicio]
+        disponiveis = [r for r in ordem if r.disponivel]
+        if not disponiveis:
+            self._contar_primario("sem_replica")
+        return disponiveis
+
+    def conectar(self, request: Request):
+        """Conexão síncrona aberta em uma réplica saudável, ou None (primário)"""
+        candidatas = self.candidatas(request)
+        for replica in candidatas:
+            try:
+                conexao = replica.engine().connect()
+            except DBAPIError as erro:
+                replica.marcar_falha(erro)
+                continue
+            replica.registrar_leitura()
+            return conexao
+        if candidatas:
+            self._contar_primario("sem_replica")
+        return None
+
+    async def conectar_async(self, request: Request):
+        """AsyncConnection aberta em uma réplica saudável, ou None (primário)"""
+        candidatas = self.candidatas(request)
+        for replica in candidatas:
+            try:
+                conexao = await replica.async_engine().connect()
+            except DBAPIError as erro:
+                replica.marcar_falha(erro)
+                continue
+            replica.registrar_leitura()
+            return conexao
+        if candidatas:
+            self._contar_primario("sem_replica")
+        return None
+
+    def pools(self) -> Dict[str, Dict]:
+        """Estado dos pools já criados, para /metrics"""
+        pools = {}
+        for replica in self.replicas:
+            for tipo, estado in replica.metricas()["pools"].items():
+                pools[f"{replica.nome}_{tipo}"] = estado
+        return pools
+
+    async def encerrar(self) -> None:
+        for replica in self.replicas:
+            await replica.encerrar()
+
+    def metricas(self) -> Dict:
+        with self._lock:
+            primario = dict(self.leituras_primario)
+        return {
+            "ativo": self.ativo,
+            "janela_s": self.janela_s,
+            "clientes_na_janela": self.escritas_recentes.metricas()["itens"],
+            "leituras_primario": primario,
+            "replicas": {r.nome: r.metricas() for r in self.replicas},
+        }
+
+
+roteador_leitura = RoteadorLeitura(DATABASE_REPLICA_URLS, REPLICA_JANELA_S, REPLICA_QUARENTENA_S)
+
+
+def _descartar_pools_herdados():
+    # Mesmo motivo de config/db._descartar_pools_herdados
+    for replica in roteador_leitura.replicas:
+        replica.descartar_pools_herdados()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_descartar_pools_herdados)
+
+
+def get_db_leitura(request: Request):
+    """Dependency para rotas síncronas só de leitura (réplica, se houver)"""
+    conexao = roteador_leitura.conectar(request)
+    database = SessionLocal(info={"replica": conexao} if conexao is not None else {})
+    try:
+        yield database
+    finally:
+        database.close()
+        if conexao is not None:
+            conexao.close()
+
+
+async def get_async_db_leitura(request: Request):
+    """Dependency para rotas async só de leitura (réplica, se houver)"""
+    conexao = await roteador_leitura.conectar_async(request)
+    try:
+        info = {"replica": conexao.sync_connection} if conexao is not None else {}
+        async with nova_sessao_async(info=info) as database:
+            yield database
+    finally:
+        if conexao is not None:
+            await conexao.close()
+
+
+class MiddlewareLeituraPropria:
+    """Marca o cliente após uma escrita bem-sucedida: processo + cookie (ASGI puro; só com réplicas)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in _METODOS_ESCRITA:
+            await self.app(scope, receive, send)
+            return
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start" and mensagem["status"] < 400:
+                cookie = roteador_leitura.registrar_escrita(Request(scope))
+                mensagem = {**mensagem, "headers": [*mensagem.get("headers", []), (b"set-cookie", cookie)]}
+            await send(mensagem)
+
+        await self.app(scope, receive, send=enviar)
@@ -1,17 +1,15 @@
-"""Aplicação FastAPI - Gestão de Clientes e Usuários"""
+"""Aplicação FastAPI - Gestão de Clientes e Usuários
+
+A aplicação é montada por create_app(): importar este módulo não cria
+engine, não importa as rotas nem as dependências delas. Servidores:
+
+    uvicorn main:create_app --factory
+    uvicorn main:app            # `app` é criado no primeiro acesso
+"""
 import os
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
 from contextlib import asynccontextmanager
-from dotenv import load_dotenv
 
-from config.db import criar_tabelas
-from routes.auth import auth_router
-from routes.requisicao import requisicao_router
-from routes.imovel import imovel_router
+from dotenv import load_dotenv
 
 load_dotenv()
 
@@ -25,47 +23,109 @@ load_dotenv()
 #     # Shutdown (opcional)
 
 
-# Inicializar app com suporte a rate limit
-# limiter = Limiter(key_func=get_remote_address)
-app = FastAPI(
-    title="PtAPI",
-    description="Sistema de Gestão de Clientes e Usuários",
-    version="1.0.0",
-    # lifespan=lifespan
-)
-
-# Configurar CORS
-# Obter origens permitidas da variável de ambiente ou usar padrão seguro
-allowed_origins_str = os.getenv("ALLOWED_ORIGINS", "")
-allowed_origins = [origin.strip() for origin in allowed_origins_str.split(",") if origin.strip()]
-
-# Se não houver origens configuradas, usar lista vazia (mais seguro)
-# Em desenvolvimento, você pode usar: ALLOWED_ORIGINS=http://localhost:3000,http://localhost:8000
-if not allowed_origins:
-    # Em produção, defina ALLOWED_ORIGINS no .env
-    # Para desenvolvimento local, descomente a linha abaixo:
-    # allowed_origins = ["http://localhost:3000", "http://localhost:8000", "http://127.0.0.1:8000"]
-    allowed_origins = []
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=allowed_origins,
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
-    allow_headers=["*"],
-    expose_headers=["*"],
-)
-
-# app.state.limiter = limiter
-# app.add_exception_handler(RateLimitExceeded, lambda request, exc: {"detail": "Rate limit exceeded"})
-
-# Incluir rotas
-app.include_router(auth_router)
-app.include_router(requisicao_router)
-app.include_router(imovel_router)
-
-
-@app.get("/")
-def root():
-    """Health check"""
-    return {"message": "PtAPI v1.0.0 - Tudo funcionando! ✅"}
+def _montar_indice_busca():
+    from config.db import SessionLocal
+    from services.busca import reconstruir_indice
+
+    with SessionLocal() as sessao:
+        reconstruir_indice(sessao)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    from fastapi.concurrency import run_in_threadpool
+
+    from config.db import encerrar_async_engine
+    from config.replicas import roteador_leitura
+    from services.busca import BUSCA_INDEXAR_NA_PARTIDA, indice_busca
+    from services.hashing import executor_hashing
+    from services.pdf_iptu import executor_pdf
+
+    # Índice de busca em memória é por processo: montar antes de atender
+    if not indice_busca.transacional and BUSCA_INDEXAR_NA_PARTIDA:
+        await run_in_threadpool(_montar_indice_busca)
+    yield
+    # Shutdown: encerrar pools de processos (hash de senhas e PDFs)
+    executor_hashing.encerrar()
+    executor_pdf.encerrar()
+    await encerrar_async_engine()
+    await roteador_leitura.encerrar()
+
+
+def create_app():
+    """Monta a aplicação: middlewares, rotas e ciclo de vida"""
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+
+    from config.replicas import MiddlewareLeituraPropria, roteador_leitura
+    from routes import (
+        auth_router, requisicao_router, imovel_router, interno_router, busca_router,
+        cliente_router, dashboard_router, metricas_router,
+    )
+    from services.telemetria import MiddlewareTelemetria
+
+    # Rate limit por rota: services/rate_limit.py
+    aplicacao = FastAPI(
+        title="PtAPI",
+        description="Sistema de Gestão de Clientes e Usuários",
+        version="1.0.0",
+        lifespan=lifespan,
+        # Sem default_response_class: com ela o FastAPI desliga o dump_json do pydantic
+        # nas rotas com response_model. As que pulam a revalidação usam services/json_rapido.
+    )
+
+    # Configurar CORS
+    # Obter origens permitidas da variável de ambiente ou usar padrão seguro
+    allowed_origins_str = os.getenv("ALLOWED_ORIGINS", "")
+    allowed_origins = [origin.strip() for origin in allowed_origins_str.split(",") if origin.strip()]
+
+    # Se não houver origens configuradas, usar lista vazia (mais seguro)
+    # Em desenvolvimento, você pode usar: ALLOWED_ORIGINS=http://localhost:3000,http://localhost:8000
+    if not allowed_origins:
+        # Em produção, defina ALLOWED_ORIGINS no .env
+        # Para desenvolvimento local, descomente a linha abaixo:
+        # allowed_origins = ["http://localhost:3000", "http://localhost:8000", "http://127.0.0.1:8000"]
+        allowed_origins = []
+
+    aplicacao.add_middleware(
+        CORSMiddleware,
+        allow_origins=allowed_origins,
+        allow_credentials=True,
+        allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
+        allow_headers=["*"],
+        expose_headers=["*"],
+    )
+
+    # Ler a própria escrita: só faz sentido com réplicas (config/replicas.py)
+    if roteador_leitura.ativo:
+        aplicacao.add_middleware(MiddlewareLeituraPropria)
+
+    # Adicionado por último = mais externo: a latência medida inclui o CORS
+    aplicacao.add_middleware(MiddlewareTelemetria)
+
+    # Incluir rotas
+    for router in (
+        auth_router, requisicao_router, imovel_router, interno_router, busca_router,
+        cliente_router, dashboard_router, metricas_router,
+    ):
+        aplicacao.include_router(router)
+
+    @aplicacao.get("/")
+    def root():
+        """Health check"""
+        return {"message": "PtAPI v1.0.0 - Tudo funcionando! ✅"}
+
+    return aplicacao
+
+
+_app = None
+
+
+def __getattr__(nome):
+    # `from main import app` / `uvicorn main:app`: uma instância por processo, criada no primeiro acesso
+    global _app
+    if nome == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
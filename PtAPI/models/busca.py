@@ -0,0 +1,25 @@
+"""Tabelas do índice de busca por trigramas (backend "tabela" de services/busca)"""
+from sqlalchemy import Column, Integer, String, Text, Index
+from config.db import Base
+
+
+class BuscaDocumento(Base):
+    __tablename__ = "busca_documentos"
+
+    tipo = Column(String(20), primary_key=True)  # 'cliente' ou 'imovel'
+    entidade_id = Column(Integer, primary_key=True)
+    rotulo = Column(String, nullable=False)
+    texto = Column(Text, nullable=False)  # campos normalizados, um por linha
+
+
+class BuscaTrigrama(Base):
+    __tablename__ = "busca_trigramas"
+
+    # PK começando pelo trigrama: é a lista de documentos do trigrama
+    trigrama = Column(String(3), primary_key=True)
+    tipo = Column(String(20), primary_key=True)
+    entidade_id = Column(Integer, primary_key=True)
+
+    __table_args__ = (
+        Index("ix_busca_trigramas_documento", "tipo", "entidade_id"),
+    )
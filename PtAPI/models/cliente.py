@@ -1,7 +1,7 @@
 """Modelos de Cliente (PF e PJ com herança)"""
-from sqlalchemy import Column, Integer, String, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy_utils.types import ChoiceType
+from models.tipos import ChoiceType
 from config.db import Base
 
 
@@ -22,6 +22,11 @@ class Cliente(Base):
         "polymorphic_on": tipo
     }
 
+    # Listagem por tipo em ordem de id (GET /clientes?tipo=)
+    __table_args__ = (
+        Index("ix_clientes_tipo_id", "tipo", "id"),
+    )
+
     # 1 Cliente -> N Contratos
     contratos = relationship(
         "Contratos",
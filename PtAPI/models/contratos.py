@@ -1,15 +1,12 @@
 
 
-from sqlalchemy import Column, Integer, String, ForeignKey, Float, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, Float, DateTime, Date, Boolean, Text, Index, Numeric
 from sqlalchemy.orm import relationship
-from sqlalchemy_utils.types import ChoiceType
+from models.tipos import ChoiceType
 from datetime import datetime
-import io
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import mm
-from reportlab.pdfgen import canvas
 
 from config.db import Base
+from services.rateio import distribuir_iptu
 
 
 class Contratado(Base):
@@ -36,12 +33,23 @@ class Contratos(Base):
     contratado_id = Column(Integer, ForeignKey("contratados.id"), nullable=False)
     detalhes = Column(String, nullable=False)
 
+    # Condições de aluguel (services/faturamento): sem valor ou dia de vencimento, não gera cobrança
+    valor_aluguel = Column(Numeric(12, 2), nullable=True)
+    # 1 a 31; em meses mais curtos, vence no último dia
+    dia_vencimento = Column(Integer, nullable=True)
+    data_inicio = Column(Date, nullable=True)
+    # sem data_fim: vigente por prazo indeterminado
+    data_fim = Column(Date, nullable=True)
+
     # N Contratos -> 1 Cliente
     cliente = relationship("Cliente", back_populates="contratos")
 
     # N Contratos -> 1 Contratado
     contratado = relationship("Contratado", back_populates="contratos")
 
+    # Unidades alugadas por este contrato (ImovelUnidade.contrato_id)
+    unidades = relationship("ImovelUnidade", back_populates="contrato")
+
 
 class Imovel(Base):
     __tablename__ = "imoveis"
@@ -66,86 +74,45 @@ class Imovel(Base):
     # Vinculo com cliente proprietário
     cliente_id = Column(Integer, ForeignKey("clientes.id"), nullable=False)
 
+    # Versão da linha (controle otimista); também sobe quando unidades/registros/contas mudam
+    versao = Column(Integer, nullable=False, server_default="1")
+
     # Relacionamentos
     cliente = relationship("Cliente", back_populates="imoveis")
     unidades = relationship("ImovelUnidade", back_populates="imovel", cascade="all, delete-orphan")
     registros = relationship("RegistroMatricula", back_populates="imovel", cascade="all, delete-orphan")
     contas = relationship("ContaServico", back_populates="imovel", cascade="all, delete-orphan")
 
+    # Índices de listagem/busca (migração 3f1a9c2d7b10)
+    __table_args__ = (
+        Index("ix_imoveis_cliente_id_id", "cliente_id", "id"),
+        Index("ix_imoveis_estado_municipio_bairro_id", "estado", "municipio", "bairro", "id"),
+        Index("ix_imoveis_status_ocupacao_id", "status_ocupacao", "id"),
+        Index("ix_imoveis_area_total_m2", "area_total_m2"),
+        Index("ix_imoveis_cep", "cep", postgresql_ops={"cep": "text_pattern_ops"}),
+    )
+    __mapper_args__ = {"version_id_col": versao}
+
     def calcular_iptu_proporcional(self, valor_total_iptu: float, desconto_cota_unica: float = 0.0):
         """Calcula a distribuição proporcional do IPTU por unidade com base na área.
 
+        Os valores são rateados em centavos (maior resto), então a soma das unidades
+        fecha exatamente com o valor total.
+
         Retorna uma lista de dicionários com (unidade_id, nome, area_m2, iptu_proporcional, iptu_com_desconto)
         """
-        unidades = [u for u in self.unidades if u.area_m2 and u.area_m2 > 0]
-        total_area_locada = sum(u.area_m2 for u in unidades)
-        if total_area_locada == 0:
-            return []
-
-        resultado = []
-        for u in unidades:
-            proporcao = u.area_m2 / total_area_locada
-            iptu = round(valor_total_iptu * proporcao, 2)
-            iptu_descontado = round((valor_total_iptu - desconto_cota_unica) * proporcao, 2) if desconto_cota_unica else iptu
-            resultado.append({
-                'unidade_id': u.id,
-                'nome_unidade': u.nome_unidade,
-                'area_m2': u.area_m2,
-                'iptu': iptu,
-                'iptu_com_desconto': iptu_descontado
-            })
-        return resultado
-
-    # def gerar_pdf_iptu_por_unidade(self, unidade, valor_total_iptu: float, desconto_cota_unica: float = 0.0) -> bytes:
-    #     """Gera um PDF simples com o cálculo do IPTU para a unidade fornecida e retorna bytes.
-
-    #     Dependência: reportlab (pip install reportlab)
-    #     """
-    #     buffer = io.BytesIO()
-    #     c = canvas.Canvas(buffer, pagesize=A4)
-    #     width, height = A4
-
-    #     margem = 20 * mm
-    #     y = height - margem
-
-    #     c.setFont('Helvetica-Bold', 14)
-    #     c.drawString(margem, y, f'Comprovante de Cálculo de IPTU - {unidade.nome_unidade}')
-    #     y -= 12 * mm
-
-    #     c.setFont('Helvetica', 11)
-    #     c.drawString(margem, y, f'Imóvel: {self.rua}, {self.numero} - {self.bairro} / {self.municipio}-{self.estado}')
-    #     y -= 8 * mm
-    #     c.drawString(margem, y, f'Unidade: {unidade.nome_unidade} | Área: {unidade.area_m2} m²')
-    #     y -= 8 * mm
-    #     c.drawString(margem, y, f'Valor total IPTU: R$ {valor_total_iptu:.2f}')
-    #     y -= 8 * mm
-    #     if desconto_cota_unica:
-    #         c.drawString(margem, y, f'Desconto cota única aplicado: R$ {desconto_cota_unica:.2f}')
-    #         y -= 8 * mm
-
-    #     # cálculo proporcional
-    #     distribuicao = self.calcular_iptu_proporcional(valor_total_iptu, desconto_cota_unica)
-    #     encontrado = next((d for d in distribuicao if d['unidade_id'] == unidade.id), None)
-    #     if encontrado:
-    #         c.drawString(margem, y, f'IPTU proporcional (sem desconto): R$ {encontrado["iptu"]:.2f}')
-    #         y -= 8 * mm
-    #         c.drawString(margem, y, f'IPTU proporcional (com desconto): R$ {encontrado["iptu_com_desconto"]:.2f}')
-    #         y -= 12 * mm
-
-    #     c.setFont('Helvetica-Oblique', 9)
-    #     c.drawString(margem, y, f'Gerado em: {datetime.utcnow().isoformat()} UTC')
-
-    #     c.showPage()
-    #     c.save()
-    #     buffer.seek(0)
-    #     return buffer.read()
+        unidades = [
+            {'unidade_id': u.id, 'nome_unidade': u.nome_unidade, 'area_m2': u.area_m2}
+            for u in self.unidades if u.area_m2 and u.area_m2 > 0
+        ]
+        return distribuir_iptu(unidades, valor_total_iptu, desconto_cota_unica)
 
 
 class ImovelUnidade(Base):
     __tablename__ = "imovel_unidades"
 
     id = Column(Integer, primary_key=True)
-    imovel_id = Column(Integer, ForeignKey("imoveis.id"), nullable=False)
+    imovel_id = Column(Integer, ForeignKey("imoveis.id"), nullable=False, index=True)
     nome_unidade = Column(String, nullable=False)
     area_m2 = Column(Float, nullable=False, default=0.0)
     descricao = Column(Text, nullable=True)
@@ -156,34 +123,50 @@ class ImovelUnidade(Base):
     # Status de ocupação por unidade
     status = Column(ChoiceType([('ocupado', 'Ocupado'), ('desocupado', 'Desocupado')]), default='desocupado', nullable=False)
 
+    # Versão da linha (controle otimista); mudanças também sobem a versão do imóvel
+    versao = Column(Integer, nullable=False, server_default="1")
+
     imovel = relationship("Imovel", back_populates="unidades")
-    contrato = relationship("Contratos")
+    contrato = relationship("Contratos", back_populates="unidades")
+
+    __mapper_args__ = {"version_id_col": versao}
 
 
 class RegistroMatricula(Base):
     __tablename__ = "registro_matriculas"
 
     id = Column(Integer, primary_key=True)
-    imovel_id = Column(Integer, ForeignKey("imoveis.id"), nullable=False)
+    imovel_id = Column(Integer, ForeignKey("imoveis.id"), nullable=False, index=True)
     matricula = Column(String, nullable=False)
     cartorio = Column(String, nullable=False)
     cnm = Column(String, nullable=True)
     inscricao_municipal = Column(String, nullable=True)
     data_registro = Column(DateTime, default=datetime.utcnow)
     atual = Column(Boolean, default=False)
+    versao = Column(Integer, nullable=False, server_default="1")
 
     imovel = relationship("Imovel", back_populates="registros")
 
+    __mapper_args__ = {"version_id_col": versao}
+
 
 class ContaServico(Base):
     __tablename__ = "contas_servicos"
 
     id = Column(Integer, primary_key=True)
-    imovel_id = Column(Integer, ForeignKey("imoveis.id"), nullable=False)
+    imovel_id = Column(Integer, ForeignKey("imoveis.id"), nullable=False, index=True)
     tipo = Column(ChoiceType([('energia', 'Energia'), ('agua', 'Água'), ('telefonia', 'Telefonia'), ('outro', 'Outro')]), nullable=False)
     numero_conta = Column(String, nullable=False)
     fornecedor = Column(String, nullable=True)
     status = Column(ChoiceType([('ativo', 'Ativo'), ('suspenso', 'Suspenso'), ('encerrado', 'Encerrado')]), default='ativo', nullable=False)
     observacoes = Column(Text, nullable=True)
+    # Dia do mês em que a fatura vence (1 a 31; lembretes em services/notificacoes)
+    dia_vencimento = Column(Integer, nullable=True)
+    versao = Column(Integer, nullable=False, server_default="1")
 
     imovel = relationship("Imovel", back_populates="contas")
+
+    __table_args__ = (
+        Index("ix_contas_servicos_dia_vencimento_id", "dia_vencimento", "id"),
+    )
+    __mapper_args__ = {"version_id_col": versao}
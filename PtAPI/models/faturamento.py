@@ -0,0 +1,44 @@
+"""Cobranças mensais de aluguel e execuções do faturamento (services/faturamento)"""
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, ForeignKey, Date, DateTime, Numeric, String, UniqueConstraint, Index
+from sqlalchemy.orm import relationship
+
+from config.db import Base
+from models.tipos import ChoiceType
+
+
+class Cobranca(Base):
+    __tablename__ = "cobrancas"
+
+    id = Column(Integer, primary_key=True)
+    contrato_id = Column(Integer, ForeignKey("contratos.id"), nullable=False)
+    # primeiro dia do mês de referência
+    competencia = Column(Date, nullable=False)
+    valor = Column(Numeric(12, 2), nullable=False)
+    vencimento = Column(Date, nullable=False)
+    status = Column(ChoiceType([('pendente', 'Pendente'), ('paga', 'Paga'), ('cancelada', 'Cancelada')]), default='pendente', nullable=False)
+    criado_em = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    contrato = relationship("Contratos")
+
+    __table_args__ = (
+        # uma cobrança por contrato e competência: o faturamento pode ser repetido sem duplicar
+        UniqueConstraint("contrato_id", "competencia", name="uq_cobrancas_contrato_competencia"),
+        Index("ix_cobrancas_competencia_contrato", "competencia", "contrato_id"),
+        # lembretes de vencimento (services/notificacoes): pendentes por data, em ordem de id
+        Index("ix_cobrancas_status_vencimento_id", "status", "vencimento", "id"),
+    )
+
+
+class FaturamentoExecucao(Base):
+    __tablename__ = "faturamento_execucoes"
+
+    # uma linha por competência; o progresso é gravado na transação de cada lote
+    competencia = Column(Date, primary_key=True)
+    status = Column(String(20), nullable=False, default="em_andamento")  # 'em_andamento' ou 'concluida'
+    ultimo_contrato_id = Column(Integer, nullable=False, default=0)
+    cobrancas_geradas = Column(Integer, nullable=False, default=0)
+    lotes = Column(Integer, nullable=False, default=0)
+    iniciada_em = Column(DateTime, default=datetime.utcnow, nullable=False)
+    concluida_em = Column(DateTime, nullable=True)
@@ -0,0 +1,30 @@
+"""Caixa de saída de notificações (services/notificacoes)"""
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+
+from config.db import Base
+
+
+class Notificacao(Base):
+    __tablename__ = "notificacoes"
+
+    id = Column(Integer, primary_key=True)
+    # identifica o lembrete (ex.: "cobranca:17:2026-11-10"): o agendador nunca grava dois iguais
+    chave = Column(String, nullable=False, unique=True)
+    destinatario = Column(String, nullable=False)
+    assunto = Column(String, nullable=False)
+    corpo = Column(Text, nullable=False)
+    status = Column(String(20), nullable=False, default="pendente")  # 'pendente', 'enviada' ou 'falha'
+    tentativas = Column(Integer, nullable=False, default=0)
+    proxima_tentativa_em = Column(DateTime, default=datetime.utcnow, nullable=False)
+    erro = Column(Text, nullable=True)
+    criado_em = Column(DateTime, default=datetime.utcnow, nullable=False)
+    enviado_em = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # fila de entrega: pendentes já liberadas, em ordem de id
+        Index("ix_notificacoes_status_proxima_tentativa", "status", "proxima_tentativa_em", "id"),
+        # limite por destinatário: enviadas na janela
+        Index("ix_notificacoes_destinatario_enviado_em", "destinatario", "enviado_em"),
+    )
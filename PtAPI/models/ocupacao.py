@@ -0,0 +1,18 @@
+"""Resumo de ocupação mantido incrementalmente (services/ocupacao)"""
+from sqlalchemy import Column, Integer, String, Float
+from config.db import Base
+
+
+class OcupacaoResumo(Base):
+    __tablename__ = "ocupacao_resumo"
+
+    # nivel: 'total', 'estado', 'municipio' (chave "UF/Município"), 'cliente' ou 'imovel' (chave = id)
+    nivel = Column(String(20), primary_key=True)
+    chave = Column(String, primary_key=True)
+
+    imoveis_ocupados = Column(Integer, nullable=False, default=0)
+    imoveis_desocupados = Column(Integer, nullable=False, default=0)
+    unidades_ocupadas = Column(Integer, nullable=False, default=0)
+    unidades_desocupadas = Column(Integer, nullable=False, default=0)
+    area_ocupada_m2 = Column(Float, nullable=False, default=0.0)
+    area_desocupada_m2 = Column(Float, nullable=False, default=0.0)
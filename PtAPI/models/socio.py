@@ -1,7 +1,7 @@
 """Modelo de Sócio/Representante"""
 from sqlalchemy import Column, Integer, ForeignKey, Date
 from sqlalchemy.orm import relationship
-from sqlalchemy_utils.types import ChoiceType
+from models.tipos import ChoiceType
 from config.db import Base
 
 
@@ -9,8 +9,8 @@ class SocioRepresentante(Base):
     __tablename__ = "socios_representantes"
     
     id = Column(Integer, primary_key=True)
-    empresa_id = Column(Integer, ForeignKey("clientes_juridica.id"), nullable=False)
-    pessoa_fisica_id = Column(Integer, ForeignKey("clientes_fisica.id"), nullable=False)
+    empresa_id = Column(Integer, ForeignKey("clientes_juridica.id"), nullable=False, index=True)
+    pessoa_fisica_id = Column(Integer, ForeignKey("clientes_fisica.id"), nullable=False, index=True)
     cargo = Column(
         ChoiceType([
             ('socio', 'Sócio'),
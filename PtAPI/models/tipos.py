@@ -0,0 +1,59 @@
+"""Tipos de coluna compartilhados pelos modelos"""
+from sqlalchemy import types
+
+
+class Choice:
+    """Opção de uma coluna ChoiceType: código gravado no banco + rótulo"""
+
+    __slots__ = ("code", "value")
+
+    def __init__(self, code, value):
+        self.code = code
+        self.value = value
+
+    def __eq__(self, other):
+        if isinstance(other, Choice):
+            return self.code == other.code
+        return other == self.code
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    def __hash__(self):
+        return hash(self.code)
+
+    def __str__(self):
+        return str(self.value)
+
+    def __repr__(self):
+        return f"Choice(code={self.code!r}, value={self.value!r})"
+
+
+class ChoiceType(types.TypeDecorator):
+    """Coluna de opções fixas: grava o código, devolve Choice(code, value)
+
+    Mesmo contrato do ChoiceType do sqlalchemy_utils (usado até aqui), sem
+    importar o pacote inteiro na partida (~140 ms, passlib incluído).
+    """
+
+    impl = types.Unicode(255)
+    cache_ok = True
+
+    def __init__(self, choices):
+        super().__init__()
+        self.choices = tuple(choices)
+        self._rotulos = dict(self.choices)
+
+    @property
+    def python_type(self):
+        return str
+
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, Choice):
+            return value.code
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return Choice(value, self._rotulos[value])
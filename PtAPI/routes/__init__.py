@@ -2,5 +2,10 @@
 from routes.auth import auth_router
 from routes.requisicao import requisicao_router
 from routes.imovel import imovel_router
+from routes.interno import interno_router
+from routes.busca import busca_router
+from routes.cliente import cliente_router
+from routes.dashboard import dashboard_router
+from routes.metricas import metricas_router
 
-__all__ = ["auth_router", "requisicao_router", "imovel_router"]
+__all__ = ["auth_router", "requisicao_router", "imovel_router", "interno_router", "busca_router", "cliente_router", "dashboard_router", "metricas_router"]
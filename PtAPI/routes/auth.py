@@ -1,75 +1,86 @@
 """Rotas de Autenticação e Usuários"""
 from fastapi import APIRouter, HTTPException, status, Request, Depends, Query
-from typing import List
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 import logging
 import re
-from passlib.context import CryptContext
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
 
 from config.db import SessionLocal, get_db
 from config.auth import criar_token, obter_usuario_atual
+from config.replicas import get_db_leitura
 from models.usuario import Usuario
 from schemas.usuario_schema import UsuarioCreate, UsuarioResponse, UsuarioLogin, TokenResponse
+from services.integridade import coluna_violada
+from services.hashing import hash_senha, verificar_senha, HashingSobrecarregado
+from services.json_rapido import dumps, resposta_linhas, resposta_modelo
+from services.paginacao import codificar_cursor, decodificar_cursor
+from services.rate_limit import limitar
 
 # Configuração de logging
 logger = logging.getLogger(__name__)
 
-# Configuração de hash de senha com argon2
-pwd_context = CryptContext(schemes=["argon2","bcrypt"], deprecated="auto")
+auth_router = APIRouter(prefix="/auth", tags=["autenticacao"])
 
-# Rate limiter: máximo 5 cadastros por minuto
-limiter = Limiter(key_func=get_remote_address)
 
-auth_router = APIRouter(prefix="/auth", tags=["autenticacao"])
+def log_cadastro(email: str, status_code: int, detalhes: str = ""):
+    """Log de cadastro sem expor dados sensíveis"""
+    logger.info(f"Cadastro - Email: {email[:3]}***@***.*** | Status: {status_code} | {detalhes}")
 
 
-def hash_senha(senha: str) -> str:
-    """Hash da senha usando argon2"""
-    return pwd_context.hash(senha)
+def erro_hashing_sobrecarregado() -> HTTPException:
+    """503 quando a fila do executor de hash está cheia (cliente deve tentar de novo)"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Serviço de autenticação sobrecarregado, tente novamente em instantes",
+        headers={"Retry-After": "1"},
+    )
 
 
-def verificar_senha(senha_plana: str, senha_hash: str) -> bool:
-    """Verifica se a senha plana corresponde ao hash"""
-    return pwd_context.verify(senha_plana, senha_hash)
+def _buscar_usuario_por_email(db, email: str):
+    return db.query(Usuario).filter(Usuario.email == email).first()
 
 
-def log_cadastro(email: str, status_code: int, detalhes: str = ""):
-    """Log de cadastro sem expor dados sensíveis"""
-    logger.info(f"Cadastro - Email: {email[:3]}***@***.*** | Status: {status_code} | {detalhes}")
+# Duplicidade detectada pelas constraints UNIQUE: coluna -> mensagem do 400
+DUPLICIDADES_USUARIO = {"email": "Email já cadastrado", "cpf": "CPF já cadastrado", "rg": "RG já cadastrado"}
 
 
-@auth_router.post("/CadastroUsuarios", status_code=201, response_model=UsuarioResponse)
-# @limiter.limit("5/minute")
-def criar_usuario(request: Request, payload: UsuarioCreate, db=Depends(get_db)):
+def _inserir_usuario(db, valores: dict):
+    """INSERT ... RETURNING dos campos públicos + commit, sem SELECTs de existência"""
+    try:
+        linha = db.execute(
+            insert(Usuario).values(**valores).returning(Usuario.id, Usuario.nome, Usuario.email, Usuario.cpf)
+        ).one()
+        db.commit()
+        return linha
+    except IntegrityError:
+        db.rollback()
+        raise
+
+
+@auth_router.post(
+    "/CadastroUsuarios", status_code=201, response_model=UsuarioResponse,
+    dependencies=[Depends(limitar("cadastro"))]
+)
+async def criar_usuario(request: Request, payload: UsuarioCreate, db=Depends(get_db)):
     """
     ✅ Cria novo usuário com:
-    - Hash de senha (argon2)
+    - Hash de senha (argon2, em pool de processos dedicado)
     - Validação completa de payload
     - Email normalizado
-    - Rate limit (5 por minuto)
+    - Rate limit (padrão 5 por minuto por IP, RATE_LIMIT_CADASTRO)
     - Log seguro (sem senha)
     """
     try:
         email_normalizado = payload.email.lower().strip()
         
-        # Verificar se email já existe
-        usuario_existente = db.query(Usuario).filter(Usuario.email == email_normalizado).first()
-        if usuario_existente:
-            log_cadastro(email_normalizado, 400, "Email duplicado")
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email já cadastrado")
-        
-        # Verificar se CPF já existe
-        cpf_existente = db.query(Usuario).filter(Usuario.cpf == payload.cpf).first()
-        if cpf_existente:
-            log_cadastro(email_normalizado, 400, "CPF duplicado")
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="CPF já cadastrado")
+        # Hash da senha (argon2) fora do threadpool de requisições
+        senha_hash = await hash_senha(payload.senha)
         
-        # Hash da senha (argon2)
-        senha_hash = hash_senha(payload.senha)
-        
-        # Criar novo usuário
-        usuario = Usuario(
+        # Criar novo usuário; email/CPF/RG duplicados são barrados pelas constraints UNIQUE
+        valores = dict(
             nome=payload.nome,
             senha=senha_hash,
             email=email_normalizado,
@@ -77,23 +88,33 @@ def criar_usuario(request: Request, payload: UsuarioCreate, db=Depends(get_db)):
             rg=payload.rg,
             data_de_nascimento=payload.data_de_nascimento
         )
-        
-        db.add(usuario)
-        db.commit()
-        db.refresh(usuario)
+        try:
+            usuario = await run_in_threadpool(_inserir_usuario, db, valores)
+        except IntegrityError as exc:
+            coluna = coluna_violada(exc, *DUPLICIDADES_USUARIO)
+            if coluna is None:
+                raise
+            log_cadastro(email_normalizado, 400, f"{coluna.upper()} duplicado")
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=DUPLICIDADES_USUARIO[coluna])
         
         # Log de sucesso sem dados sensíveis
         log_cadastro(email_normalizado, 201, "Usuário criado com sucesso")
         
-        # Retorno com apenas dados públicos
-        return UsuarioResponse(
-            id=usuario.id,
-            nome=usuario.nome,
-            email=usuario.email,
-            cpf=usuario.cpf
+        # Retorno com apenas dados públicos (já no formato de UsuarioResponse: sem revalidar)
+        return resposta_modelo(
+            UsuarioResponse.model_construct(
+                id=usuario.id,
+                nome=usuario.nome,
+                email=usuario.email,
+                cpf=usuario.cpf
+            ),
+            status_code=status.HTTP_201_CREATED
         )
     except HTTPException:
         raise
+    except HashingSobrecarregado:
+        log_cadastro(payload.email, 503, "Fila de hash cheia")
+        raise erro_hashing_sobrecarregado()
     except ValueError as ve:
         log_cadastro(payload.email, 422, f"Validação: {str(ve)}")
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(ve))
@@ -104,8 +125,11 @@ def criar_usuario(request: Request, payload: UsuarioCreate, db=Depends(get_db)):
         raise HTTPException(status_code=500, detail="Erro ao criar usuário")
 
 
-@auth_router.post("/login", response_model=TokenResponse, status_code=200)
-def login(payload: UsuarioLogin, db=Depends(get_db)):
+@auth_router.post(
+    "/login", response_model=TokenResponse, status_code=200,
+    dependencies=[Depends(limitar("login"))]
+)
+async def login(payload: UsuarioLogin, db=Depends(get_db)):
     """
     Autentica um usuário e retorna um token JWT.
     
@@ -119,7 +143,7 @@ def login(payload: UsuarioLogin, db=Depends(get_db)):
     """
     try:
         email_normalizado = payload.email.lower().strip()
-        usuario = db.query(Usuario).filter(Usuario.email == email_normalizado).first()
+        usuario = await run_in_threadpool(_buscar_usuario_por_email, db, email_normalizado)
         
         if not usuario:
             logger.warning(f"Tentativa de login com email inexistente: {email_normalizado[:3]}***")
@@ -128,7 +152,7 @@ def login(payload: UsuarioLogin, db=Depends(get_db)):
                 detail="Email ou senha incorretos"
             )
         
-        if not verificar_senha(payload.senha, usuario.senha):
+        if not await verificar_senha(payload.senha, usuario.senha):
             logger.warning(f"Tentativa de login com senha incorreta: {email_normalizado[:3]}***")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -139,10 +163,13 @@ def login(payload: UsuarioLogin, db=Depends(get_db)):
         access_token = criar_token(usuario.id)
         logger.info(f"Login bem-sucedido: {email_normalizado[:3]}***")
         
-        return TokenResponse(access_token=access_token, token_type="bearer")
+        return resposta_modelo(TokenResponse.model_construct(access_token=access_token, token_type="bearer"))
         
     except HTTPException:
         raise
+    except HashingSobrecarregado:
+        logger.warning("Login rejeitado: fila de hash cheia")
+        raise erro_hashing_sobrecarregado()
     except Exception as e:
         logger.exception(f"Erro ao fazer login: {str(e)}")
         raise HTTPException(
@@ -151,11 +178,35 @@ def login(payload: UsuarioLogin, db=Depends(get_db)):
         )
 
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Colunas públicas do usuário (evita carregar entidades completas na listagem)
+_COLUNAS_PUBLICAS = (Usuario.id, Usuario.nome, Usuario.email, Usuario.cpf)
+
+# Linhas buscadas por ida ao cursor do servidor no modo NDJSON
+NDJSON_LOTE = 1000
+
+
+def _stream_usuarios_ndjson(apos_id: Optional[int]):
+    """Gera linhas NDJSON a partir de um cursor no servidor (memória constante)"""
+    consulta = select(*_COLUNAS_PUBLICAS).order_by(Usuario.id)
+    if apos_id is not None:
+        consulta = consulta.where(Usuario.id > apos_id)
+
+    # Sessão própria: a sessão da dependency é fechada antes do corpo ser enviado
+    with SessionLocal() as db:
+        resultado = db.execute(consulta.execution_options(yield_per=NDJSON_LOTE))
+        for lote in resultado.partitions():
+            yield b"".join(dumps(dict(zip(lote[0]._fields, linha))) + b"\n" for linha in lote)
+
+
 @auth_router.get("/usuarios", response_model=List[UsuarioResponse])
 def listar_usuarios(
-    skip: int = Query(0, ge=0, description="Número de registros para pular"),
+    request: Request,
+    cursor: Optional[str] = Query(None, description="Cursor opaco retornado no header X-Proximo-Cursor"),
     limit: int = Query(100, ge=1, le=1000, description="Número máximo de registros"),
-    db=Depends(get_db),
+    formato: Optional[str] = Query(None, pattern="^(json|ndjson)$", description="json (padrão) ou ndjson"),
+    db=Depends(get_db_leitura),
     usuario_atual: Usuario = Depends(obter_usuario_atual)
 ):
     """
@@ -165,21 +216,31 @@ def listar_usuarios(
     Envie o token no header: Authorization: Bearer <token>
     
     Parâmetros:
-    - skip: Número de registros para pular (paginação)
+    - cursor: Continuação da página anterior (header X-Proximo-Cursor)
     - limit: Número máximo de registros a retornar (máximo 1000)
+    - formato: "ndjson" (ou Accept: application/x-ndjson) exporta todos os
+      usuários após o cursor em streaming, uma linha JSON por usuário;
+      nesse modo o limit é ignorado
     """
+    posicao = decodificar_cursor(cursor)
+    apos_id = posicao.get("id") if isinstance(posicao, dict) else None
+    if cursor and not isinstance(apos_id, int):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+
+    if formato == "ndjson" or (formato is None and NDJSON_MEDIA_TYPE in request.headers.get("accept", "")):
+        return StreamingResponse(_stream_usuarios_ndjson(apos_id), media_type=NDJSON_MEDIA_TYPE)
+
     try:
-        usuarios = db.query(Usuario).offset(skip).limit(limit).all()
-        return [
-            UsuarioResponse(
-                id=u.id,
-                nome=u.nome,
-                email=u.email,
-                cpf=u.cpf
-            )
-            for u in usuarios
-        ]
+        consulta = select(*_COLUNAS_PUBLICAS).order_by(Usuario.id).limit(limit)
+        if apos_id is not None:
+            consulta = consulta.where(Usuario.id > apos_id)
+        linhas = db.execute(consulta).all()
+
+        headers = {}
+        if len(linhas) == limit:
+            headers["X-Proximo-Cursor"] = codificar_cursor({"id": linhas[-1].id})
+        # Linhas já têm o formato de UsuarioResponse: serializadas direto, sem revalidação
+        return resposta_linhas(linhas, headers=headers)
     except Exception as e:
         logger.exception(f"Erro ao listar usuários: {str(e)}")
         raise HTTPException(status_code=500, detail="Erro ao listar usuários")
-
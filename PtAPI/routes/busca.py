@@ -0,0 +1,31 @@
+"""Rota de busca rápida em clientes e imóveis"""
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.auth import obter_usuario_atual
+from config.replicas import get_async_db_leitura
+from models.usuario import Usuario
+from schemas.busca_schema import BuscaResultado
+from services.busca import TIPOS, buscar
+
+busca_router = APIRouter(prefix="/busca", tags=["busca"])
+
+
+@busca_router.get("", response_model=List[BuscaResultado])
+async def busca_rapida(
+    q: str = Query(..., min_length=3, max_length=100, description="Trecho de nome, e-mail, CPF/CNPJ, rua, bairro ou CEP"),
+    tipo: Optional[str] = Query(None, pattern="^(cliente|imovel)$", description="Restringe a um tipo"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db_leitura),
+    usuario_atual: Usuario = Depends(obter_usuario_atual)
+):
+    """
+    Busca por trecho em clientes (PF/PJ) e imóveis usando o índice de trigramas.
+
+    Resultados mistos, mais relevantes primeiro: campo igual ao termo, campo
+    que começa com ele, palavra que começa com ele e, por fim, trecho no meio.
+    """
+    tipos = (tipo,) if tipo else TIPOS
+    return await db.run_sync(lambda sessao: buscar(sessao, q, tipos, limit))
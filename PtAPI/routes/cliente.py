@@ -0,0 +1,105 @@
+"""Rotas de consulta de Clientes (PF e PJ)"""
+from fastapi import APIRouter, HTTPException, Depends, Response, Query
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, with_polymorphic
+
+from config.auth import obter_usuario_atual
+from config.replicas import get_async_db_leitura
+from models.cliente import Cliente, ClienteFisica, ClienteJuridica
+from models.usuario import Usuario
+from schemas.cliente_schema import ClienteDetalhe, ClienteResumo
+from services.paginacao import codificar_cursor, decodificar_cursor
+
+cliente_router = APIRouter(prefix="/clientes", tags=["clientes"])
+
+# PF e PJ no mesmo SELECT (LEFT OUTER JOIN nas duas tabelas filhas): sem uma
+# consulta extra por linha ao acessar as colunas do subtipo
+ClientePolimorfico = with_polymorphic(Cliente, [ClienteFisica, ClienteJuridica])
+
+CAMPOS_SUBTIPO = {
+    "fisica": ("cpf", "rg", "data_de_nascimento"),
+    "juridica": ("cnpj", "razao_social", "nome_fantasia", "inscricao_estadual", "endereco_comercial", "data_fundacao"),
+}
+
+# Relacionamentos expansíveis: um SELECT ... IN por página, qualquer que seja o tamanho
+INCLUDES_CLIENTE = {
+    "participacoes": ("fisica", selectinload(ClientePolimorfico.ClienteFisica.participacoes)),
+    "socios_representantes": ("juridica", selectinload(ClientePolimorfico.ClienteJuridica.socios_representantes)),
+}
+
+
+def _parse_include(include: Optional[str]) -> List[str]:
+    pedidos = [p.strip() for p in (include or "").split(",") if p.strip()]
+    invalidos = sorted(set(pedidos) - set(INCLUDES_CLIENTE))
+    if invalidos:
+        raise HTTPException(
+            status_code=422,
+            detail=f"include inválido: {', '.join(invalidos)}. Opções: {', '.join(INCLUDES_CLIENTE)}",
+        )
+    return list(dict.fromkeys(pedidos))
+
+
+def _consulta_clientes(pedidos: List[str]):
+    return select(ClientePolimorfico).options(*(INCLUDES_CLIENTE[p][1] for p in pedidos))
+
+
+def _detalhe(cliente: Cliente, pedidos: List[str]) -> dict:
+    """Campos comuns + os do subtipo do cliente + relacionamentos pedidos que se aplicam a ele"""
+    dados = ClienteResumo.model_validate(cliente).model_dump()
+    for campo in CAMPOS_SUBTIPO.get(cliente.tipo, ()):
+        dados[campo] = getattr(cliente, campo)
+    for relacionamento in pedidos:
+        if INCLUDES_CLIENTE[relacionamento][0] == cliente.tipo:
+            dados[relacionamento] = getattr(cliente, relacionamento)
+    return dados
+
+
+@cliente_router.get("/", response_model=List[ClienteDetalhe], response_model_exclude_unset=True)
+async def listar_clientes(
+    response: Response,
+    tipo: Optional[str] = Query(None, pattern="^(fisica|juridica)$", description="Filtra por pessoa física ou jurídica"),
+    include: Optional[str] = Query(None, description="Relacionamentos a incluir: participacoes,socios_representantes"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco retornado no header X-Proximo-Cursor"),
+    limit: int = Query(100, ge=1, le=1000, description="Número máximo de registros"),
+    db: AsyncSession = Depends(get_async_db_leitura),
+    usuario_atual: Usuario = Depends(obter_usuario_atual)
+):
+    """
+    Lista clientes PF e PJ com os campos do subtipo (requer autenticação).
+
+    Uma consulta por página, mais uma por relacionamento pedido em include,
+    independente do limit. Próxima página pelo header X-Proximo-Cursor.
+    """
+    pedidos = _parse_include(include)
+    posicao = decodificar_cursor(cursor)
+    apos_id = posicao.get("id") if isinstance(posicao, dict) else None
+    if cursor and not isinstance(apos_id, int):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+    consulta = _consulta_clientes(pedidos).order_by(ClientePolimorfico.id).limit(limit)
+    if tipo:
+        consulta = consulta.where(ClientePolimorfico.tipo == tipo)
+    if apos_id is not None:
+        consulta = consulta.where(ClientePolimorfico.id > apos_id)
+    clientes = (await db.scalars(consulta)).all()
+    if len(clientes) == limit:
+        response.headers["X-Proximo-Cursor"] = codificar_cursor({"id": clientes[-1].id})
+    return [_detalhe(cliente, pedidos) for cliente in clientes]
+
+
+@cliente_router.get("/{cliente_id}", response_model=ClienteDetalhe, response_model_exclude_unset=True)
+async def obter_cliente(
+    cliente_id: int,
+    include: Optional[str] = Query(None, description="Relacionamentos a incluir: participacoes,socios_representantes"),
+    db: AsyncSession = Depends(get_async_db_leitura),
+    usuario_atual: Usuario = Depends(obter_usuario_atual)
+):
+    """Cliente por id, com os campos do subtipo em um único SELECT (requer autenticação)"""
+    pedidos = _parse_include(include)
+    cliente = (await db.scalars(_consulta_clientes(pedidos).where(ClientePolimorfico.id == cliente_id))).one_or_none()
+    if not cliente:
+        raise HTTPException(status_code=404, detail="Cliente não encontrado")
+    return _detalhe(cliente, pedidos)
@@ -0,0 +1,66 @@
+"""Rotas do dashboard (indicadores agregados)"""
+from fastapi import APIRouter, HTTPException, Depends, Response, Query
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.auth import obter_usuario_atual
+from config.replicas import get_async_db_leitura
+from models.ocupacao import OcupacaoResumo
+from models.usuario import Usuario
+from schemas.dashboard_schema import OcupacaoGrupo
+from services.json_rapido import resposta_modelo
+from services.ocupacao import NIVEIS
+from services.paginacao import codificar_cursor, decodificar_cursor
+
+dashboard_router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+def _taxa(parte: float, total: float) -> float:
+    return round(parte / total, 4) if total else 0.0
+
+
+@dashboard_router.get("/ocupacao", response_model=List[OcupacaoGrupo])
+async def ocupacao(
+    response: Response,
+    agrupar: str = Query("estado", pattern=f"^({'|'.join(NIVEIS)})$", description="Nível de agregação"),
+    chave: Optional[str] = Query(None, description="Um grupo só (ex.: 'SP', 'SP/Campinas', id do cliente)"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco retornado no header X-Proximo-Cursor"),
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_async_db_leitura),
+    usuario_atual: Usuario = Depends(obter_usuario_atual)
+):
+    """
+    Ocupação por grupo a partir do resumo mantido a cada alteração (requer autenticação).
+
+    Lê uma linha por grupo (custo proporcional ao número de grupos, não de
+    unidades). Taxas: unidades ocupadas / unidades e m² ocupados / m² das unidades.
+    """
+    posicao = decodificar_cursor(cursor)
+    apos = posicao.get("chave") if isinstance(posicao, dict) else None
+    if cursor and not isinstance(apos, str):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+    consulta = select(OcupacaoResumo).where(OcupacaoResumo.nivel == agrupar).order_by(OcupacaoResumo.chave).limit(limit)
+    if chave is not None:
+        consulta = consulta.where(OcupacaoResumo.chave == chave)
+    if apos is not None:
+        consulta = consulta.where(OcupacaoResumo.chave > apos)
+    linhas = (await db.scalars(consulta)).all()
+
+    headers = {}
+    if len(linhas) == limit:
+        headers["X-Proximo-Cursor"] = codificar_cursor({"chave": linhas[-1].chave})
+    grupos = [
+        OcupacaoGrupo.model_construct(
+            nivel=l.nivel, chave=l.chave,
+            imoveis_ocupados=l.imoveis_ocupados, imoveis_desocupados=l.imoveis_desocupados,
+            unidades_ocupadas=l.unidades_ocupadas, unidades_desocupadas=l.unidades_desocupadas,
+            area_ocupada_m2=round(l.area_ocupada_m2, 2), area_desocupada_m2=round(l.area_desocupada_m2, 2),
+            taxa_ocupacao_unidades=_taxa(l.unidades_ocupadas, l.unidades_ocupadas + l.unidades_desocupadas),
+            taxa_ocupacao_area=_taxa(l.area_ocupada_m2, l.area_ocupada_m2 + l.area_desocupada_m2),
+        )
+        for l in linhas
+    ]
+    return resposta_modelo(grupos, headers=headers)
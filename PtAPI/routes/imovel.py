@@ -1,126 +1,399 @@
 """Rotas para gerenciamento de Imóveis, Unidades, Registros e Contas"""
-from fastapi import APIRouter, HTTPException, Depends, Response, Query
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, Query
 from fastapi.responses import StreamingResponse
-from typing import List
-import io
+from typing import List, Optional
+import json
+import os
 
-from config.db import get_db
-from sqlalchemy.orm import Session
+from config.db import get_async_db, nova_sessao_async
+from config.replicas import get_async_db_leitura
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 
-from models.contratos import Imovel, ImovelUnidade, RegistroMatricula, ContaServico
+from models.cliente import Cliente
+from models.contratos import Contratos, Imovel, ImovelUnidade, RegistroMatricula, ContaServico
 from schemas.imovel_schema import (
     ImovelCreate, ImovelResponse, ImovelUnidadeCreate, ImovelUnidadeResponse,
     RegistroMatriculaCreate, RegistroMatriculaResponse, ContaServicoCreate, ContaServicoResponse,
-    IPTUCalculationRequest, IPTUCalculationResponse, IPTUUnitResult
+    IPTUCalculationRequest, IPTUCalculationResponse, IPTUUnitResult, ImportacaoResponse,
+    IPTULoteRequest, IPTULoteResponse, IPTULoteItem, IPTUZipRequest, ImovelDetalhe, StatusOcupacaoUpdate
 )
+from services.cache_ttl import CacheTTL
+from services.integridade import coluna_violada, eh_violacao_fk
+from services.importacao import FORMATOS, IMPORTACAO_LOTE, importar_imoveis, linhas_do_corpo
+from services.etag import etag_corresponde, formatar_etag
+from services.executor import ExecutorSobrecarregado
+from services.iptu import ratear_portfolio
+from services.paginacao import codificar_cursor, decodificar_cursor
+from services.pdf_iptu import chave_pdf, dados_pdf_iptu, obter_pdf_iptu
+from services.versoes import lembrar_versao, versao_imovel
+from services.zip_iptu import ItemZip, stream_zip_iptu
 
 imovel_router = APIRouter(prefix="/imoveis", tags=["imoveis"])
 
 
+async def _obter_imovel_ou_404(db: AsyncSession, imovel_id: int, *opcoes) -> Imovel:
+    resultado = await db.execute(select(Imovel).where(Imovel.id == imovel_id).options(*opcoes))
+    imovel = resultado.scalar_one_or_none()
+    if not imovel:
+        raise HTTPException(status_code=404, detail="Imóvel não encontrado")
+    return imovel
+
+
+# FKs checadas pelo banco nas rotas de criação: coluna -> (tabela pai, mensagem do 404)
+FK_IMOVEL = {"imovel_id": (Imovel, "Imóvel não encontrado")}
+FK_UNIDADE = {**FK_IMOVEL, "contrato_id": (Contratos, "Contrato não encontrado")}
+FK_CLIENTE = {"cliente_id": (Cliente, "Cliente não encontrado")}
+
+
+async def _fk_ausente(db: AsyncSession, valores: dict, fks: dict) -> str:
+    """Descobre qual FK falhou quando o driver não diz (ex.: SQLite); só roda no caminho de erro"""
+    candidatas = [coluna for coluna in fks if valores.get(coluna) is not None]
+    for coluna in candidatas[:-1]:
+        pai = fks[coluna][0]
+        if await db.scalar(select(pai.id).where(pai.id == valores[coluna])) is None:
+            return coluna
+    return candidatas[-1]
+
+
+async def _inserir_retornando(db: AsyncSession, modelo, valores: dict, fks: dict):
+    """INSERT ... RETURNING + commit, sem SELECT prévio do pai nem refresh
+
+    A existência das FKs é garantida pelo banco; a violação vira o 404 correspondente.
+    """
+    try:
+        entidade = (await db.scalars(insert(modelo).returning(modelo), [valores])).one()
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        if not eh_violacao_fk(exc):
+            raise
+        coluna = coluna_violada(exc, *fks) or await _fk_ausente(db, valores, fks)
+        raise HTTPException(status_code=404, detail=fks[coluna][1])
+    return entidade
+
+
 @imovel_router.post("/", response_model=ImovelResponse, status_code=201)
-def criar_imovel(payload: ImovelCreate, db: Session = Depends(get_db)):
-    imovel = Imovel(
-        rua=payload.rua,
-        numero=payload.numero,
-        complemento=payload.complemento,
-        bairro=payload.bairro,
-        municipio=payload.municipio,
-        estado=payload.estado,
-        cep=payload.cep,
-        area_total_m2=payload.area_total_m2,
-        cliente_id=payload.cliente_id
+async def criar_imovel(payload: ImovelCreate, db: AsyncSession = Depends(get_async_db)):
+    return await _inserir_retornando(db, Imovel, payload.model_dump(), FK_CLIENTE)
+
+
+# Contagens mudam pouco e custam um scan do índice: servidas de cache por alguns segundos
+IMOVEIS_CONTAGEM_TTL = float(os.getenv("IMOVEIS_CONTAGEM_TTL", "30"))
+cache_contagem = CacheTTL(IMOVEIS_CONTAGEM_TTL, max_itens=2048)
+
+
+def filtros_imovel(
+    cliente_id: Optional[int] = Query(None, description="Proprietário"),
+    municipio: Optional[str] = Query(None),
+    estado: Optional[str] = Query(None, min_length=2, max_length=2),
+    bairro: Optional[str] = Query(None),
+    cep_prefixo: Optional[str] = Query(None, min_length=1, max_length=9, description="Início do CEP"),
+    status_ocupacao: Optional[str] = Query(None, pattern="^(ocupado|desocupado)$"),
+    area_min: Optional[float] = Query(None, ge=0),
+    area_max: Optional[float] = Query(None, ge=0),
+) -> dict:
+    """Filtros de listagem/contagem, só os informados"""
+    filtros = {
+        "cliente_id": cliente_id,
+        "municipio": municipio,
+        "estado": estado.upper() if estado else None,
+        "bairro": bairro,
+        "cep_prefixo": cep_prefixo,
+        "status_ocupacao": status_ocupacao,
+        "area_min": area_min,
+        "area_max": area_max,
+    }
+    return {campo: valor for campo, valor in filtros.items() if valor is not None}
+
+
+def _aplicar_filtros(consulta, filtros: dict):
+    """Igualdades nas colunas dos índices compostos; CEP por prefixo (LIKE 'x%' usa o índice)"""
+    for campo in ("cliente_id", "municipio", "estado", "bairro", "status_ocupacao"):
+        if campo in filtros:
+            consulta = consulta.where(getattr(Imovel, campo) == filtros[campo])
+    if "cep_prefixo" in filtros:
+        consulta = consulta.where(Imovel.cep.startswith(filtros["cep_prefixo"], autoescape=True))
+    if "area_min" in filtros:
+        consulta = consulta.where(Imovel.area_total_m2 >= filtros["area_min"])
+    if "area_max" in filtros:
+        consulta = consulta.where(Imovel.area_total_m2 <= filtros["area_max"])
+    return consulta
+
+
+@imovel_router.get("/", response_model=List[ImovelResponse])
+async def listar_imoveis(
+    response: Response,
+    filtros: dict = Depends(filtros_imovel),
+    cursor: Optional[str] = Query(None, description="Cursor opaco retornado no header X-Proximo-Cursor"),
+    limit: int = Query(100, ge=1, le=1000, description="Número máximo de registros"),
+    db: AsyncSession = Depends(get_async_db_leitura)
+):
+    """
+    Lista imóveis filtrados, em ordem de id, com paginação por cursor.
+
+    O custo de cada página não depende da posição na listagem (sem OFFSET).
+    Quando há mais registros, o header X-Proximo-Cursor traz o cursor da
+    próxima página. O total fica em GET /imoveis/contagem.
+    """
+    posicao = decodificar_cursor(cursor)
+    apos_id = posicao.get("id") if isinstance(posicao, dict) else None
+    if cursor and not isinstance(apos_id, int):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+    consulta = _aplicar_filtros(select(Imovel), filtros).order_by(Imovel.id).limit(limit)
+    if apos_id is not None:
+        consulta = consulta.where(Imovel.id > apos_id)
+    imoveis = (await db.scalars(consulta)).all()
+    if len(imoveis) == limit:
+        response.headers["X-Proximo-Cursor"] = codificar_cursor({"id": imoveis[-1].id})
+    return imoveis
+
+
+@imovel_router.get("/contagem")
+async def contar_imoveis(filtros: dict = Depends(filtros_imovel), db: AsyncSession = Depends(get_async_db_leitura)):
+    """Total de imóveis para os mesmos filtros da listagem (cache de IMOVEIS_CONTAGEM_TTL segundos)"""
+    chave = tuple(sorted(filtros.items()))
+    total = cache_contagem.obter(chave)
+    if total is None:
+        total = await db.scalar(_aplicar_filtros(select(func.count(Imovel.id)), filtros))
+        cache_contagem.guardar(chave, total)
+    return {"total": total}
+
+
+@imovel_router.post("/importacao", response_model=ImportacaoResponse)
+async def importar_lote(
+    request: Request,
+    lote: int = Query(IMPORTACAO_LOTE, ge=1, le=5000, description="Linhas por transação"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Importa imóveis completos (com unidades, registros e contas) em lote.
+
+    Corpo em streaming: NDJSON (Content-Type: application/x-ndjson), um imóvel
+    por linha, ou CSV (text/csv) com cabeçalho e colunas aninhadas em JSON.
+    Retorna o total importado e os erros por número de linha.
+    """
+    tipo = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    formato = FORMATOS.get(tipo)
+    if formato is None:
+        raise HTTPException(status_code=415, detail="Use application/x-ndjson ou text/csv")
+    return await importar_imoveis(db, linhas_do_corpo(request.stream()), formato, lote)
+
+
+async def _stream_iptu_lote(itens):
+    # Sessão própria: a sessão da dependency é fechada antes do corpo ser enviado
+    async with nova_sessao_async() as db:
+        async for resultado in ratear_portfolio(db, itens):
+            yield json.dumps(resultado, ensure_ascii=False) + "\n"
+
+
+@imovel_router.post("/iptu/lote", response_model=IPTULoteResponse)
+async def calcular_iptu_lote(request: Request, payload: IPTULoteRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Rateia o IPTU de vários imóveis em uma chamada.
+
+    As áreas das unidades são lidas em blocos (uma consulta por bloco de imóveis)
+    e o rateio fecha em centavos com o valor de cada carnê. Com
+    Accept: application/x-ndjson os resultados são enviados em streaming,
+    um imóvel por linha.
+    """
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        return StreamingResponse(_stream_iptu_lote(payload.itens), media_type="application/x-ndjson")
+    return {"resultados": [r async for r in ratear_portfolio(db, payload.itens)]}
+
+
+def _resposta_zip(itens, nome: str) -> StreamingResponse:
+    return StreamingResponse(
+        stream_zip_iptu(itens),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{nome}"'},
     )
-    db.add(imovel)
-    db.commit()
-    db.refresh(imovel)
-    return imovel
 
 
-@imovel_router.get("/{imovel_id}", response_model=ImovelResponse)
-def obter_imovel(imovel_id: int, db: Session = Depends(get_db)):
-    imovel = db.query(Imovel).filter(Imovel.id == imovel_id).first()
-    if not imovel:
-        raise HTTPException(status_code=404, detail="Imóvel não encontrado")
-    return imovel
+@imovel_router.post("/iptu/zip")
+async def gerar_zip_iptu_lote(payload: IPTUZipRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    ZIP com o PDF de IPTU de todas as unidades dos imóveis informados.
+
+    Com cliente_id e sem itens, gera os carnês de todos os imóveis do cliente
+    (carregados aqui, com valor_total_iptu/desconto_cota_unica do pedido); com
+    itens, cada um deve ser um imóvel dele. Os PDFs entram no ZIP à medida que
+    ficam prontos.
+    """
+    nome = f"iptu_cliente_{payload.cliente_id}.zip" if payload.cliente_id is not None else "iptu.zip"
+    if payload.itens is None:
+        ids = (await db.scalars(
+            select(Imovel.id).where(Imovel.cliente_id == payload.cliente_id).order_by(Imovel.id)
+        )).all()
+        if not ids:
+            existe = await db.scalar(select(Cliente.id).where(Cliente.id == payload.cliente_id))
+            raise HTTPException(status_code=404, detail="Cliente sem imóveis" if existe else "Cliente não encontrado")
+        itens = [ItemZip(imovel_id, payload.valor_total_iptu, payload.desconto_cota_unica) for imovel_id in ids]
+        return _resposta_zip(itens, nome)
+
+    ids = {item.imovel_id for item in payload.itens}
+    consulta = select(Imovel.id).where(Imovel.id.in_(ids))
+    if payload.cliente_id is not None:
+        consulta = consulta.where(Imovel.cliente_id == payload.cliente_id)
+    encontrados = set((await db.scalars(consulta)).all())
+    faltando = sorted(ids - encontrados)
+    if faltando:
+        detalhe = "Imóveis não encontrados" if payload.cliente_id is None else "Imóveis não encontrados para o cliente"
+        raise HTTPException(status_code=404, detail={"mensagem": detalhe, "imovel_ids": faltando})
+    return _resposta_zip(payload.itens, nome)
+
+
+@imovel_router.get("/{imovel_id}/iptu/zip")
+async def gerar_zip_iptu(imovel_id: int, valor_total_iptu: float = Query(..., gt=0), desconto_cota_unica: float = Query(0.0), db: AsyncSession = Depends(get_async_db)):
+    """ZIP com o PDF de IPTU de cada unidade do imóvel"""
+    await _obter_imovel_ou_404(db, imovel_id)
+    item = IPTULoteItem(imovel_id=imovel_id, valor_total_iptu=valor_total_iptu, desconto_cota_unica=desconto_cota_unica)
+    return _resposta_zip([item], f"iptu_imovel_{imovel_id}.zip")
+
+
+# Relacionamentos expansíveis em GET /imoveis/{id}: coleções via SELECT ... IN, cliente via JOIN
+INCLUDES_IMOVEL = {
+    "unidades": selectinload(Imovel.unidades),
+    "registros": selectinload(Imovel.registros),
+    "contas": selectinload(Imovel.contas),
+    "cliente": joinedload(Imovel.cliente),
+}
+
+
+def _parse_include(include: Optional[str]) -> List[str]:
+    pedidos = [p.strip() for p in (include or "").split(",") if p.strip()]
+    invalidos = sorted(set(pedidos) - set(INCLUDES_IMOVEL))
+    if invalidos:
+        raise HTTPException(
+            status_code=422,
+            detail=f"include inválido: {', '.join(invalidos)}. Opções: {', '.join(INCLUDES_IMOVEL)}",
+        )
+    return list(dict.fromkeys(pedidos))
+
+
+def _etag_imovel(imovel_id: int, versao: int, pedidos: List[str]) -> str:
+    """ETag forte: a versão do imóvel já cobre unidades/registros/contas; o include muda o corpo"""
+    return formatar_etag(f"imovel-{imovel_id}-v{versao}-{'.'.join(sorted(pedidos)) or 'base'}")
+
+
+@imovel_router.get("/{imovel_id}", response_model=ImovelDetalhe, response_model_exclude_unset=True)
+async def obter_imovel(
+    request: Request,
+    response: Response,
+    imovel_id: int,
+    include: Optional[str] = Query(None, description="Relacionamentos a incluir: unidades,registros,contas,cliente"),
+    db: AsyncSession = Depends(get_async_db_leitura)
+):
+    """
+    Imóvel por id, opcionalmente com relacionamentos aninhados.
+
+    Cada relacionamento pedido custa no máximo uma consulta extra (o cliente vem
+    no mesmo SELECT), independente de quantas unidades/registros/contas existam.
+
+    Responde com ETag (versão do imóvel); com If-None-Match igual, devolve 304
+    sem carregar o imóvel. include=cliente não tem ETag: o cliente não é versionado.
+    """
+    pedidos = _parse_include(include)
+    condicional = "cliente" not in pedidos
+    if_none_match = request.headers.get("if-none-match")
+    if condicional and if_none_match:
+        versao = await versao_imovel(db, imovel_id)
+        if versao is not None:
+            etag = _etag_imovel(imovel_id, versao, pedidos)
+            if etag_corresponde(if_none_match, etag):
+                return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+    imovel = await _obter_imovel_ou_404(db, imovel_id, *(INCLUDES_IMOVEL[p] for p in pedidos))
+    if condicional:
+        lembrar_versao(imovel)
+        response.headers["ETag"] = _etag_imovel(imovel_id, imovel.versao, pedidos)
+        response.headers["Cache-Control"] = "private, no-cache"
+    dados = ImovelResponse.model_validate(imovel).model_dump()
+    for relacionamento in pedidos:
+        dados[relacionamento] = getattr(imovel, relacionamento)
+    return ImovelDetalhe.model_validate(dados)
 
 
 @imovel_router.post("/{imovel_id}/unidades", response_model=ImovelUnidadeResponse, status_code=201)
-def criar_unidade(imovel_id: int, payload: ImovelUnidadeCreate, db: Session = Depends(get_db)):
-    imovel = db.query(Imovel).filter(Imovel.id == imovel_id).first()
-    if not imovel:
-        raise HTTPException(status_code=404, detail="Imóvel não encontrado")
-    unidade = ImovelUnidade(
-        imovel_id=imovel_id,
-        nome_unidade=payload.nome_unidade,
-        area_m2=payload.area_m2,
-        descricao=payload.descricao,
-        contrato_id=payload.contrato_id
-    )
-    db.add(unidade)
-    db.commit()
-    db.refresh(unidade)
-    return unidade
+async def criar_unidade(imovel_id: int, payload: ImovelUnidadeCreate, db: AsyncSession = Depends(get_async_db)):
+    return await _inserir_retornando(db, ImovelUnidade, {**payload.model_dump(), "imovel_id": imovel_id}, FK_UNIDADE)
 
 
 @imovel_router.post("/{imovel_id}/registros", response_model=RegistroMatriculaResponse, status_code=201)
-def criar_registro(imovel_id: int, payload: RegistroMatriculaCreate, db: Session = Depends(get_db)):
-    imovel = db.query(Imovel).filter(Imovel.id == imovel_id).first()
-    if not imovel:
-        raise HTTPException(status_code=404, detail="Imóvel não encontrado")
-    registro = RegistroMatricula(
-        imovel_id=imovel_id,
-        matricula=payload.matricula,
-        cartorio=payload.cartorio,
-        cnm=payload.cnm,
-        inscricao_municipal=payload.inscricao_municipal,
-        atual=payload.atual
-    )
-    # marcar outros como não atual se este for atual
+async def criar_registro(imovel_id: int, payload: RegistroMatriculaCreate, db: AsyncSession = Depends(get_async_db)):
+    # marcar outros como não atual se este for atual (mesma transação do INSERT)
     if payload.atual:
-        db.query(RegistroMatricula).filter(RegistroMatricula.imovel_id == imovel_id).update({"atual": False})
-    db.add(registro)
-    db.commit()
-    db.refresh(registro)
-    return registro
+        await db.execute(
+            update(RegistroMatricula).where(RegistroMatricula.imovel_id == imovel_id).values(atual=False)
+        )
+    return await _inserir_retornando(db, RegistroMatricula, {**payload.model_dump(), "imovel_id": imovel_id}, FK_IMOVEL)
 
 
 @imovel_router.post("/{imovel_id}/contas", response_model=ContaServicoResponse, status_code=201)
-def criar_conta(imovel_id: int, payload: ContaServicoCreate, db: Session = Depends(get_db)):
-    imovel = db.query(Imovel).filter(Imovel.id == imovel_id).first()
-    if not imovel:
-        raise HTTPException(status_code=404, detail="Imóvel não encontrado")
-    conta = ContaServico(
-        imovel_id=imovel_id,
-        tipo=payload.tipo,
-        numero_conta=payload.numero_conta,
-        fornecedor=payload.fornecedor,
-        status=payload.status,
-        observacoes=payload.observacoes
+async def criar_conta(imovel_id: int, payload: ContaServicoCreate, db: AsyncSession = Depends(get_async_db)):
+    valores = {**payload.model_dump(), "status": payload.status or "ativo", "imovel_id": imovel_id}
+    return await _inserir_retornando(db, ContaServico, valores, FK_IMOVEL)
+
+
+@imovel_router.patch("/{imovel_id}/status", response_model=ImovelResponse)
+async def alterar_status_imovel(imovel_id: int, payload: StatusOcupacaoUpdate, db: AsyncSession = Depends(get_async_db)):
+    """Ocupação do imóvel; o resumo de ocupação (services/ocupacao) é atualizado na mesma transação"""
+    imovel = await _obter_imovel_ou_404(db, imovel_id)
+    imovel.status_ocupacao = payload.status
+    await db.commit()
+    return imovel
+
+
+@imovel_router.patch("/{imovel_id}/unidades/{unidade_id}/status", response_model=ImovelUnidadeResponse)
+async def alterar_status_unidade(imovel_id: int, unidade_id: int, payload: StatusOcupacaoUpdate, db: AsyncSession = Depends(get_async_db)):
+    """Ocupação da unidade; o resumo de ocupação (services/ocupacao) é atualizado na mesma transação"""
+    unidade = await db.scalar(
+        select(ImovelUnidade).where(ImovelUnidade.id == unidade_id, ImovelUnidade.imovel_id == imovel_id)
     )
-    db.add(conta)
-    db.commit()
-    db.refresh(conta)
-    return conta
+    if not unidade:
+        raise HTTPException(status_code=404, detail="Unidade não encontrada")
+    unidade.status = payload.status
+    await db.commit()
+    return unidade
 
 
 @imovel_router.post("/{imovel_id}/iptu/calc", response_model=IPTUCalculationResponse)
-def calcular_iptu(imovel_id: int, payload: IPTUCalculationRequest, db: Session = Depends(get_db)):
-    imovel = db.query(Imovel).filter(Imovel.id == imovel_id).first()
-    if not imovel:
-        raise HTTPException(status_code=404, detail="Imóvel não encontrado")
+async def calcular_iptu(imovel_id: int, payload: IPTUCalculationRequest, db: AsyncSession = Depends(get_async_db)):
+    # unidades carregadas antecipadamente: lazy load não é permitido em sessão assíncrona
+    imovel = await _obter_imovel_ou_404(db, imovel_id, selectinload(Imovel.unidades))
     distribuicao = imovel.calcular_iptu_proporcional(payload.valor_total_iptu, payload.desconto_cota_unica or 0.0)
     resultados = [IPTUUnitResult(**d) for d in distribuicao]
     return {"distribuicao": resultados}
 
 
 @imovel_router.get("/{imovel_id}/unidades/{unidade_id}/iptu/pdf")
-def gerar_pdf_iptu(imovel_id: int, unidade_id: int, valor_total_iptu: float = Query(...), desconto_cota_unica: float = Query(0.0), db: Session = Depends(get_db)):
-    imovel = db.query(Imovel).filter(Imovel.id == imovel_id).first()
-    if not imovel:
-        raise HTTPException(status_code=404, detail="Imóvel não encontrado")
-    unidade = db.query(ImovelUnidade).filter(ImovelUnidade.id == unidade_id, ImovelUnidade.imovel_id == imovel_id).first()
+async def gerar_pdf_iptu(request: Request, imovel_id: int, unidade_id: int, valor_total_iptu: float = Query(...), desconto_cota_unica: float = Query(0.0), db: AsyncSession = Depends(get_async_db_leitura)):
+    """
+    PDF do cálculo de IPTU da unidade.
+
+    O PDF é renderizado fora dos workers da API e reaproveitado enquanto os
+    valores não mudarem; o ETag permite ao cliente revalidar com If-None-Match (304).
+    """
+    imovel = await _obter_imovel_ou_404(db, imovel_id, selectinload(Imovel.unidades))
+    unidade = next((u for u in imovel.unidades if u.id == unidade_id), None)
     if not unidade:
         raise HTTPException(status_code=404, detail="Unidade não encontrada")
 
-    pdf_bytes = imovel.gerar_pdf_iptu_por_unidade(unidade, valor_total_iptu, desconto_cota_unica)
-    return StreamingResponse(io.BytesIO(pdf_bytes), media_type="application/pdf")
+    distribuicao = imovel.calcular_iptu_proporcional(valor_total_iptu, desconto_cota_unica)
+    rateio = next((d for d in distribuicao if d["unidade_id"] == unidade.id), None)
+    dados = dados_pdf_iptu(imovel, unidade, rateio, valor_total_iptu, desconto_cota_unica)
+    chave = chave_pdf(dados)
+    etag = formatar_etag(chave)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if etag_corresponde(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        pdf_bytes = await obter_pdf_iptu(dados, chave)
+    except ExecutorSobrecarregado:
+        raise HTTPException(status_code=503, detail="Geração de PDF sobrecarregada, tente novamente", headers={"Retry-After": "2"})
+    return Response(content=pdf_bytes, media_type="application/pdf", headers=headers)
@@ -0,0 +1,91 @@
+"""Rotas internas de diagnóstico (métricas de executores e recursos)"""
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from config import db as config_db
+from config.auth import obter_usuario_atual
+from config.db import get_db
+from config.pool import status_pool
+from config.replicas import roteador_leitura
+from models.usuario import Usuario
+from services.busca import indice_busca
+from services.cache_principal import cache_principal
+from services.hashing import executor_hashing
+from services.notificacoes import metricas as metricas_notificacoes
+from services.pdf_iptu import cache_pdf, executor_pdf
+from services.rate_limit import limitador
+from services.telemetria import telemetria
+from services.versoes import cache_versoes
+from routes.imovel import cache_contagem
+
+interno_router = APIRouter(prefix="/interno", tags=["interno"])
+
+
+@interno_router.get("/hashing")
+def metricas_hashing(usuario_atual: Usuario = Depends(obter_usuario_atual)):
+    """Profundidade da fila, rejeições e latência do executor de hash de senhas"""
+    return executor_hashing.metricas()
+
+
+@interno_router.get("/cache-principal")
+def metricas_cache_principal(usuario_atual: Usuario = Depends(obter_usuario_atual)):
+    """Acertos, falhas e invalidações do cache de usuários autenticados"""
+    return cache_principal.metricas()
+
+
+@interno_router.get("/pool")
+def estatisticas_pool(usuario_atual: Usuario = Depends(obter_usuario_atual)):
+    """Estado e eventos dos pools de conexão (espera de checkout, overflow, invalidações)"""
+    estado = {"sync": status_pool(config_db.db)}
+    if config_db.async_db is not None:
+        estado["async"] = status_pool(config_db.async_db.sync_engine)
+    estado.update(roteador_leitura.pools())
+    return estado
+
+
+@interno_router.get("/pdf")
+def metricas_pdf(usuario_atual: Usuario = Depends(obter_usuario_atual)):
+    """Fila/latência da renderização de PDFs e uso do cache de PDFs"""
+    return {"executor": executor_pdf.metricas(), "cache": cache_pdf.metricas()}
+
+
+@interno_router.get("/rate-limit")
+def metricas_rate_limit(usuario_atual: Usuario = Depends(obter_usuario_atual)):
+    """Políticas ativas e requisições permitidas/rejeitadas por política"""
+    return limitador.metricas()
+
+
+@interno_router.get("/contagem-imoveis")
+def metricas_contagem_imoveis(usuario_atual: Usuario = Depends(obter_usuario_atual)):
+    """Uso do cache de GET /imoveis/contagem"""
+    return cache_contagem.metricas()
+
+
+@interno_router.get("/busca")
+def metricas_busca(usuario_atual: Usuario = Depends(obter_usuario_atual)):
+    """Tamanho do índice de busca (documentos, trigramas, entradas obsoletas)"""
+    return indice_busca.metricas()
+
+
+@interno_router.get("/versoes-imovel")
+def metricas_versoes_imovel(usuario_atual: Usuario = Depends(obter_usuario_atual)):
+    """Uso do cache de versões que responde os GET condicionais de imóveis"""
+    return cache_versoes.metricas()
+
+
+@interno_router.get("/telemetria")
+def metricas_telemetria(usuario_atual: Usuario = Depends(obter_usuario_atual)):
+    """Latência, consultas e tempo de banco por rota (o mesmo que GET /metrics, em JSON)"""
+    return telemetria.snapshot()
+
+
+@interno_router.get("/replicas")
+def estado_replicas(usuario_atual: Usuario = Depends(obter_usuario_atual)):
+    """Saúde das réplicas de leitura, leituras por réplica e leituras desviadas ao primário"""
+    return roteador_leitura.metricas()
+
+
+@interno_router.get("/notificacoes")
+def estado_notificacoes(db: Session = Depends(get_db), usuario_atual: Usuario = Depends(obter_usuario_atual)):
+    """Caixa de saída de lembretes: notificações por status e atraso da fila"""
+    return metricas_notificacoes(db)
@@ -0,0 +1,33 @@
+"""Exposição das métricas no formato do Prometheus
+
+GET /metrics fica fora da autenticação JWT (o coletor não faz login). Para
+restringir, defina METRICAS_TOKEN e configure o coletor com
+`authorization: {credentials: <token>}` (Bearer).
+"""
+import hmac
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from config import db as config_db
+from config.pool import status_pool
+from config.replicas import roteador_leitura
+from services.telemetria import texto_prometheus
+
+METRICAS_TOKEN = os.getenv("METRICAS_TOKEN", "")
+
+metricas_router = APIRouter(tags=["interno"])
+
+
+@metricas_router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metricas_prometheus(authorization: Optional[str] = Header(None)):
+    """Latência por rota, consultas/tempo de banco por requisição e pools de conexão"""
+    if METRICAS_TOKEN and not hmac.compare_digest(authorization or "", f"Bearer {METRICAS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Token de métricas inválido")
+    pools = {"sync": status_pool(config_db.db)}
+    if config_db.async_db is not None:
+        pools["async"] = status_pool(config_db.async_db.sync_engine)
+    pools.update(roteador_leitura.pools())
+    return PlainTextResponse(texto_prometheus(pools), media_type="text/plain; version=0.0.4; charset=utf-8")
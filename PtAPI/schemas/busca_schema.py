@@ -0,0 +1,9 @@
+"""Schemas Pydantic da busca rápida"""
+from pydantic import BaseModel
+
+
+class BuscaResultado(BaseModel):
+    tipo: str  # 'cliente' ou 'imovel'
+    id: int
+    rotulo: str
+    relevancia: int
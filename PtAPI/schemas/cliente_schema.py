@@ -0,0 +1,51 @@
+"""Schemas Pydantic para Cliente (PF/PJ)"""
+from datetime import date
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from schemas.tipos import CodigoEscolha
+
+
+class ClienteResumo(BaseModel):
+    """Dados públicos comuns a PF e PJ (sem senha)"""
+    id: int
+    tipo: str
+    nome: str
+    email: str
+    status: CodigoEscolha
+    telefone: str
+
+    class Config:
+        from_attributes = True
+
+
+class SocioRepresentanteResponse(BaseModel):
+    id: int
+    empresa_id: int
+    pessoa_fisica_id: int
+    cargo: CodigoEscolha
+    data_admissao: Optional[date] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ClienteDetalhe(ClienteResumo):
+    """ClienteResumo + campos do subtipo (PF ou PJ) e relacionamentos pedidos em ?include=
+
+    Só os campos do subtipo do cliente e os relacionamentos pedidos aparecem na resposta.
+    """
+    # Pessoa física
+    cpf: Optional[str] = None
+    rg: Optional[str] = None
+    data_de_nascimento: Optional[date] = None
+    participacoes: Optional[List[SocioRepresentanteResponse]] = None
+    # Pessoa jurídica
+    cnpj: Optional[str] = None
+    razao_social: Optional[str] = None
+    nome_fantasia: Optional[str] = None
+    inscricao_estadual: Optional[str] = None
+    endereco_comercial: Optional[str] = None
+    data_fundacao: Optional[date] = None
+    socios_representantes: Optional[List[SocioRepresentanteResponse]] = None
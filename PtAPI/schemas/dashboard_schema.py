@@ -0,0 +1,16 @@
+"""Schemas Pydantic do dashboard"""
+from pydantic import BaseModel
+
+
+class OcupacaoGrupo(BaseModel):
+    """Contadores de um grupo (estado, município, cliente, imóvel ou total) e taxas derivadas"""
+    nivel: str
+    chave: str
+    imoveis_ocupados: int
+    imoveis_desocupados: int
+    unidades_ocupadas: int
+    unidades_desocupadas: int
+    area_ocupada_m2: float
+    area_desocupada_m2: float
+    taxa_ocupacao_unidades: float
+    taxa_ocupacao_area: float
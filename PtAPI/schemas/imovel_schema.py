@@ -1,7 +1,11 @@
 """Schemas Pydantic para Imóvel, Unidades, Registros e Contas"""
-from pydantic import BaseModel, Field, constr
+from pydantic import BaseModel, Field, constr, model_validator
+from datetime import datetime
 from typing import Optional, List
 
+from schemas.cliente_schema import ClienteResumo
+from schemas.tipos import CodigoEscolha
+
 
 class EnderecoBase(BaseModel):
     rua: str
@@ -50,7 +54,7 @@ class RegistroMatriculaCreate(BaseModel):
 
 class RegistroMatriculaResponse(RegistroMatriculaCreate):
     id: int
-    data_registro: Optional[str]
+    data_registro: Optional[datetime]
 
     class Config:
         from_attributes = True
@@ -66,11 +70,36 @@ class ContaServicoCreate(BaseModel):
 
 class ContaServicoResponse(ContaServicoCreate):
     id: int
+    tipo: CodigoEscolha
+    status: Optional[CodigoEscolha] = 'ativo'
 
     class Config:
         from_attributes = True
 
 
+class ImovelImportacao(ImovelCreate):
+    """Árvore completa de um imóvel para importação em lote"""
+    unidades: List[ImovelUnidadeCreate] = []
+    registros: List[RegistroMatriculaCreate] = []
+    contas: List[ContaServicoCreate] = []
+
+
+class ImportacaoErro(BaseModel):
+    linha: int
+    erros: List[str]
+
+
+class ImportacaoResponse(BaseModel):
+    linhas: int
+    importados: int
+    falhas: int
+    erros: List[ImportacaoErro]
+
+
+class StatusOcupacaoUpdate(BaseModel):
+    status: str = Field(..., pattern="^(ocupado|desocupado)$")
+
+
 class IPTUCalculationRequest(BaseModel):
     valor_total_iptu: float = Field(..., gt=0)
     desconto_cota_unica: Optional[float] = 0.0
@@ -86,3 +115,50 @@ class IPTUUnitResult(BaseModel):
 
 class IPTUCalculationResponse(BaseModel):
     distribuicao: List[IPTUUnitResult]
+
+
+class IPTULoteItem(IPTUCalculationRequest):
+    imovel_id: int
+
+
+class IPTULoteRequest(BaseModel):
+    itens: List[IPTULoteItem] = Field(..., min_length=1, max_length=100000)
+
+
+class IPTULoteResultado(IPTUCalculationResponse):
+    imovel_id: int
+    encontrado: bool
+
+
+class IPTULoteResponse(BaseModel):
+    resultados: List[IPTULoteResultado]
+
+
+class IPTUZipRequest(BaseModel):
+    """Carnês dos imóveis listados em itens, ou da carteira inteira de um cliente
+
+    Com cliente_id e sem itens, o servidor carrega os imóveis do cliente e aplica
+    valor_total_iptu/desconto_cota_unica a cada um; com itens, todos devem
+    pertencer ao cliente.
+    """
+    itens: Optional[List[IPTULoteItem]] = Field(None, min_length=1, max_length=100000)
+    cliente_id: Optional[int] = None
+    valor_total_iptu: Optional[float] = Field(None, gt=0)
+    desconto_cota_unica: Optional[float] = 0.0
+
+    @model_validator(mode="after")
+    def _exigir_origem(self):
+        if self.itens is None:
+            if self.cliente_id is None:
+                raise ValueError("Informe itens ou cliente_id")
+            if self.valor_total_iptu is None:
+                raise ValueError("valor_total_iptu é obrigatório para gerar a carteira do cliente")
+        return self
+
+
+class ImovelDetalhe(ImovelResponse):
+    """ImovelResponse + relacionamentos pedidos em ?include= (os não pedidos ficam fora da resposta)"""
+    unidades: Optional[List[ImovelUnidadeResponse]] = None
+    registros: Optional[List[RegistroMatriculaResponse]] = None
+    contas: Optional[List[ContaServicoResponse]] = None
+    cliente: Optional[ClienteResumo] = None
@@ -0,0 +1,7 @@
+"""Tipos Pydantic compartilhados entre schemas"""
+from typing import Annotated
+
+from pydantic import BeforeValidator
+
+# Colunas ChoiceType chegam do banco como Choice(code, value); a API expõe o código
+CodigoEscolha = Annotated[str, BeforeValidator(lambda v: getattr(v, "code", v))]
@@ -0,0 +1,184 @@
+"""Servidor de produção: app pré-carregado uma vez e N workers por fork
+
+    python serve.py --workers 4 --bind 0.0.0.0:8000
+
+O processo mestre (gunicorn) monta a aplicação uma única vez (modelos,
+schemas, rotas, mapeamentos do SQLAlchemy), congela o heap no GC e só então
+faz fork dos workers (uvicorn). As páginas do app ficam compartilhadas por
+copy-on-write e cada worker sobe sem reimportar nada.
+
+Depois do fork, cada worker descarta o pool de conexões herdado
+(config/db.py, os.register_at_fork) e abre as próprias conexões. Cada
+worker é reciclado (encerramento gracioso; o mestre sobe outro) após
+WORKER_MAX_REQUESTS requisições (com jitter, para não reciclarem juntos) ou
+quando o RSS passa de WORKER_MAX_RSS_MB.
+
+Conexões: cada worker tem seu pool, então o banco recebe até
+workers × (DB_POOL_SIZE + DB_MAX_OVERFLOW) conexões (e cada réplica de
+DATABASE_REPLICA_URLS também).
+
+Com mais de um worker, a busca precisa de BUSCA_BACKEND=tabela: o índice em
+memória é por processo e o servidor se recusa a subir com ele. Pelo mesmo
+motivo, IMOVEL_VERSAO_TTL > 0 (cache de versões por processo) gera um aviso.
+
+Dependências: pip install gunicorn uvicorn (só Linux/macOS: usa fork).
+
+Variáveis de ambiente (os argumentos de linha de comando têm precedência):
+- WEB_BIND: endereço (padrão: 0.0.0.0:8000)
+- WEB_WORKERS: número de workers (padrão: núcleos da máquina)
+- WEB_TIMEOUT: segundos sem resposta antes de o mestre matar o worker (padrão: 60)
+- WORKER_MAX_REQUESTS: recicla após N requisições, 0 desativa (padrão: 20000)
+- WORKER_MAX_REQUESTS_JITTER: variação aleatória somada ao limite (padrão: 10% dele)
+- WORKER_MAX_RSS_MB: recicla acima de N MB de memória residente, 0 desativa (padrão: 0)
+- WORKER_RSS_INTERVALO_S: intervalo da checagem de RSS (padrão: 10)
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger("serve")
+
+WEB_BIND = os.getenv("WEB_BIND", "0.0.0.0:8000")
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", os.cpu_count() or 1))
+WEB_TIMEOUT = int(os.getenv("WEB_TIMEOUT", "60"))
+WORKER_MAX_REQUESTS = int(os.getenv("WORKER_MAX_REQUESTS", "20000"))
+WORKER_MAX_REQUESTS_JITTER = int(os.getenv("WORKER_MAX_REQUESTS_JITTER", WORKER_MAX_REQUESTS // 10))
+WORKER_MAX_RSS_MB = int(os.getenv("WORKER_MAX_RSS_MB", "0"))
+WORKER_RSS_INTERVALO_S = float(os.getenv("WORKER_RSS_INTERVALO_S", "10"))
+
+
+def rss_mb() -> Optional[float]:
+    """Memória residente atual do processo (Linux: /proc; outros: pico via getrusage)"""
+    try:
+        with open("/proc/self/statm") as arquivo:
+            paginas = int(arquivo.read().split()[1])
+        return paginas * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        import sys
+
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico / 2 ** 20 if sys.platform == "darwin" else pico / 1024
+    except (ImportError, OSError):
+        return None
+
+
+def _vigiar_rss(limite_mb: int, intervalo_s: float) -> None:
+    """Thread do worker: acima do limite, pede o próprio encerramento gracioso"""
+    while True:
+        time.sleep(intervalo_s)
+        atual = rss_mb()
+        if atual is not None and atual > limite_mb:
+            logger.warning(f"Worker {os.getpid()} com {atual:.0f} MB de RSS (limite {limite_mb} MB): reciclando")
+            # SIGTERM: o uvicorn termina as requisições em andamento; o mestre sobe outro worker
+            os.kill(os.getpid(), signal.SIGTERM)
+            return
+
+
+def pre_carregar():
+    """Executado uma vez no mestre, antes do fork"""
+    from sqlalchemy.orm import configure_mappers
+
+    from main import create_app
+
+    aplicacao = create_app()
+    # Mapeamentos resolvidos aqui, não na primeira consulta de cada worker
+    configure_mappers()
+    # Objetos do pré-carregamento fora das coletas do GC: sem isso, o GC dos
+    # workers escreve nos cabeçalhos desses objetos e desfaz o copy-on-write
+    gc.collect()
+    gc.freeze()
+    return aplicacao
+
+
+def _ao_iniciar_worker(worker) -> None:
+    # Hook post_worker_init: roda no worker recém-criado, antes de atender.
+    # O pool herdado já foi descartado pelo os.register_at_fork de config/db.py.
+    if WORKER_MAX_RSS_MB > 0:
+        threading.Thread(
+            target=_vigiar_rss, args=(WORKER_MAX_RSS_MB, WORKER_RSS_INTERVALO_S),
+            name="vigia-rss", daemon=True,
+        ).start()
+    logger.info(f"Worker {os.getpid()} pronto ({rss_mb() or 0:.0f} MB de RSS)")
+
+
+def _ao_sair_worker(servidor, worker) -> None:
+    logger.info(f"Worker {worker.pid} encerrado; o mestre sobe um substituto se ainda estiver ativo")
+
+
+def verificar_workers(workers: int) -> None:
+    """Recusa configurações em que cada worker enxergaria dados diferentes"""
+    from services.busca import BUSCA_BACKEND
+
+    if workers > 1 and BUSCA_BACKEND != "tabela":
+        # Índice em memória é por processo: cada worker só veria as próprias escritas
+        raise SystemExit(
+            f"BUSCA_BACKEND={BUSCA_BACKEND} mantém o índice de busca em cada processo e não serve "
+            f"com {workers} workers. Use BUSCA_BACKEND=tabela (popular uma vez com "
+            "`python -m services.busca`) ou --workers 1."
+        )
+
+    from services.versoes import IMOVEL_VERSAO_TTL
+
+    if workers > 1 and IMOVEL_VERSAO_TTL > 0:
+        logger.warning(
+            f"IMOVEL_VERSAO_TTL={IMOVEL_VERSAO_TTL:g} com {workers} workers: o cache de versões é por processo "
+            "e GET /imoveis/{id} pode responder 304 com ETag antigo por até esse tempo depois de uma "
+            "alteração feita em outro worker. Use IMOVEL_VERSAO_TTL=0."
+        )
+
+
+def servir(bind: str, workers: int, max_requests: int, jitter: int, timeout: int) -> None:
+    verificar_workers(workers)
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        raise SystemExit("serve.py precisa de gunicorn e uvicorn: pip install gunicorn uvicorn")
+
+    from config.pool import DB_MAX_OVERFLOW, DB_POOL_SIZE
+
+    class Aplicacao(BaseApplication):
+        def load_config(self):
+            opcoes = {
+                "bind": bind,
+                "workers": workers,
+                "worker_class": "uvicorn.workers.UvicornWorker",
+                "preload_app": True,
+                "max_requests": max_requests,
+                "max_requests_jitter": jitter if max_requests else 0,
+                "timeout": timeout,
+                "graceful_timeout": 30,
+                "keepalive": 5,
+                "post_worker_init": _ao_iniciar_worker,
+                "child_exit": _ao_sair_worker,
+            }
+            for chave, valor in opcoes.items():
+                self.cfg.set(chave, valor)
+
+        def load(self):
+            return pre_carregar()
+
+    logger.info(
+        f"{workers} workers em {bind}; até {workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW)} conexões no banco "
+        f"({workers} x (DB_POOL_SIZE={DB_POOL_SIZE} + DB_MAX_OVERFLOW={DB_MAX_OVERFLOW}))"
+    )
+    Aplicacao().run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bind", default=WEB_BIND)
+    parser.add_argument("--workers", type=int, default=WEB_WORKERS)
+    parser.add_argument("--max-requests", type=int, default=WORKER_MAX_REQUESTS)
+    parser.add_argument("--max-requests-jitter", type=int, default=WORKER_MAX_REQUESTS_JITTER)
+    parser.add_argument("--timeout", type=int, default=WEB_TIMEOUT)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(process)d] %(levelname)s %(name)s: %(message)s")
+    servir(args.bind, args.workers, args.max_requests, args.max_requests_jitter, args.timeout)
@@ -0,0 +1,393 @@
+"""Índice invertido de trigramas para a busca rápida (GET /busca)
+
+Cada cliente e imóvel vira um documento: campos normalizados (minúsculas,
+sem acento; CPF/CNPJ/CEP só com dígitos) indexados pelos seus trigramas.
+A consulta lê a lista de documentos do trigrama mais raro (ou cruza as
+listas, no backend de tabela) e confirma o casamento no texto do
+documento: nunca há ILIKE '%x%' sobre as tabelas de origem.
+
+Backends (BUSCA_BACKEND):
+- memoria (padrão): índice no processo, montado na partida; alterações
+  entram no commit. Cada processo só enxerga as próprias escritas: serve.py
+  se recusa a subir com mais de um worker neste backend
+- tabela: busca_documentos/busca_trigramas, gravadas na mesma transação
+  da alteração
+
+As escritas chegam pelos eventos do SQLAlchemy: after_insert/after_update/
+after_delete (unit of work) e do_orm_execute para INSERT em lote com
+RETURNING (rotas de criação e importação). UPDATE/DELETE em lote por
+statement não são acompanhados: reconstruir com `python -m services.busca`.
+
+Variáveis de ambiente:
+- BUSCA_BACKEND: memoria | tabela
+- BUSCA_INDEXAR_NA_PARTIDA: monta o índice em memória ao subir a API (padrão: true)
+- BUSCA_MAX_CANDIDATOS: documentos confirmados por consulta antes de ordenar (padrão: 500)
+"""
+import os
+import re
+import threading
+import unicodedata
+from array import array
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import delete, event, func, insert, inspect, select, tuple_
+from sqlalchemy.orm import Session, object_session, with_polymorphic
+
+from models.busca import BuscaDocumento, BuscaTrigrama
+from models.cliente import Cliente, ClienteFisica, ClienteJuridica
+from models.contratos import Imovel
+
+BUSCA_BACKEND = os.getenv("BUSCA_BACKEND", "memoria").lower()
+BUSCA_INDEXAR_NA_PARTIDA = os.getenv("BUSCA_INDEXAR_NA_PARTIDA", "true").lower() in ("1", "true", "sim", "yes")
+BUSCA_MAX_CANDIDATOS = int(os.getenv("BUSCA_MAX_CANDIDATOS", "500"))
+
+TIPOS = ("cliente", "imovel")
+
+# Campos que, alterados, exigem reindexar o documento
+CAMPOS_INDEXADOS = {
+    Cliente: ("nome", "email"),
+    ClienteFisica: ("nome", "email", "cpf"),
+    ClienteJuridica: ("nome", "email", "cnpj", "razao_social", "nome_fantasia"),
+    Imovel: ("rua", "numero", "bairro", "municipio", "estado", "cep"),
+}
+
+
+class Documento(NamedTuple):
+    tipo: str
+    entidade_id: int
+    rotulo: str
+    campos: Tuple[str, ...]
+
+
+def normalizar(texto) -> str:
+    """Minúsculas, sem acentos; só letras, dígitos, '@' e '.' separados por um espaço"""
+    if not texto:
+        return ""
+    ascii_ = unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode()
+    return " ".join(re.sub(r"[^a-z0-9@.]+", " ", ascii_.lower()).split())
+
+
+def digitos(texto) -> str:
+    return re.sub(r"\D", "", str(texto or ""))
+
+
+def normalizar_consulta(consulta: str) -> str:
+    """Consultas só com números e pontuação (CPF, CNPJ, CEP) comparam apenas os dígitos"""
+    if re.fullmatch(r"[\d.\-/\s]+", consulta.strip()):
+        return digitos(consulta)
+    return normalizar(consulta)
+
+
+def trigramas(texto: str) -> set:
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def _documento(classe, fonte) -> Optional[Documento]:
+    """Documento de busca de um Cliente/Imovel (objeto ORM ou dict de parâmetros de INSERT)"""
+    valor = fonte.get if isinstance(fonte, dict) else (lambda campo: getattr(fonte, campo, None))
+    if issubclass(classe, Imovel):
+        rotulo = f"{valor('rua')}, {valor('numero')} - {valor('bairro')} / {valor('municipio')}-{valor('estado')}"
+        campos = (
+            normalizar(f"{valor('rua')} {valor('numero') or ''}"),
+            normalizar(valor("bairro")),
+            normalizar(valor("municipio")),
+            digitos(valor("cep")),
+        )
+        return Documento("imovel", valor("id"), rotulo, tuple(c for c in campos if c))
+    if issubclass(classe, Cliente):
+        campos = [normalizar(valor("nome")), normalizar(valor("email"))]
+        if issubclass(classe, ClienteFisica):
+            campos.append(digitos(valor("cpf")))
+        elif issubclass(classe, ClienteJuridica):
+            campos += [digitos(valor("cnpj")), normalizar(valor("razao_social")), normalizar(valor("nome_fantasia"))]
+        return Documento("cliente", valor("id"), valor("nome") or "", tuple(c for c in campos if c))
+    return None
+
+
+def relevancia(consulta: str, campos: Iterable[str]) -> int:
+    """3: campo igual à consulta; 2: campo começa com ela; 1: alguma palavra começa; 0: no meio; -1: não casa"""
+    melhor = -1
+    for campo in campos:
+        if consulta not in campo:
+            continue
+        if campo == consulta:
+            return 3
+        if campo.startswith(consulta):
+            melhor = max(melhor, 2)
+        elif (" " + consulta) in campo:
+            melhor = max(melhor, 1)
+        else:
+            melhor = max(melhor, 0)
+    return melhor
+
+
+def _ordenar(resultados: List[Dict], limite: int) -> List[Dict]:
+    resultados.sort(key=lambda r: (-r["relevancia"], len(r["rotulo"]), r["tipo"], r["id"]))
+    return resultados[:limite]
+
+
+class IndiceMemoria:
+    """Listas de documentos por trigrama em arrays compactos, no processo
+
+    Documentos removidos/alterados deixam entradas obsoletas nas listas, ignoradas
+    na leitura; as listas são recompactadas quando as obsoletas passam de 25%.
+    """
+
+    transacional = False
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._documentos: Dict[int, Documento] = {}
+        self._listas: Dict[str, array] = {}
+        self._entradas = 0
+        self._obsoletas = 0
+
+    @staticmethod
+    def _chave(tipo: str, entidade_id: int) -> int:
+        return entidade_id * len(TIPOS) + TIPOS.index(tipo)
+
+    def _indexar(self, chave: int, documento: Documento) -> None:
+        for trigrama in trigramas("\n".join(documento.campos)):
+            lista = self._listas.get(trigrama)
+            if lista is None:
+                lista = self._listas[trigrama] = array("I")  # 4 bytes por entrada (ids < 2^31)
+            lista.append(chave)
+            self._entradas += 1
+
+    def _desindexar(self, chave: int) -> None:
+        anterior = self._documentos.pop(chave, None)
+        if anterior is not None:
+            self._obsoletas += len(trigramas("\n".join(anterior.campos)))
+
+    def aplicar(self, operacoes: List[Tuple[str, str, int, Optional[Documento]]], conexao=None) -> None:
+        """operacoes: ("gravar" | "remover", tipo, id, documento)"""
+        with self._lock:
+            for operacao, tipo, entidade_id, documento in operacoes:
+                chave = self._chave(tipo, entidade_id)
+                self._desindexar(chave)
+                if operacao == "gravar":
+                    self._documentos[chave] = documento
+                    self._indexar(chave, documento)
+            if self._obsoletas > max(10000, self._entradas // 4):
+                self._compactar()
+
+    def _compactar(self) -> None:
+        self._listas, self._entradas, self._obsoletas = {}, 0, 0
+        for chave, documento in self._documentos.items():
+            self._indexar(chave, documento)
+
+    def substituir(self, documentos: Iterable[Documento], conexao=None) -> int:
+        novo = IndiceMemoria()
+        for documento in documentos:
+            chave = self._chave(documento.tipo, documento.entidade_id)
+            novo._documentos[chave] = documento
+            novo._indexar(chave, documento)
+        with self._lock:
+            self._documentos, self._listas = novo._documentos, novo._listas
+            self._entradas, self._obsoletas = novo._entradas, 0
+        return len(self._documentos)
+
+    def buscar(self, consulta: str, tipos: Iterable[str], limite: int, conexao=None) -> List[Dict]:
+        tris = trigramas(consulta)
+        codigos = {TIPOS.index(t) for t in tipos}
+        resultados, vistos = [], set()
+        with self._lock:
+            listas = [self._listas.get(t) for t in tris]
+            if not listas or any(lista is None for lista in listas):
+                return []
+            # só a lista mais rara é percorrida; o casamento é confirmado no texto
+            for chave in min(listas, key=len):
+                if chave in vistos or chave % len(TIPOS) not in codigos:
+                    continue
+                vistos.add(chave)
+                documento = self._documentos.get(chave)
+                if documento is None:
+                    continue
+                nota = relevancia(consulta, documento.campos)
+                if nota < 0:
+                    continue
+                resultados.append({
+                    "tipo": documento.tipo, "id": documento.entidade_id,
+                    "rotulo": documento.rotulo, "relevancia": nota,
+                })
+                if len(resultados) >= BUSCA_MAX_CANDIDATOS:
+                    break
+        return _ordenar(resultados, limite)
+
+    def metricas(self) -> Dict:
+        with self._lock:
+            return {
+                "backend": "memoria",
+                "documentos": len(self._documentos),
+                "trigramas": len(self._listas),
+                "entradas": self._entradas,
+                "entradas_obsoletas": self._obsoletas,
+            }
+
+
+class IndiceTabela:
+    """Índice em busca_documentos/busca_trigramas, gravado na transação da alteração"""
+
+    transacional = True
+
+    def aplicar(self, operacoes: List[Tuple[str, str, int, Optional[Documento]]], conexao) -> None:
+        chaves = [(tipo, entidade_id) for _, tipo, entidade_id, _ in operacoes]
+        for tabela in (BuscaTrigrama, BuscaDocumento):
+            conexao.execute(delete(tabela).where(tuple_(tabela.tipo, tabela.entidade_id).in_(chaves)))
+        self._gravar(conexao, [doc for operacao, _, _, doc in operacoes if operacao == "gravar"])
+
+    @staticmethod
+    def _gravar(conexao, documentos: List[Documento]) -> None:
+        if not documentos:
+            return
+        conexao.execute(insert(BuscaDocumento), [
+            {"tipo": d.tipo, "entidade_id": d.entidade_id, "rotulo": d.rotulo, "texto": "\n".join(d.campos)}
+            for d in documentos
+        ])
+        conexao.execute(insert(BuscaTrigrama), [
+            {"trigrama": t, "tipo": d.tipo, "entidade_id": d.entidade_id}
+            for d in documentos for t in trigramas("\n".join(d.campos))
+        ])
+
+    def substituir(self, documentos: Iterable[Documento], conexao, lote: int = 1000) -> int:
+        conexao.execute(delete(BuscaTrigrama))
+        conexao.execute(delete(BuscaDocumento))
+        total, bloco = 0, []
+        for documento in documentos:
+            bloco.append(documento)
+            if len(bloco) >= lote:
+                self._gravar(conexao, bloco)
+                total, bloco = total + len(bloco), []
+        self._gravar(conexao, bloco)
+        return total + len(bloco)
+
+    def buscar(self, consulta: str, tipos: Iterable[str], limite: int, conexao) -> List[Dict]:
+        tris = sorted(trigramas(consulta))
+        if not tris:
+            return []
+        # documentos que têm todos os trigramas da consulta, pela PK (trigrama, tipo, entidade_id)
+        candidatos = (
+            select(BuscaTrigrama.tipo, BuscaTrigrama.entidade_id)
+            .where(BuscaTrigrama.trigrama.in_(tris), BuscaTrigrama.tipo.in_(list(tipos)))
+            .group_by(BuscaTrigrama.tipo, BuscaTrigrama.entidade_id)
+            .having(func.count() == len(tris))
+            .limit(BUSCA_MAX_CANDIDATOS)
+            .subquery()
+        )
+        linhas = conexao.execute(
+            select(BuscaDocumento.tipo, BuscaDocumento.entidade_id, BuscaDocumento.rotulo, BuscaDocumento.texto)
+            .join(candidatos, (candidatos.c.tipo == BuscaDocumento.tipo)
+                  & (candidatos.c.entidade_id == BuscaDocumento.entidade_id))
+        ).all()
+        resultados = []
+        for tipo, entidade_id, rotulo, texto in linhas:
+            nota = relevancia(consulta, texto.split("\n"))
+            if nota >= 0:
+                resultados.append({"tipo": tipo, "id": entidade_id, "rotulo": rotulo, "relevancia": nota})
+        return _ordenar(resultados, limite)
+
+    def metricas(self, conexao=None) -> Dict:
+        return {"backend": "tabela"}
+
+
+indice_busca = IndiceTabela() if BUSCA_BACKEND == "tabela" else IndiceMemoria()
+
+
+def buscar(sessao: Session, consulta: str, tipos: Iterable[str] = TIPOS, limite: int = 20) -> List[Dict]:
+    """Resultados mistos de clientes e imóveis, mais relevantes primeiro"""
+    termo = normalizar_consulta(consulta)
+    if len(termo) < 3:
+        return []
+    conexao = sessao.connection() if indice_busca.transacional else None
+    return indice_busca.buscar(termo, tipos, limite, conexao)
+
+
+def documentos_do_banco(sessao: Session, lote: int = 1000) -> Iterator[Documento]:
+    """Todos os clientes (um SELECT com os subtipos) e imóveis, lidos em blocos"""
+    clientes = with_polymorphic(Cliente, [ClienteFisica, ClienteJuridica])
+    for entidade in (clientes, Imovel):
+        for objeto in sessao.scalars(select(entidade).execution_options(yield_per=lote)):
+            yield _documento(type(objeto), objeto)
+
+
+def reconstruir_indice(sessao: Session) -> int:
+    """Refaz o índice inteiro a partir das tabelas de origem; retorna o nº de documentos"""
+    conexao = sessao.connection() if indice_busca.transacional else None
+    total = indice_busca.substituir(documentos_do_banco(sessao), conexao)
+    sessao.commit()
+    return total
+
+
+# ---- Manutenção incremental via eventos do SQLAlchemy ----
+
+def _enfileirar(sessao: Optional[Session], conexao, operacoes: List) -> None:
+    """Backend de tabela grava já na transação; o de memória espera o commit"""
+    if not operacoes:
+        return
+    if indice_busca.transacional:
+        indice_busca.aplicar(operacoes, conexao)
+    elif sessao is not None:
+        sessao.info.setdefault("busca_pendentes", []).extend(operacoes)
+
+
+def _gravar(mapper, connection, target):
+    documento = _documento(type(target), target)
+    _enfileirar(object_session(target), connection, [("gravar", documento.tipo, documento.entidade_id, documento)])
+
+
+def _atualizar(mapper, connection, target):
+    estado = inspect(target)
+    campos = CAMPOS_INDEXADOS.get(type(target), ())
+    if any(estado.attrs[campo].history.has_changes() for campo in campos):
+        _gravar(mapper, connection, target)
+
+
+def _remover(mapper, connection, target):
+    tipo = "imovel" if isinstance(target, Imovel) else "cliente"
+    _enfileirar(object_session(target), connection, [("remover", tipo, target.id, None)])
+
+
+for _modelo in (Cliente, Imovel):
+    event.listen(_modelo, "after_insert", _gravar, propagate=True)
+    event.listen(_modelo, "after_update", _atualizar, propagate=True)
+    event.listen(_modelo, "after_delete", _remover, propagate=True)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _insert_em_lote(estado):
+    """insert(Modelo) não passa pelos eventos de mapper: indexar pelas linhas do RETURNING"""
+    if not estado.is_insert or estado.bind_mapper is None:
+        return None
+    classe = estado.bind_mapper.class_
+    if not issubclass(classe, (Cliente, Imovel)):
+        return None
+    if not len(estado.statement.exported_columns):
+        return None  # sem RETURNING não há ids: só a reconstrução alcança essas linhas
+    congelado = estado.invoke_statement().freeze()
+    parametros = estado.parameters if isinstance(estado.parameters, list) else [estado.parameters or {}]
+    operacoes = []
+    for linha, valores in zip(congelado().all(), parametros):
+        fonte = linha[0] if isinstance(linha[0], classe) else {**valores, "id": linha[0]}
+        documento = _documento(classe, fonte)
+        operacoes.append(("gravar", documento.tipo, documento.entidade_id, documento))
+    _enfileirar(estado.session, estado.session.connection(), operacoes)
+    return congelado()
+
+
+@event.listens_for(Session, "after_commit")
+def _aplicar_pendentes(sessao):
+    pendentes = sessao.info.pop("busca_pendentes", None)
+    if pendentes:
+        indice_busca.aplicar(pendentes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_pendentes(sessao):
+    sessao.info.pop("busca_pendentes", None)
+
+
+if __name__ == "__main__":
+    from config.db import SessionLocal
+
+    with SessionLocal() as sessao:
+        print(f"Índice de busca ({BUSCA_BACKEND}) reconstruído: {reconstruir_indice(sessao)} documentos")
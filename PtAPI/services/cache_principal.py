@@ -0,0 +1,140 @@
+"""Cache em processo de principais autenticados (token -> snapshot do Usuario)
+
+Evita jwt.decode + SELECT em usuarios a cada requisição autenticada.
+Cada entrada vive no máximo AUTH_CACHE_TTL segundos e nunca além do `exp`
+do próprio token. Alterações/remoções de Usuario invalidam as entradas do
+usuário via eventos do SQLAlchemy; updates/deletes em massa
+(query.update/delete) não disparam eventos e devem chamar invalidar_usuario.
+
+Variáveis de ambiente:
+- AUTH_CACHE_TTL: tempo máximo de vida de uma entrada em segundos (padrão: 60, 0 desativa)
+- AUTH_CACHE_MAX: número máximo de tokens em cache (padrão: 10000)
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+
+from sqlalchemy import event
+
+from models.usuario import Usuario
+
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+AUTH_CACHE_MAX = int(os.getenv("AUTH_CACHE_MAX", "10000"))
+
+# Colunas copiadas para o snapshot (o hash da senha fica de fora)
+_COLUNAS_SNAPSHOT = ("id", "nome", "email", "cpf", "rg", "data_de_nascimento")
+
+
+def snapshot_usuario(usuario: Usuario) -> Usuario:
+    """Cópia desanexada de sessão, somente leitura, sem o hash da senha"""
+    return Usuario(**{coluna: getattr(usuario, coluna) for coluna in _COLUNAS_SNAPSHOT})
+
+
+class CachePrincipal:
+    """LRU com TTL por entrada e índice reverso usuario_id -> chaves"""
+
+    def __init__(self, ttl: float = AUTH_CACHE_TTL, max_itens: int = AUTH_CACHE_MAX):
+        self.ttl = ttl
+        self.max_itens = max_itens
+        self._itens: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._por_usuario: Dict[int, Set[bytes]] = {}
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.invalidacoes = 0
+
+    @staticmethod
+    def _chave(token: str) -> bytes:
+        # Guarda apenas o digest: o token em si não fica na memória do cache
+        return hashlib.sha256(token.encode()).digest()
+
+    def _remover(self, chave: bytes) -> None:
+        item = self._itens.pop(chave, None)
+        if item is None:
+            return
+        chaves = self._por_usuario.get(item[1].id)
+        if chaves is not None:
+            chaves.discard(chave)
+            if not chaves:
+                del self._por_usuario[item[1].id]
+
+    def obter(self, token: str) -> Optional[Usuario]:
+        if self.ttl <= 0:
+            return None
+        chave = self._chave(token)
+        agora = time.monotonic()
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                self.falhas += 1
+                return None
+            expira_em, usuario = item
+            if expira_em <= agora:
+                self._remover(chave)
+                self.falhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return usuario
+
+    def guardar(self, token: str, usuario: Usuario, exp_token: Optional[float]) -> None:
+        """exp_token: timestamp UNIX do claim `exp`; a entrada nunca sobrevive a ele"""
+        ttl = self.ttl
+        if exp_token is not None:
+            ttl = min(ttl, exp_token - time.time())
+        if ttl <= 0:
+            return
+        chave = self._chave(token)
+        with self._lock:
+            self._remover(chave)
+            self._itens[chave] = (time.monotonic() + ttl, usuario)
+            self._por_usuario.setdefault(usuario.id, set()).add(chave)
+            while len(self._itens) > self.max_itens:
+                self._remover(next(iter(self._itens)))
+
+    def invalidar_usuario(self, usuario_id: int) -> None:
+        """Remove todas as entradas de um usuário (chamar após update/delete)"""
+        with self._lock:
+            chaves = self._por_usuario.pop(usuario_id, set())
+            for chave in chaves:
+                self._itens.pop(chave, None)
+            self.invalidacoes += len(chaves)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._itens.clear()
+            self._por_usuario.clear()
+
+    def metricas(self) -> Dict:
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                "itens": len(self._itens),
+                "max_itens": self.max_itens,
+                "ttl_s": self.ttl,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": round(self.acertos / total, 4) if total else 0.0,
+                "invalidacoes": self.invalidacoes,
+            }
+
+
+cache_principal = CachePrincipal()
+
+
+def invalidar_usuario(usuario_id: int) -> None:
+    """Hook explícito de invalidação para atualizações/remoções de Usuario"""
+    cache_principal.invalidar_usuario(usuario_id)
+
+
+@event.listens_for(Usuario, "after_update")
+def _usuario_atualizado(mapper, connection, target):
+    invalidar_usuario(target.id)
+
+
+@event.listens_for(Usuario, "after_delete")
+def _usuario_removido(mapper, connection, target):
+    invalidar_usuario(target.id)
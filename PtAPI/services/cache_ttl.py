@@ -0,0 +1,52 @@
+"""Cache LRU em memória com expiração por entrada"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+_AUSENTE = object()
+
+
+class CacheTTL:
+    """LRU limitado por número de itens; cada entrada expira após `ttl` segundos"""
+
+    def __init__(self, ttl: float, max_itens: int = 1024):
+        self.ttl = ttl
+        self.max_itens = max_itens
+        self._itens: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave: Hashable, padrao: Any = None) -> Any:
+        agora = time.monotonic()
+        with self._lock:
+            item = self._itens.get(chave, _AUSENTE)
+            if item is _AUSENTE or item[0] <= agora:
+                if item is not _AUSENTE:
+                    del self._itens[chave]
+                self.falhas += 1
+                return padrao
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return item[1]
+
+    def guardar(self, chave: Hashable, valor: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._itens[chave] = (time.monotonic() + (self.ttl if ttl is None else ttl), valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def remover(self, chave: Hashable) -> None:
+        with self._lock:
+            self._itens.pop(chave, None)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._itens.clear()
+
+    def metricas(self) -> Dict:
+        with self._lock:
+            return {"itens": len(self._itens), "max_itens": self.max_itens, "ttl_s": self.ttl,
+                    "acertos": self.acertos, "falhas": self.falhas}
@@ -0,0 +1,23 @@
+"""Utilitários de ETag / requisições condicionais (If-None-Match)"""
+from typing import Optional
+
+
+def formatar_etag(valor: str) -> str:
+    """ETag forte entre aspas, como exige a RFC 9110"""
+    return f'"{valor}"'
+
+
+def etag_corresponde(if_none_match: Optional[str], etag: str) -> bool:
+    """True se o cabeçalho If-None-Match contém o ETag (comparação fraca, como no GET)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    alvo = etag[2:] if etag.startswith("W/") else etag
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato.startswith("W/"):
+            candidato = candidato[2:]
+        if candidato == alvo:
+            return True
+    return False
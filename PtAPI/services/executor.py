@@ -0,0 +1,97 @@
+"""Pool de processos com fila limitada para trabalho pesado em CPU
+
+Usado para tarefas que não podem ocupar o threadpool do Starlette nem o
+event loop (hash de senhas, renderização de PDF). Quando a fila enche,
+executar() falha imediatamente com ExecutorSobrecarregado (503 nas rotas).
+
+As funções enviadas rodam no processo filho e devem retornar a tupla
+(resultado, segundos gastos), para separar tempo de execução de espera.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from services.metricas import Histograma
+
+
+class ExecutorSobrecarregado(Exception):
+    """Fila do executor está cheia"""
+
+
+class ExecutorProcessos:
+    """Pool de processos com capacidade limitada e métricas de fila/latência"""
+
+    def __init__(self, workers: int, fila_max: int, excecao=ExecutorSobrecarregado):
+        self.workers = workers
+        self.fila_max = fila_max
+        self.capacidade = workers + fila_max
+        self.excecao = excecao
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pendentes = 0
+        self.rejeitados = 0
+        self.latencia_execucao = Histograma()
+        self.latencia_total = Histograma()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._apos_fork)
+
+    def _apos_fork(self) -> None:
+        # O pool de processos (e suas threads de gerência) não sobrevive ao fork:
+        # o filho cria o próprio no primeiro uso
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pendentes = 0
+
+    def _obter_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def _reservar(self) -> None:
+        with self._lock:
+            if self._pendentes >= self.capacidade:
+                self.rejeitados += 1
+                raise self.excecao()
+            self._pendentes += 1
+
+    def _liberar(self) -> None:
+        with self._lock:
+            self._pendentes -= 1
+
+    async def executar(self, funcao, *args):
+        """Envia a função ao pool sem ocupar thread; falha imediatamente se a fila estiver cheia"""
+        self._reservar()
+        inicio = time.perf_counter()
+        try:
+            futuro = self._obter_pool().submit(funcao, *args)
+            resultado, duracao = await asyncio.wrap_future(futuro)
+        finally:
+            self._liberar()
+        self.latencia_execucao.observar(duracao)
+        self.latencia_total.observar(time.perf_counter() - inicio)
+        return resultado
+
+    def metricas(self) -> Dict:
+        with self._lock:
+            pendentes = self._pendentes
+            rejeitados = self.rejeitados
+        return {
+            "workers": self.workers,
+            "fila_max": self.fila_max,
+            "em_andamento": min(pendentes, self.workers),
+            "profundidade_fila": max(0, pendentes - self.workers),
+            "rejeitados": rejeitados,
+            "latencia_execucao_s": self.latencia_execucao.snapshot(),
+            "latencia_total_s": self.latencia_total.snapshot(),
+        }
+
+    def encerrar(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,189 @@
+"""Faturamento mensal de aluguéis: uma cobrança por contrato vigente e competência
+
+    python -m services.faturamento 2026-11
+    python -m services.faturamento 2026-11 --lote 5000 --reprocessar
+
+Percorre os contratos em ordem de id (keyset, FATURAMENTO_LOTE por vez; só
+id, valor e dia de vencimento em memória) e grava as cobranças de cada lote
+com um único INSERT em lote. Cada lote é uma transação que também grava o
+progresso em faturamento_execucoes (último contrato processado): se o
+processo cair, a próxima execução da mesma competência continua do lote
+seguinte ao último confirmado.
+
+Idempotente por (contrato, competência): com a UNIQUE de cobrancas e
+ON CONFLICT DO NOTHING (PostgreSQL/SQLite; nos outros bancos, as já
+existentes no lote são filtradas antes), repetir uma competência ou rodar
+duas execuções ao mesmo tempo não duplica cobranças. Uma competência
+concluída só é percorrida de novo com --reprocessar (ex.: contratos
+cadastrados depois do faturamento).
+
+Contrato vigente na competência: valor_aluguel e dia_vencimento preenchidos,
+data_inicio (se houver) até o fim do mês e data_fim (se houver) a partir do
+primeiro dia. A cobrança é do valor integral (sem pro rata) e vence no
+dia_vencimento do mês da competência (no último dia, em meses mais curtos).
+
+Variáveis de ambiente:
+- FATURAMENTO_LOTE: contratos por lote/transação (padrão: 2000)
+"""
+import calendar
+import logging
+import os
+import time
+from datetime import date, datetime
+from typing import Dict, List
+
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.contratos import Contratos
+from models.faturamento import Cobranca, FaturamentoExecucao
+
+logger = logging.getLogger(__name__)
+
+FATURAMENTO_LOTE = int(os.getenv("FATURAMENTO_LOTE", "2000"))
+
+
+def competencia_de_texto(texto: str) -> date:
+    """'AAAA-MM' -> primeiro dia do mês"""
+    try:
+        return datetime.strptime(texto, "%Y-%m").date()
+    except ValueError:
+        raise ValueError(f"Competência inválida: {texto!r} (use AAAA-MM)")
+
+
+def ultimo_dia(competencia: date) -> date:
+    return competencia.replace(day=calendar.monthrange(competencia.year, competencia.month)[1])
+
+
+def vencimento(competencia: date, dia_vencimento: int) -> date:
+    """Dia de vencimento no mês da competência, limitado ao último dia do mês"""
+    return competencia.replace(day=max(1, min(dia_vencimento, ultimo_dia(competencia).day)))
+
+
+def contratos_vigentes(competencia: date):
+    """Condição de contrato faturável na competência"""
+    return (
+        Contratos.valor_aluguel.isnot(None),
+        Contratos.dia_vencimento.isnot(None),
+        or_(Contratos.data_inicio.is_(None), Contratos.data_inicio <= ultimo_dia(competencia)),
+        or_(Contratos.data_fim.is_(None), Contratos.data_fim >= competencia),
+    )
+
+
+def _inserir_cobrancas(conexao, linhas: List[Dict]) -> int:
+    """INSERT em lote ignorando (contrato, competência) já cobrados; retorna quantas entraram"""
+    tabela = Cobranca.__table__
+    dialeto = conexao.dialect.name
+    if dialeto in ("postgresql", "sqlite"):
+        if dialeto == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        comando = (
+            upsert(tabela)
+            .on_conflict_do_nothing(index_elements=["contrato_id", "competencia"])
+            .returning(tabela.c.id)
+        )
+        return len(conexao.execute(comando, linhas).all())
+
+    # outros bancos: filtrar as existentes (execuções concorrentes podem esbarrar na UNIQUE)
+    existentes = set(conexao.scalars(
+        select(tabela.c.contrato_id).where(
+            tabela.c.competencia == linhas[0]["competencia"],
+            tabela.c.contrato_id.in_([l["contrato_id"] for l in linhas]),
+        )
+    ))
+    novas = [l for l in linhas if l["contrato_id"] not in existentes]
+    if novas:
+        conexao.execute(insert(tabela), novas)
+    return len(novas)
+
+
+def _abrir_execucao(sessao: Session, competencia: date, reprocessar: bool) -> FaturamentoExecucao:
+    execucao = sessao.get(FaturamentoExecucao, competencia)
+    if execucao is None:
+        sessao.add(FaturamentoExecucao(competencia=competencia, status="em_andamento", ultimo_contrato_id=0,
+                                       cobrancas_geradas=0, lotes=0))
+        try:
+            sessao.commit()
+        except IntegrityError:
+            sessao.rollback()  # outra execução criou ao mesmo tempo: seguir com a dela
+        execucao = sessao.get(FaturamentoExecucao, competencia)
+    elif execucao.status == "concluida" and reprocessar:
+        execucao.status = "em_andamento"
+        execucao.ultimo_contrato_id = 0
+        execucao.concluida_em = None
+        sessao.commit()
+    elif execucao.ultimo_contrato_id:
+        logger.info(f"Retomando faturamento de {competencia:%Y-%m} após o contrato {execucao.ultimo_contrato_id}")
+    return execucao
+
+
+def faturar(sessao: Session, competencia: date, lote: int = FATURAMENTO_LOTE, reprocessar: bool = False) -> Dict:
+    """Gera as cobranças da competência (ou continua uma execução interrompida)"""
+    competencia = competencia.replace(day=1)
+    execucao = _abrir_execucao(sessao, competencia, reprocessar)
+    inicio = time.perf_counter()
+    contratos = novas = lotes = 0
+
+    if execucao.status != "concluida":
+        vigentes = contratos_vigentes(competencia)
+        while True:
+            pagina = sessao.execute(
+                select(Contratos.id, Contratos.valor_aluguel, Contratos.dia_vencimento)
+                .where(Contratos.id > execucao.ultimo_contrato_id, *vigentes)
+                .order_by(Contratos.id)
+                .limit(lote)
+            ).all()
+            if not pagina:
+                break
+            agora = datetime.utcnow()
+            geradas = _inserir_cobrancas(sessao.connection(), [
+                {
+                    "contrato_id": contrato_id, "competencia": competencia, "valor": valor,
+                    "vencimento": vencimento(competencia, dia), "status": "pendente", "criado_em": agora,
+                }
+                for contrato_id, valor, dia in pagina
+            ])
+            # progresso na mesma transação das cobranças do lote
+            execucao.ultimo_contrato_id = pagina[-1].id
+            execucao.cobrancas_geradas += geradas
+            execucao.lotes += 1
+            sessao.commit()
+            contratos += len(pagina)
+            novas += geradas
+            lotes += 1
+            logger.info(f"Faturamento {competencia:%Y-%m}: lote {execucao.lotes}, até o contrato "
+                        f"{execucao.ultimo_contrato_id}, {geradas} cobranças")
+
+        execucao.status = "concluida"
+        execucao.concluida_em = datetime.utcnow()
+        sessao.commit()
+
+    return {
+        "competencia": f"{competencia:%Y-%m}",
+        "status": execucao.status,
+        "contratos_percorridos": contratos,
+        "cobrancas_novas": novas,
+        "lotes": lotes,
+        "cobrancas_total_execucao": execucao.cobrancas_geradas,
+        "segundos": round(time.perf_counter() - inicio, 2),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from config.db import SessionLocal
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("competencia", nargs="?", default=f"{date.today():%Y-%m}", help="AAAA-MM (padrão: mês atual)")
+    parser.add_argument("--lote", type=int, default=FATURAMENTO_LOTE)
+    parser.add_argument("--reprocessar", action="store_true", help="percorre de novo uma competência já concluída")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    with SessionLocal() as sessao:
+        print(json.dumps(faturar(sessao, competencia_de_texto(args.competencia), args.lote, args.reprocessar), indent=2))
@@ -0,0 +1,61 @@
+"""Executor dedicado para hash de senhas (argon2)
+
+O argon2 é propositalmente caro em CPU. Rodá-lo dentro do threadpool do
+Starlette faz um pico de logins bloquear todas as outras rotas, então o
+trabalho vai para um pool de processos próprio, com fila limitada:
+quando a fila enche, a requisição falha na hora (503) em vez de esperar.
+
+Variáveis de ambiente:
+- HASH_WORKERS: número de processos do pool (padrão: metade dos núcleos, mínimo 1)
+- HASH_FILA_MAX: máximo de hashes aguardando um processo livre (padrão: 64)
+"""
+import os
+import time
+from typing import Tuple
+
+from services.executor import ExecutorProcessos, ExecutorSobrecarregado
+
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+HASH_FILA_MAX = int(os.getenv("HASH_FILA_MAX", "64"))
+
+# Contexto criado sob demanda dentro de cada processo do pool
+_pwd_context = None
+
+
+class HashingSobrecarregado(ExecutorSobrecarregado):
+    """Fila do executor de hash está cheia"""
+
+
+def _obter_contexto():
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
+    return _pwd_context
+
+
+def _hash_no_worker(senha: str) -> Tuple[str, float]:
+    """Executado no processo filho: retorna (hash, tempo de CPU gasto)"""
+    inicio = time.perf_counter()
+    resultado = _obter_contexto().hash(senha)
+    return resultado, time.perf_counter() - inicio
+
+
+def _verificar_no_worker(senha_plana: str, senha_hash: str) -> Tuple[bool, float]:
+    """Executado no processo filho: retorna (confere, tempo de CPU gasto)"""
+    inicio = time.perf_counter()
+    resultado = _obter_contexto().verify(senha_plana, senha_hash)
+    return resultado, time.perf_counter() - inicio
+
+
+executor_hashing = ExecutorProcessos(HASH_WORKERS, HASH_FILA_MAX, excecao=HashingSobrecarregado)
+
+
+async def hash_senha(senha: str) -> str:
+    """Hash da senha usando argon2 no executor dedicado"""
+    return await executor_hashing.executar(_hash_no_worker, senha)
+
+
+async def verificar_senha(senha_plana: str, senha_hash: str) -> bool:
+    """Verifica se a senha plana corresponde ao hash no executor dedicado"""
+    return await executor_hashing.executar(_verificar_no_worker, senha_plana, senha_hash)
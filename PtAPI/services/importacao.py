@@ -0,0 +1,202 @@
+"""Importação em lote de imóveis com unidades, registros e contas
+
+O corpo é lido em streaming (NDJSON ou CSV), validado em lotes de
+IMPORTACAO_LOTE linhas e gravado com um INSERT em lote por tabela, com
+um commit por lote. Linhas inválidas entram no relatório de erros e não
+impedem a gravação das demais.
+
+CSV: uma linha de cabeçalho com os campos de ImovelCreate; as colunas
+opcionais `unidades`, `registros` e `contas` trazem listas em JSON.
+Cada registro deve ocupar uma única linha.
+"""
+import codecs
+import csv
+import json
+import os
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.cliente import Cliente
+from models.contratos import Contratos, Imovel, ImovelUnidade, RegistroMatricula, ContaServico
+from schemas.imovel_schema import ImovelImportacao
+
+IMPORTACAO_LOTE = int(os.getenv("IMPORTACAO_LOTE", "500"))
+
+CAMPOS_ANINHADOS = ("unidades", "registros", "contas")
+
+FORMATOS = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+}
+
+
+async def linhas_do_corpo(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Converte o corpo em streaming em linhas de texto, sem carregá-lo inteiro"""
+    decodificador = codecs.getincrementaldecoder("utf-8-sig")()
+    resto = ""
+    async for pedaco in stream:
+        resto += decodificador.decode(pedaco)
+        *linhas, resto = resto.split("\n")
+        for linha in linhas:
+            yield linha.rstrip("\r")
+    resto += decodificador.decode(b"", final=True)
+    if resto:
+        yield resto.rstrip("\r")
+
+
+def _erros_validacao(exc: ValidationError) -> List[str]:
+    return [f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in exc.errors()]
+
+
+class _LeitorCSV:
+    """Converte linhas CSV em dicts usando o cabeçalho da primeira linha"""
+
+    def __init__(self):
+        self.cabecalho: Optional[List[str]] = None
+
+    def __call__(self, linha: str) -> Optional[Dict]:
+        valores = next(csv.reader([linha]))
+        if self.cabecalho is None:
+            self.cabecalho = [c.strip() for c in valores]
+            return None
+        registro = {c: (v if v != "" else None) for c, v in zip(self.cabecalho, valores)}
+        for campo in CAMPOS_ANINHADOS:
+            registro[campo] = json.loads(registro[campo]) if registro.get(campo) else []
+        return registro
+
+
+async def _inserir(db: AsyncSession, itens: List[ImovelImportacao]) -> None:
+    """Um INSERT em lote por tabela; ids dos imóveis via RETURNING na ordem dos parâmetros"""
+    resultado = await db.scalars(
+        insert(Imovel).returning(Imovel.id, sort_by_parameter_order=True),
+        [item.model_dump(exclude=set(CAMPOS_ANINHADOS)) for item in itens],
+    )
+    ids = resultado.all()
+
+    unidades, registros, contas = [], [], []
+    for imovel_id, item in zip(ids, itens):
+        unidades.extend({**u.model_dump(), "imovel_id": imovel_id} for u in item.unidades)
+        # mesmo critério de criar_registro: só o último registro marcado fica como atual
+        ultimo_atual = max((i for i, r in enumerate(item.registros) if r.atual), default=None)
+        registros.extend(
+            {**r.model_dump(), "atual": i == ultimo_atual, "imovel_id": imovel_id}
+            for i, r in enumerate(item.registros)
+        )
+        contas.extend({**c.model_dump(), "status": c.status or "ativo", "imovel_id": imovel_id} for c in item.contas)
+
+    if unidades:
+        await db.execute(insert(ImovelUnidade), unidades)
+    if registros:
+        await db.execute(insert(RegistroMatricula), registros)
+    if contas:
+        await db.execute(insert(ContaServico), contas)
+
+
+class Importador:
+    """Acumula linhas validadas em lotes e grava cada lote em uma transação"""
+
+    def __init__(self, db: AsyncSession, tamanho_lote: int = IMPORTACAO_LOTE):
+        self.db = db
+        self.tamanho_lote = tamanho_lote
+        self.linhas = 0
+        self.importados = 0
+        self.erros: List[Dict] = []
+        self._lote: List[Tuple[int, ImovelImportacao]] = []
+
+    def registrar_erro(self, linha: int, erros: List[str]) -> None:
+        self.erros.append({"linha": linha, "erros": erros})
+
+    async def adicionar(self, linha: int, registro: Dict) -> None:
+        self.linhas += 1
+        try:
+            item = ImovelImportacao.model_validate(registro)
+        except ValidationError as exc:
+            self.registrar_erro(linha, _erros_validacao(exc))
+            return
+        self._lote.append((linha, item))
+        if len(self._lote) >= self.tamanho_lote:
+            await self.descarregar()
+
+    async def _validar_referencias(self) -> List[Tuple[int, ImovelImportacao]]:
+        """Confere clientes e contratos referenciados com uma consulta por tabela"""
+        cliente_ids = {item.cliente_id for _, item in self._lote}
+        contrato_ids = {u.contrato_id for _, item in self._lote for u in item.unidades if u.contrato_id}
+        clientes = set((await self.db.scalars(select(Cliente.id).where(Cliente.id.in_(cliente_ids)))).all())
+        contratos = set()
+        if contrato_ids:
+            contratos = set((await self.db.scalars(select(Contratos.id).where(Contratos.id.in_(contrato_ids)))).all())
+
+        validos = []
+        for linha, item in self._lote:
+            erros = []
+            if item.cliente_id not in clientes:
+                erros.append(f"cliente_id: cliente {item.cliente_id} não encontrado")
+            for i, u in enumerate(item.unidades):
+                if u.contrato_id and u.contrato_id not in contratos:
+                    erros.append(f"unidades.{i}.contrato_id: contrato {u.contrato_id} não encontrado")
+            if erros:
+                self.registrar_erro(linha, erros)
+            else:
+                validos.append((linha, item))
+        return validos
+
+    async def descarregar(self) -> None:
+        if not self._lote:
+            return
+        validos = await self._validar_referencias()
+        self._lote = []
+        if not validos:
+            return
+        try:
+            await _inserir(self.db, [item for _, item in validos])
+            await self.db.commit()
+            self.importados += len(validos)
+        except SQLAlchemyError:
+            await self.db.rollback()
+            # Lote rejeitado pelo banco: regravar linha a linha para isolar a(s) culpada(s)
+            for linha, item in validos:
+                try:
+                    await _inserir(self.db, [item])
+                    await self.db.commit()
+                    self.importados += 1
+                except SQLAlchemyError as exc:
+                    await self.db.rollback()
+                    motivo = type(getattr(exc, "orig", None) or exc).__name__
+                    self.registrar_erro(linha, [f"banco: registro rejeitado ({motivo})"])
+
+    def relatorio(self) -> Dict:
+        return {
+            "linhas": self.linhas,
+            "importados": self.importados,
+            "falhas": len(self.erros),
+            "erros": sorted(self.erros, key=lambda e: e["linha"]),
+        }
+
+
+async def importar_imoveis(
+    db: AsyncSession, linhas: AsyncIterator[str], formato: str, tamanho_lote: int = IMPORTACAO_LOTE
+) -> Dict:
+    """Importa árvores de imóveis de um fluxo de linhas NDJSON/CSV; retorna o relatório por linha"""
+    importador = Importador(db, tamanho_lote)
+    leitor_csv = _LeitorCSV() if formato == "csv" else None
+    numero = 0
+    async for texto in linhas:
+        numero += 1
+        if not texto.strip():
+            continue
+        try:
+            registro = leitor_csv(texto) if leitor_csv else json.loads(texto)
+        except (ValueError, csv.Error) as exc:
+            importador.linhas += 1
+            importador.registrar_erro(numero, [f"formato inválido: {exc}"])
+            continue
+        if registro is None:
+            continue  # cabeçalho CSV
+        await importador.adicionar(numero, registro)
+    await importador.descarregar()
+    return importador.relatorio()
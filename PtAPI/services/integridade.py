@@ -0,0 +1,38 @@
+"""Interpretação de violações de constraint (IntegrityError) independente do driver
+
+Rotas de escrita deixam o banco checar existência (FK) e duplicidade
+(UNIQUE) em vez de fazer SELECTs antes do INSERT; estas funções dizem
+qual constraint falhou para devolver o mesmo 400/404 de antes.
+"""
+from sqlalchemy.exc import IntegrityError
+
+
+def _texto_violacao(exc: IntegrityError) -> str:
+    """Nome da constraint (psycopg2/asyncpg) mais a mensagem do driver, em minúsculas"""
+    original = exc.orig
+    partes = [str(original)]
+    diag = getattr(original, "diag", None)  # psycopg2 / psycopg
+    if diag is not None and getattr(diag, "constraint_name", None):
+        partes.append(diag.constraint_name)
+    causa = getattr(original, "__cause__", None)  # asyncpg (via adaptador do SQLAlchemy)
+    if causa is not None and getattr(causa, "constraint_name", None):
+        partes.append(causa.constraint_name)
+    return " ".join(partes).lower()
+
+
+def eh_violacao_fk(exc: IntegrityError) -> bool:
+    texto = _texto_violacao(exc)
+    return "foreign key" in texto or "_fkey" in texto
+
+
+def coluna_violada(exc: IntegrityError, *colunas: str):
+    """Primeira das colunas citada na violação, ou None se o driver não informar
+
+    Ex.: PostgreSQL "imovel_unidades_imovel_id_fkey", "Key (email)=(...)";
+    SQLite "UNIQUE constraint failed: usuarios.email" (FKs no SQLite não citam coluna).
+    """
+    texto = _texto_violacao(exc)
+    for coluna in colunas:
+        if f"({coluna})" in texto or f".{coluna}" in texto or f"_{coluna}_" in texto or texto.endswith(f"_{coluna}"):
+            return coluna
+    return None
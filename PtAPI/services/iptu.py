@@ -0,0 +1,44 @@
+"""Rateio de IPTU em lote para vários imóveis"""
+from typing import AsyncIterator, Dict, List, Sequence
+
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.contratos import Imovel, ImovelUnidade
+from services.rateio import distribuir_iptu
+
+# Imóveis consultados por ida ao banco no rateio em lote
+IPTU_LOTE_CONSULTA = 1000
+
+
+async def ratear_portfolio(db: AsyncSession, itens: Sequence) -> AsyncIterator[Dict]:
+    """Rateia vários carnês de uma vez: uma consulta por bloco de imóveis, resultados na ordem dos itens
+
+    itens: objetos com imovel_id, valor_total_iptu e desconto_cota_unica
+    """
+    for inicio in range(0, len(itens), IPTU_LOTE_CONSULTA):
+        bloco = itens[inicio:inicio + IPTU_LOTE_CONSULTA]
+        ids = {item.imovel_id for item in bloco}
+
+        # LEFT JOIN: imóveis sem unidades com área também aparecem (para separar de inexistentes)
+        consulta = (
+            select(Imovel.id, ImovelUnidade.id, ImovelUnidade.nome_unidade, ImovelUnidade.area_m2)
+            .outerjoin(ImovelUnidade, and_(ImovelUnidade.imovel_id == Imovel.id, ImovelUnidade.area_m2 > 0))
+            .where(Imovel.id.in_(ids))
+            .order_by(Imovel.id, ImovelUnidade.id)
+        )
+        unidades_por_imovel: Dict[int, List[Dict]] = {}
+        for imovel_id, unidade_id, nome, area in (await db.execute(consulta)).all():
+            lista = unidades_por_imovel.setdefault(imovel_id, [])
+            if unidade_id is not None:
+                lista.append({"unidade_id": unidade_id, "nome_unidade": nome, "area_m2": area})
+
+        for item in bloco:
+            unidades = unidades_por_imovel.get(item.imovel_id)
+            yield {
+                "imovel_id": item.imovel_id,
+                "encontrado": unidades is not None,
+                "distribuicao": distribuir_iptu(
+                    unidades or [], item.valor_total_iptu, item.desconto_cota_unica or 0.0
+                ),
+            }
@@ -0,0 +1,69 @@
+"""Respostas JSON rápidas, sem revalidar o que a rota já montou
+
+O FastAPI valida o retorno de cada rota contra o response_model e só então
+serializa. Rotas que já produzem exatamente o modelo declarado (ou linhas
+prontas de um select de colunas) devolvem uma destas respostas e pulam a
+revalidação; o response_model continua valendo para a documentação.
+
+orjson é opcional (pip install orjson): sem ele, usa o json da biblioteca padrão.
+"""
+import json
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+
+def _padrao(valor: Any):
+    """Tipos fora do JSON nativo que aparecem em linhas do banco"""
+    if hasattr(valor, "code"):  # Choice das colunas ChoiceType (models/tipos.py)
+        return valor.code
+    raise TypeError(f"Tipo não serializável em JSON: {type(valor).__name__}")
+
+
+def dumps(conteudo: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(conteudo, default=_padrao, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        conteudo, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_padrao
+    ).encode("utf-8")
+
+
+class RespostaRapida(JSONResponse):
+    """JSONResponse serializada com orjson (sem revalidação pelo response_model)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+@lru_cache(maxsize=None)
+def _adaptador_lista(modelo: type) -> TypeAdapter:
+    return TypeAdapter(List[modelo])
+
+
+def resposta_modelo(
+    valor: Union[BaseModel, List[BaseModel]], status_code: int = 200, headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Modelo(s) já montados direto para bytes pelo núcleo do pydantic, sem revalidação"""
+    if isinstance(valor, BaseModel):
+        corpo = valor.model_dump_json().encode("utf-8")
+    elif valor:
+        corpo = _adaptador_lista(type(valor[0])).dump_json(valor)
+    else:
+        corpo = b"[]"
+    return Response(corpo, status_code=status_code, headers=headers, media_type="application/json")
+
+
+def resposta_linhas(
+    linhas: Sequence, status_code: int = 200, headers: Optional[Dict[str, str]] = None
+) -> RespostaRapida:
+    """Linhas de select(colunas...) serializadas em uma passada, sem objetos intermediários"""
+    # dict(zip(...)) com as chaves lidas uma vez: Row._asdict() por linha custa ~8x mais
+    chaves = linhas[0]._fields if linhas else ()
+    return RespostaRapida([dict(zip(chaves, linha)) for linha in linhas], status_code=status_code, headers=headers)
@@ -0,0 +1,48 @@
+"""Primitivas de métricas em processo (contadores e histogramas)"""
+import bisect
+import threading
+from typing import Dict, Sequence
+
+# Buckets padrão em segundos (de 1ms a 10s)
+BUCKETS_PADRAO = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histograma:
+    """Histograma com buckets fixos; observar() é O(log n) sob um lock curto"""
+
+    def __init__(self, buckets: Sequence[float] = BUCKETS_PADRAO):
+        self.buckets = tuple(sorted(buckets))
+        self._contagens = [0] * (len(self.buckets) + 1)
+        self._soma = 0.0
+        self._total = 0
+        self._maximo = 0.0
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float) -> None:
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            self._contagens[indice] += 1
+            self._soma += valor
+            self._total += 1
+            if valor > self._maximo:
+                self._maximo = valor
+
+    def snapshot(self) -> Dict:
+        """Retorna uma cópia consistente do histograma (buckets cumulativos)"""
+        with self._lock:
+            contagens = list(self._contagens)
+            soma, total, maximo = self._soma, self._total, self._maximo
+
+        acumulado = 0
+        buckets = {}
+        for limite, qtd in zip(self.buckets, contagens):
+            acumulado += qtd
+            buckets[str(limite)] = acumulado
+        buckets["+Inf"] = total
+        return {
+            "total": total,
+            "soma": round(soma, 6),
+            "media": round(soma / total, 6) if total else 0.0,
+            "maximo": round(maximo, 6),
+            "buckets": buckets,
+        }
@@ -0,0 +1,451 @@
+"""Lembretes de vencimento: agendador -> caixa de saída -> entrega SMTP em lote
+
+    python -m services.notificacoes                  # agendar e entregar (cron da manhã)
+    python -m services.notificacoes agendar          # só grava os lembretes na caixa de saída
+    python -m services.notificacoes entregar         # só envia as pendentes
+    python -m services.notificacoes --intervalo 300  # em laço, a cada 5 minutos
+
+Agendador: cobranças pendentes (cobrancas.vencimento; índice
+ix_cobrancas_status_vencimento_id) e contas de serviço ativas
+(contas_servicos.dia_vencimento; índice ix_contas_servicos_dia_vencimento_id)
+que vencem de hoje até hoje + NOTIFICACAO_ANTECEDENCIA_DIAS. Percorre em
+lotes por keyset (vencimento, id) e grava um lembrete por (item, vencimento)
+com INSERT ... ON CONFLICT DO NOTHING sobre a chave única: rodar de novo não
+duplica. Destinatário: e-mail do cliente do contrato, ou do proprietário do
+imóvel da conta.
+
+Entrega: pega NOTIFICACAO_LOTE pendentes já liberadas (FOR UPDATE SKIP LOCKED
+no PostgreSQL: entregadores concorrentes não pegam as mesmas), aplica o limite
+por destinatário e envia por até NOTIFICACAO_SMTP_CONEXOES conexões SMTP que
+ficam abertas entre as mensagens e os lotes (reabertas a cada
+NOTIFICACAO_SMTP_MENSAGENS_POR_CONEXAO mensagens ou se o servidor desconectar).
+O resultado do lote é gravado com um único UPDATE em lote. Falha temporária
+volta para a fila com espera crescente; recusa do servidor (5xx) ou
+NOTIFICACAO_MAX_TENTATIVAS esgotadas deixam a notificação em 'falha'.
+
+Limite por destinatário (NOTIFICACAO_LIMITE_DESTINATARIO, mesmo formato do
+rate limit): contado pelas enviadas na janela, na própria tabela, então vale
+entre execuções e processos. O excedente é adiado, não descartado.
+
+Servidor SMTP local para testes (mostra as mensagens no terminal):
+    pip install aiosmtpd && python -m aiosmtpd -n -l localhost:1025
+    NOTIFICACAO_SMTP_PORTA=1025 python -m services.notificacoes
+
+Variáveis de ambiente:
+- NOTIFICACAO_SMTP_HOST / NOTIFICACAO_SMTP_PORTA: servidor SMTP (padrão: localhost:25)
+- NOTIFICACAO_SMTP_USUARIO / NOTIFICACAO_SMTP_SENHA: login SMTP (opcional)
+- NOTIFICACAO_SMTP_STARTTLS: STARTTLS ao conectar (padrão: false)
+- NOTIFICACAO_SMTP_TIMEOUT: segundos por operação SMTP (padrão: 30)
+- NOTIFICACAO_SMTP_CONEXOES: conexões SMTP simultâneas (padrão: 4)
+- NOTIFICACAO_SMTP_MENSAGENS_POR_CONEXAO: reabre a conexão após N mensagens (padrão: 1000)
+- NOTIFICACAO_REMETENTE: From das mensagens (padrão: nao-responda@localhost)
+- NOTIFICACAO_ANTECEDENCIA_DIAS: lembra vencimentos até N dias à frente (padrão: 3)
+- NOTIFICACAO_LOTE: itens por lote no agendador e na entrega (padrão: 500)
+- NOTIFICACAO_LIMITE_DESTINATARIO: mensagens por destinatário, ex. "20/day" (padrão: 20/day)
+- NOTIFICACAO_MAX_TENTATIVAS: tentativas antes de 'falha' (padrão: 5)
+"""
+import base64
+import calendar
+import logging
+import os
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from email.header import Header
+from email.utils import formatdate
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from models.cliente import Cliente
+from models.contratos import ContaServico, Contratos, Imovel
+from models.faturamento import Cobranca
+from models.notificacao import Notificacao
+from services.rate_limit import PoliticaLimite
+
+logger = logging.getLogger(__name__)
+
+NOTIFICACAO_SMTP_HOST = os.getenv("NOTIFICACAO_SMTP_HOST", "localhost")
+NOTIFICACAO_SMTP_PORTA = int(os.getenv("NOTIFICACAO_SMTP_PORTA", "25"))
+NOTIFICACAO_SMTP_USUARIO = os.getenv("NOTIFICACAO_SMTP_USUARIO", "")
+NOTIFICACAO_SMTP_SENHA = os.getenv("NOTIFICACAO_SMTP_SENHA", "")
+NOTIFICACAO_SMTP_STARTTLS = os.getenv("NOTIFICACAO_SMTP_STARTTLS", "false").lower() in ("1", "true", "sim", "yes")
+NOTIFICACAO_SMTP_TIMEOUT = float(os.getenv("NOTIFICACAO_SMTP_TIMEOUT", "30"))
+NOTIFICACAO_SMTP_CONEXOES = int(os.getenv("NOTIFICACAO_SMTP_CONEXOES", "4"))
+NOTIFICACAO_SMTP_MENSAGENS_POR_CONEXAO = int(os.getenv("NOTIFICACAO_SMTP_MENSAGENS_POR_CONEXAO", "1000"))
+NOTIFICACAO_REMETENTE = os.getenv("NOTIFICACAO_REMETENTE", "nao-responda@localhost")
+NOTIFICACAO_ANTECEDENCIA_DIAS = int(os.getenv("NOTIFICACAO_ANTECEDENCIA_DIAS", "3"))
+NOTIFICACAO_LOTE = int(os.getenv("NOTIFICACAO_LOTE", "500"))
+NOTIFICACAO_LIMITE_DESTINATARIO = PoliticaLimite.de_texto(
+    "notificacao", os.getenv("NOTIFICACAO_LIMITE_DESTINATARIO", "20/day")
+)
+NOTIFICACAO_MAX_TENTATIVAS = int(os.getenv("NOTIFICACAO_MAX_TENTATIVAS", "5"))
+
+# espera antes de tentar de novo: 1 min, 2 min, 4 min... até 6 h
+_ESPERA_BASE_S = 60
+_ESPERA_MAX_S = 6 * 3600
+
+
+def _reais(valor) -> str:
+    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def dias_na_janela(hoje: date, antecedencia: int) -> Dict[int, date]:
+    """dia_vencimento -> data em que vence dentro da janela
+
+    Dias que não existem no mês (29 a 31) vencem no último dia, como no faturamento.
+    """
+    dias: Dict[int, date] = {}
+    for n in range(antecedencia + 1):
+        data = hoje + timedelta(days=n)
+        ultimo = calendar.monthrange(data.year, data.month)[1]
+        for dia in (range(data.day, 32) if data.day == ultimo else (data.day,)):
+            dias.setdefault(dia, data)
+    return dias
+
+
+def _paginas(sessao: Session, consulta, ordem, lote: int) -> Iterator[list]:
+    """Keyset pelas colunas de `ordem` (nomes iguais aos do resultado; a última é única)"""
+    ultima = None
+    while True:
+        pagina_consulta = consulta.order_by(*ordem).limit(lote)
+        if ultima is not None:
+            pagina_consulta = pagina_consulta.where(tuple_(*ordem) > tuple_(*ultima))
+        pagina = sessao.execute(pagina_consulta).all()
+        if not pagina:
+            return
+        yield pagina
+        ultima = tuple(getattr(pagina[-1], coluna.key) for coluna in ordem)
+
+
+def _gravar_na_caixa(conexao, linhas: List[Dict]) -> int:
+    """INSERT em lote ignorando chaves já gravadas; retorna quantas entraram"""
+    tabela = Notificacao.__table__
+    dialeto = conexao.dialect.name
+    if dialeto in ("postgresql", "sqlite"):
+        if dialeto == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        comando = upsert(tabela).on_conflict_do_nothing(index_elements=["chave"]).returning(tabela.c.id)
+        return len(conexao.execute(comando, linhas).all())
+    existentes = set(conexao.scalars(select(tabela.c.chave).where(tabela.c.chave.in_([l["chave"] for l in linhas]))))
+    novas = [l for l in linhas if l["chave"] not in existentes]
+    if novas:
+        conexao.execute(insert(tabela), novas)
+    return len(novas)
+
+
+def _lembretes_cobrancas(sessao: Session, hoje: date, antecedencia: int, lote: int) -> Iterator[List[Dict]]:
+    consulta = (
+        select(Cobranca.id, Cobranca.vencimento, Cobranca.valor, Cobranca.competencia, Cobranca.contrato_id, Cliente.email)
+        .join(Contratos, Contratos.id == Cobranca.contrato_id)
+        .join(Cliente, Cliente.id == Contratos.cliente_id)
+        .where(Cobranca.status == "pendente", Cobranca.vencimento.between(hoje, hoje + timedelta(days=antecedencia)))
+    )
+    for pagina in _paginas(sessao, consulta, (Cobranca.vencimento, Cobranca.id), lote):
+        yield [
+            {
+                "chave": f"cobranca:{l.id}:{l.vencimento.isoformat()}",
+                "destinatario": l.email,
+                "assunto": f"Aluguel vence em {l.vencimento:%d/%m/%Y}",
+                "corpo": (
+                    f"Lembrete: o aluguel do contrato {l.contrato_id} (competência {l.competencia:%m/%Y}), "
+                    f"no valor de {_reais(l.valor)}, vence em {l.vencimento:%d/%m/%Y}."
+                ),
+            }
+            for l in pagina
+        ]
+
+
+def _lembretes_contas(sessao: Session, hoje: date, antecedencia: int, lote: int) -> Iterator[List[Dict]]:
+    vencimentos = dias_na_janela(hoje, antecedencia)
+    consulta = (
+        select(ContaServico.id, ContaServico.dia_vencimento, ContaServico.tipo, ContaServico.numero_conta,
+               ContaServico.fornecedor, ContaServico.imovel_id, Cliente.email)
+        .join(Imovel, Imovel.id == ContaServico.imovel_id)
+        .join(Cliente, Cliente.id == Imovel.cliente_id)
+        .where(ContaServico.status == "ativo", ContaServico.dia_vencimento.in_(sorted(vencimentos)))
+    )
+    for pagina in _paginas(sessao, consulta, (ContaServico.dia_vencimento, ContaServico.id), lote):
+        linhas = []
+        for l in pagina:
+            vencimento = vencimentos[l.dia_vencimento]
+            linhas.append({
+                "chave": f"conta:{l.id}:{vencimento.isoformat()}",
+                "destinatario": l.email,
+                "assunto": f"Conta de {l.tipo} vence em {vencimento:%d/%m/%Y}",
+                "corpo": (
+                    f"Lembrete: a conta {l.numero_conta} ({l.fornecedor or l.tipo}) do imóvel {l.imovel_id} "
+                    f"vence em {vencimento:%d/%m/%Y}."
+                ),
+            })
+        yield linhas
+
+
+def agendar(sessao: Session, hoje: Optional[date] = None, antecedencia: int = NOTIFICACAO_ANTECEDENCIA_DIAS,
+            lote: int = NOTIFICACAO_LOTE) -> Dict:
+    """Grava na caixa de saída os lembretes de vencimento da janela (os já gravados são ignorados)"""
+    hoje = hoje or date.today()
+    inicio = time.perf_counter()
+    resultado = {}
+    for origem, gerar in (("cobrancas", _lembretes_cobrancas), ("contas", _lembretes_contas)):
+        itens = novas = 0
+        for linhas in gerar(sessao, hoje, antecedencia, lote):
+            agora = datetime.utcnow()
+            for linha in linhas:
+                linha.update(status="pendente", tentativas=0, proxima_tentativa_em=agora, criado_em=agora)
+            novas += _gravar_na_caixa(sessao.connection(), linhas)
+            sessao.commit()
+            itens += len(linhas)
+        resultado[origem] = {"vencendo": itens, "novas": novas}
+    resultado["segundos"] = round(time.perf_counter() - inicio, 2)
+    return resultado
+
+
+def _permanente(erro: Exception) -> bool:
+    """Recusa definitiva do servidor (5xx): tentar de novo não adianta"""
+    if isinstance(erro, smtplib.SMTPRecipientsRefused):
+        return all(500 <= codigo < 600 for codigo, _ in erro.recipients.values())
+    return isinstance(erro, smtplib.SMTPResponseException) and 500 <= erro.smtp_code < 600
+
+
+# (destinatário, mensagem já serializada)
+Mensagem = Tuple[str, bytes]
+
+
+def montar_mensagem(destinatario: str, assunto: str, corpo: str, remetente: str, data: str) -> Mensagem:
+    """text/plain UTF-8 serializado direto (EmailMessage custa ~1 ms por mensagem)"""
+    if not assunto.isascii():
+        assunto = Header(assunto, "utf-8").encode()
+    cabecalho = (
+        f"From: {remetente}\r\nTo: {destinatario}\r\nSubject: {assunto}\r\nDate: {data}\r\n"
+        "MIME-Version: 1.0\r\nContent-Type: text/plain; charset=utf-8\r\nContent-Transfer-Encoding: base64\r\n\r\n"
+    )
+    return destinatario, cabecalho.encode() + base64.encodebytes(corpo.encode()).replace(b"\n", b"\r\n")
+
+
+class EnviadorSMTP:
+    """Envia mensagens por até N conexões SMTP reaproveitadas (uma por thread de envio)"""
+
+    def __init__(self, host: str = NOTIFICACAO_SMTP_HOST, porta: int = NOTIFICACAO_SMTP_PORTA,
+                 conexoes: int = NOTIFICACAO_SMTP_CONEXOES,
+                 mensagens_por_conexao: int = NOTIFICACAO_SMTP_MENSAGENS_POR_CONEXAO,
+                 usuario: str = NOTIFICACAO_SMTP_USUARIO, senha: str = NOTIFICACAO_SMTP_SENHA,
+                 starttls: bool = NOTIFICACAO_SMTP_STARTTLS, timeout: float = NOTIFICACAO_SMTP_TIMEOUT,
+                 remetente: str = NOTIFICACAO_REMETENTE):
+        self.remetente = remetente
+        self.host = host
+        self.porta = porta
+        self.conexoes = max(1, conexoes)
+        self.mensagens_por_conexao = mensagens_por_conexao
+        self.usuario = usuario
+        self.senha = senha
+        self.starttls = starttls
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(self.conexoes, thread_name_prefix="smtp")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._abertas: List[smtplib.SMTP] = []
+        self.conexoes_abertas = 0
+
+    def _abrir(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.porta, timeout=self.timeout)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.usuario:
+                smtp.login(self.usuario, self.senha)
+        except BaseException:
+            smtp.close()
+            raise
+        with self._lock:
+            self._abertas.append(smtp)
+            self.conexoes_abertas += 1
+        return smtp
+
+    def _fechar(self, smtp: smtplib.SMTP) -> None:
+        with self._lock:
+            if smtp in self._abertas:
+                self._abertas.remove(smtp)
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+
+    def _conexao(self) -> smtplib.SMTP:
+        smtp = getattr(self._local, "smtp", None)
+        if smtp is not None and self._local.enviadas >= self.mensagens_por_conexao:
+            self._fechar(smtp)
+            smtp = None
+        if smtp is None:
+            smtp = self._local.smtp = self._abrir()
+            self._local.enviadas = 0
+        return smtp
+
+    def _descartar(self) -> None:
+        smtp = getattr(self._local, "smtp", None)
+        self._local.smtp = None
+        if smtp is not None:
+            self._fechar(smtp)
+
+    def _enviar_uma(self, mensagem: Mensagem) -> Optional[Exception]:
+        # uma reconexão por mensagem: o servidor pode ter fechado uma conexão ociosa
+        for tentativa in range(2):
+            try:
+                smtp = self._conexao()
+                smtp.sendmail(self.remetente, [mensagem[0]], mensagem[1])
+                self._local.enviadas += 1
+                return None
+            except smtplib.SMTPServerDisconnected as erro:
+                self._descartar()
+                if tentativa:
+                    return erro
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused) as erro:
+                # recusa da mensagem: o smtplib já mandou RSET, a conexão continua utilizável
+                # (na abertura, ex.: login recusado, não há conexão guardada)
+                return erro
+            except (smtplib.SMTPException, OSError) as erro:
+                self._descartar()
+                return erro
+
+    def _enviar_fatia(self, mensagens: List[Mensagem]) -> List[Optional[Exception]]:
+        return [self._enviar_uma(m) for m in mensagens]
+
+    def enviar(self, mensagens: List[Mensagem]) -> List[Optional[Exception]]:
+        """Envia o lote dividido entre as conexões; retorna o erro de cada mensagem (None = enviada)"""
+        if not mensagens:
+            return []
+        tamanho = -(-len(mensagens) // self.conexoes)
+        fatias = [mensagens[i:i + tamanho] for i in range(0, len(mensagens), tamanho)]
+        resultados: List[Optional[Exception]] = []
+        for parcial in self._executor.map(self._enviar_fatia, fatias):
+            resultados.extend(parcial)
+        return resultados
+
+    def encerrar(self) -> None:
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            abertas = list(self._abertas)
+        for smtp in abertas:
+            self._fechar(smtp)
+
+
+def entregar(sessao: Session, enviador: EnviadorSMTP, lote: int = NOTIFICACAO_LOTE,
+             limite: PoliticaLimite = NOTIFICACAO_LIMITE_DESTINATARIO,
+             max_tentativas: int = NOTIFICACAO_MAX_TENTATIVAS) -> Dict:
+    """Envia as notificações pendentes em lotes até esvaziar a fila liberada"""
+    inicio = time.perf_counter()
+    totais = {"enviadas": 0, "adiadas_limite": 0, "reagendadas": 0, "falhas": 0, "lotes": 0}
+    while True:
+        agora = datetime.utcnow()
+        pagina = sessao.execute(
+            select(Notificacao.id, Notificacao.destinatario, Notificacao.assunto, Notificacao.corpo,
+                   Notificacao.tentativas)
+            .where(Notificacao.status == "pendente", Notificacao.proxima_tentativa_em <= agora)
+            .order_by(Notificacao.id)
+            .limit(lote)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not pagina:
+            break
+
+        # limite por destinatário: enviadas na janela (índice destinatario, enviado_em)
+        enviadas = dict(sessao.execute(
+            select(Notificacao.destinatario, func.count())
+            .where(Notificacao.destinatario.in_({l.destinatario for l in pagina}),
+                   Notificacao.enviado_em >= agora - timedelta(seconds=limite.janela_s))
+            .group_by(Notificacao.destinatario)
+        ).all())
+        liberadas, atualizacoes = [], []
+        for linha in pagina:
+            if enviadas.get(linha.destinatario, 0) < limite.limite:
+                enviadas[linha.destinatario] = enviadas.get(linha.destinatario, 0) + 1
+                liberadas.append(linha)
+            else:
+                atualizacoes.append({
+                    "id": linha.id, "status": "pendente", "tentativas": linha.tentativas,
+                    "proxima_tentativa_em": agora + timedelta(seconds=limite.janela_s / limite.limite),
+                    "erro": None, "enviado_em": None,
+                })
+                totais["adiadas_limite"] += 1
+
+        data = formatdate(localtime=True)
+        erros = enviador.enviar([
+            montar_mensagem(l.destinatario, l.assunto, l.corpo, enviador.remetente, data) for l in liberadas
+        ])
+        enviado_em = datetime.utcnow()
+        for linha, erro in zip(liberadas, erros):
+            tentativas = linha.tentativas + 1
+            if erro is None:
+                atualizacoes.append({"id": linha.id, "status": "enviada", "tentativas": tentativas,
+                                     "proxima_tentativa_em": enviado_em, "erro": None, "enviado_em": enviado_em})
+                totais["enviadas"] += 1
+                continue
+            definitiva = _permanente(erro) or tentativas >= max_tentativas
+            espera = min(_ESPERA_MAX_S, _ESPERA_BASE_S * 2 ** (tentativas - 1))
+            atualizacoes.append({
+                "id": linha.id, "status": "falha" if definitiva else "pendente", "tentativas": tentativas,
+                "proxima_tentativa_em": enviado_em + timedelta(seconds=espera),
+                "erro": f"{type(erro).__name__}: {erro}"[:500], "enviado_em": None,
+            })
+            totais["falhas" if definitiva else "reagendadas"] += 1
+
+        # UPDATE em lote pela PK (executemany)
+        sessao.execute(update(Notificacao), atualizacoes)
+        sessao.commit()
+        totais["lotes"] += 1
+        logger.info(f"Notificações: lote {totais['lotes']}, {len(liberadas)} enviadas/tentadas, "
+                    f"{len(pagina) - len(liberadas)} adiadas pelo limite")
+
+    totais["conexoes_smtp_abertas"] = enviador.conexoes_abertas
+    totais["segundos"] = round(time.perf_counter() - inicio, 2)
+    return totais
+
+
+def metricas(sessao: Session) -> Dict:
+    """Notificações por status e atraso da pendente liberada mais antiga"""
+    por_status = dict(sessao.execute(select(Notificacao.status, func.count()).group_by(Notificacao.status)).all())
+    mais_antiga = sessao.scalar(
+        select(func.min(Notificacao.proxima_tentativa_em))
+        .where(Notificacao.status == "pendente", Notificacao.proxima_tentativa_em <= datetime.utcnow())
+    )
+    return {
+        "por_status": por_status,
+        "atraso_pendente_s": round((datetime.utcnow() - mais_antiga).total_seconds(), 1) if mais_antiga else 0.0,
+        "limite_destinatario": {"limite": NOTIFICACAO_LIMITE_DESTINATARIO.limite,
+                                "janela_s": NOTIFICACAO_LIMITE_DESTINATARIO.janela_s},
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from config.db import SessionLocal
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("etapa", nargs="?", choices=["agendar", "entregar", "tudo"], default="tudo")
+    parser.add_argument("--antecedencia", type=int, default=NOTIFICACAO_ANTECEDENCIA_DIAS, help="dias à frente")
+    parser.add_argument("--intervalo", type=float, default=0, help="repete a cada N segundos (0: uma vez)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    enviador = EnviadorSMTP()
+    try:
+        while True:
+            resultado = {}
+            with SessionLocal() as sessao:
+                if args.etapa in ("agendar", "tudo"):
+                    resultado["agendar"] = agendar(sessao, antecedencia=args.antecedencia)
+                if args.etapa in ("entregar", "tudo"):
+                    resultado["entregar"] = entregar(sessao, enviador)
+            print(json.dumps(resultado, indent=2, ensure_ascii=False))
+            if not args.intervalo:
+                break
+            time.sleep(args.intervalo)
+    finally:
+        enviador.encerrar()
@@ -0,0 +1,291 @@
+"""Estatísticas de ocupação mantidas incrementalmente
+
+A tabela ocupacao_resumo guarda contadores por grupo (total, estado,
+município, cliente e imóvel): imóveis ocupados/desocupados, unidades
+ocupadas/desocupadas e m² ocupados/desocupados. Cada mudança de
+Imovel.status_ocupacao ou de ImovelUnidade (status, área, inserção,
+remoção) aplica o delta nos grupos afetados com um upsert, na mesma
+transação da mudança. O dashboard lê os contadores em O(grupos), sem
+GROUP BY sobre as unidades.
+
+Acompanhado: unit of work do ORM (eventos de mapper) e INSERT em lote via
+insert(Modelo) (rotas de criação e importação). UPDATE/DELETE em lote por
+critério não passam por aqui: rodar `python -m services.ocupacao` para
+recalcular tudo a partir das tabelas de origem (com as escritas paradas).
+
+As linhas de total/estado concentram as escritas: sob muita concorrência
+de alterações de status, elas serializam as transações que as tocam.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import case, delete, event, func, insert, select, update
+from sqlalchemy.orm import Session, attributes
+
+from models.contratos import Imovel, ImovelUnidade
+from models.ocupacao import OcupacaoResumo
+
+NIVEIS = ("total", "estado", "municipio", "cliente", "imovel")
+
+CONTADORES = (
+    "imoveis_ocupados", "imoveis_desocupados",
+    "unidades_ocupadas", "unidades_desocupadas",
+    "area_ocupada_m2", "area_desocupada_m2",
+)
+
+Grupo = Tuple[str, str]
+
+
+def _codigo(status) -> str:
+    """Choice ou texto; unidade/imóvel sem status explícito nasce desocupado"""
+    return getattr(status, "code", status) or "desocupado"
+
+
+def grupos_do_imovel(imovel_id, cliente_id, municipio, estado) -> List[Grupo]:
+    return [
+        ("total", ""),
+        ("estado", estado),
+        ("municipio", f"{estado}/{municipio}"),
+        ("cliente", str(cliente_id)),
+        ("imovel", str(imovel_id)),
+    ]
+
+
+def delta_imovel(status, sinal: int = 1) -> Dict[str, float]:
+    return {"imoveis_ocupados" if _codigo(status) == "ocupado" else "imoveis_desocupados": sinal}
+
+
+def delta_unidade(status, area_m2, sinal: int = 1) -> Dict[str, float]:
+    if _codigo(status) == "ocupado":
+        return {"unidades_ocupadas": sinal, "area_ocupada_m2": sinal * (area_m2 or 0.0)}
+    return {"unidades_desocupadas": sinal, "area_desocupada_m2": sinal * (area_m2 or 0.0)}
+
+
+class Acumulador:
+    """Soma deltas por grupo e grava tudo com um upsert"""
+
+    def __init__(self):
+        self.grupos: Dict[Grupo, Dict[str, float]] = defaultdict(lambda: dict.fromkeys(CONTADORES, 0))
+
+    def somar(self, grupos: Iterable[Grupo], delta: Dict[str, float]) -> None:
+        for grupo in grupos:
+            contadores = self.grupos[grupo]
+            for campo, valor in delta.items():
+                contadores[campo] += valor
+
+    def gravar(self, conexao) -> None:
+        linhas = [
+            {"nivel": nivel, "chave": chave, **contadores}
+            for (nivel, chave), contadores in self.grupos.items()
+            if any(contadores.values())
+        ]
+        self.grupos.clear()
+        if not linhas:
+            return
+        dialeto = conexao.dialect.name
+        if dialeto in ("postgresql", "sqlite"):
+            if dialeto == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as upsert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as upsert
+            # ordem fixa das chaves: transações concorrentes travam as linhas na mesma ordem
+            linhas.sort(key=lambda l: (l["nivel"], l["chave"]))
+            comando = upsert(OcupacaoResumo)
+            conexao.execute(comando.on_conflict_do_update(
+                index_elements=["nivel", "chave"],
+                set_={c: getattr(OcupacaoResumo, c) + getattr(comando.excluded, c) for c in CONTADORES},
+            ), linhas)
+            return
+        for linha in linhas:  # outros bancos: UPDATE e, se não havia linha, INSERT
+            resultado = conexao.execute(
+                update(OcupacaoResumo)
+                .where(OcupacaoResumo.nivel == linha["nivel"], OcupacaoResumo.chave == linha["chave"])
+                .values({c: getattr(OcupacaoResumo, c) + linha[c] for c in CONTADORES})
+            )
+            if resultado.rowcount == 0:
+                conexao.execute(insert(OcupacaoResumo), [linha])
+
+
+def _grupos_por_imovel(conexao, imovel_ids: Iterable[int]) -> Dict[int, List[Grupo]]:
+    linhas = conexao.execute(
+        select(Imovel.id, Imovel.cliente_id, Imovel.municipio, Imovel.estado).where(Imovel.id.in_(set(imovel_ids)))
+    ).all()
+    return {linha.id: grupos_do_imovel(*linha) for linha in linhas}
+
+
+def _anterior(objeto, campo):
+    """Valor do atributo antes da alteração em curso (history ainda disponível nos eventos de flush)"""
+    historico = attributes.get_history(objeto, campo)
+    if historico.deleted:
+        return historico.deleted[0]
+    return getattr(objeto, campo)
+
+
+def _mudou(objeto, *campos) -> bool:
+    return any(attributes.get_history(objeto, campo).has_changes() for campo in campos)
+
+
+# ---- Unit of work ----
+
+@event.listens_for(ImovelUnidade, "after_insert")
+def _unidade_inserida(mapper, connection, target):
+    acumulador = Acumulador()
+    acumulador.somar(_grupos_por_imovel(connection, [target.imovel_id]).get(target.imovel_id, ()),
+                     delta_unidade(target.status, target.area_m2))
+    acumulador.gravar(connection)
+
+
+@event.listens_for(ImovelUnidade, "after_update")
+def _unidade_alterada(mapper, connection, target):
+    if not _mudou(target, "status", "area_m2", "imovel_id"):
+        return
+    imovel_antes = _anterior(target, "imovel_id")
+    grupos = _grupos_por_imovel(connection, [imovel_antes, target.imovel_id])
+    acumulador = Acumulador()
+    acumulador.somar(grupos.get(imovel_antes, ()),
+                     delta_unidade(_anterior(target, "status"), _anterior(target, "area_m2"), -1))
+    acumulador.somar(grupos.get(target.imovel_id, ()), delta_unidade(target.status, target.area_m2))
+    acumulador.gravar(connection)
+
+
+@event.listens_for(ImovelUnidade, "before_delete")
+def _unidade_removida(mapper, connection, target):
+    # before_delete: o imóvel ainda existe para descobrir os grupos
+    acumulador = Acumulador()
+    acumulador.somar(_grupos_por_imovel(connection, [target.imovel_id]).get(target.imovel_id, ()),
+                     delta_unidade(target.status, target.area_m2, -1))
+    acumulador.gravar(connection)
+
+
+@event.listens_for(Imovel, "after_insert")
+def _imovel_inserido(mapper, connection, target):
+    acumulador = Acumulador()
+    acumulador.somar(grupos_do_imovel(target.id, target.cliente_id, target.municipio, target.estado),
+                     delta_imovel(target.status_ocupacao))
+    acumulador.gravar(connection)
+
+
+@event.listens_for(Imovel, "after_update")
+def _imovel_alterado(mapper, connection, target):
+    if not _mudou(target, "status_ocupacao", "cliente_id", "municipio", "estado"):
+        return
+    antes = grupos_do_imovel(target.id, *(_anterior(target, c) for c in ("cliente_id", "municipio", "estado")))
+    depois = grupos_do_imovel(target.id, target.cliente_id, target.municipio, target.estado)
+    acumulador = Acumulador()
+    acumulador.somar(antes, delta_imovel(_anterior(target, "status_ocupacao"), -1))
+    acumulador.somar(depois, delta_imovel(target.status_ocupacao))
+
+    # Mudou de cliente/município/estado: as unidades do imóvel mudam de grupo junto
+    movidos = [(a, d) for a, d in zip(antes, depois) if a != d]
+    if movidos:
+        unidades = connection.execute(
+            select(*(getattr(OcupacaoResumo, c) for c in CONTADORES[2:]))
+            .where(OcupacaoResumo.nivel == "imovel", OcupacaoResumo.chave == str(target.id))
+        ).one_or_none()
+        if unidades is not None:
+            delta = dict(zip(CONTADORES[2:], unidades))
+            acumulador.somar([a for a, _ in movidos], {c: -v for c, v in delta.items()})
+            acumulador.somar([d for _, d in movidos], delta)
+    acumulador.gravar(connection)
+
+
+@event.listens_for(Imovel, "before_delete")
+def _imovel_removido(mapper, connection, target):
+    # as unidades (cascade do ORM) já foram descontadas por _unidade_removida
+    acumulador = Acumulador()
+    grupos = grupos_do_imovel(target.id, target.cliente_id, target.municipio, target.estado)
+    acumulador.somar(grupos[:-1], delta_imovel(target.status_ocupacao, -1))
+    acumulador.gravar(connection)
+    connection.execute(
+        delete(OcupacaoResumo).where(OcupacaoResumo.nivel == "imovel", OcupacaoResumo.chave == str(target.id))
+    )
+
+
+# ---- INSERT em lote ----
+
+@event.listens_for(Session, "do_orm_execute")
+def _insert_em_lote(estado):
+    """insert(Imovel/ImovelUnidade) não passa pelos eventos de mapper: aplicar pelos parâmetros"""
+    if not estado.is_insert or estado.bind_mapper is None:
+        return None
+    classe = estado.bind_mapper.class_
+    if classe not in (Imovel, ImovelUnidade):
+        return None
+    parametros = estado.parameters if isinstance(estado.parameters, list) else [estado.parameters or {}]
+    conexao = estado.session.connection()
+    acumulador = Acumulador()
+
+    if classe is ImovelUnidade:
+        resultado = estado.invoke_statement()
+        grupos = _grupos_por_imovel(conexao, (p.get("imovel_id") for p in parametros))
+        for valores in parametros:
+            acumulador.somar(grupos.get(valores.get("imovel_id"), ()),
+                             delta_unidade(valores.get("status"), valores.get("area_m2")))
+        acumulador.gravar(conexao)
+        return resultado
+
+    # Imóveis: o id vem do RETURNING (entidade ou coluna id na primeira posição)
+    if not len(estado.statement.exported_columns):
+        return None  # sem RETURNING não há ids: só o recálculo alcança essas linhas
+    congelado = estado.invoke_statement().freeze()
+    for linha, valores in zip(congelado().all(), parametros):
+        imovel_id = linha[0].id if isinstance(linha[0], Imovel) else linha[0]
+        acumulador.somar(
+            grupos_do_imovel(imovel_id, valores.get("cliente_id"), valores.get("municipio"), valores.get("estado")),
+            delta_imovel(valores.get("status_ocupacao")),
+        )
+    acumulador.gravar(conexao)
+    return congelado()
+
+
+# ---- Recálculo completo (backfill) ----
+
+def recalcular_ocupacao(sessao: Session, lote: int = 1000) -> int:
+    """Refaz ocupacao_resumo a partir de imoveis/imovel_unidades; retorna o nº de grupos"""
+    ocupada = case((ImovelUnidade.status == "ocupado", 1), else_=0)
+    area = func.coalesce(ImovelUnidade.area_m2, 0.0)
+    por_imovel = (
+        select(
+            ImovelUnidade.imovel_id,
+            func.sum(ocupada).label("ocupadas"),
+            func.count(ImovelUnidade.id).label("total"),
+            func.sum(area * ocupada).label("area_ocupada"),
+            func.sum(area).label("area_total"),
+        )
+        .group_by(ImovelUnidade.imovel_id)
+        .subquery()
+    )
+    consulta = (
+        select(
+            Imovel.id, Imovel.cliente_id, Imovel.municipio, Imovel.estado, Imovel.status_ocupacao,
+            por_imovel.c.ocupadas, por_imovel.c.total, por_imovel.c.area_ocupada, por_imovel.c.area_total,
+        )
+        .outerjoin(por_imovel, por_imovel.c.imovel_id == Imovel.id)
+        .execution_options(yield_per=lote)
+    )
+    acumulador = Acumulador()
+    for linha in sessao.execute(consulta):
+        ocupadas, total = linha.ocupadas or 0, linha.total or 0
+        area_ocupada, area_total = linha.area_ocupada or 0.0, linha.area_total or 0.0
+        delta = {
+            **delta_imovel(linha.status_ocupacao),
+            "unidades_ocupadas": ocupadas,
+            "unidades_desocupadas": total - ocupadas,
+            "area_ocupada_m2": area_ocupada,
+            "area_desocupada_m2": area_total - area_ocupada,
+        }
+        acumulador.somar(grupos_do_imovel(linha.id, linha.cliente_id, linha.municipio, linha.estado), delta)
+
+    conexao = sessao.connection()
+    conexao.execute(delete(OcupacaoResumo))
+    total_grupos = len(acumulador.grupos)
+    acumulador.gravar(conexao)
+    sessao.commit()
+    return total_grupos
+
+
+if __name__ == "__main__":
+    from config.db import SessionLocal
+
+    with SessionLocal() as sessao:
+        print(f"Resumo de ocupação recalculado: {recalcular_ocupacao(sessao)} grupos")
@@ -0,0 +1,23 @@
+"""Paginação por cursor (keyset) com cursores opacos"""
+import base64
+import json
+from typing import Any, Optional
+
+from fastapi import HTTPException, status
+
+
+def codificar_cursor(valor: Any) -> str:
+    """Serializa a chave da última linha da página em um token opaco"""
+    bruto = json.dumps(valor, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: Optional[str]) -> Any:
+    """Inverso de codificar_cursor; cursor inválido vira 400"""
+    if not cursor:
+        return None
+    try:
+        preenchido = cursor + "=" * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(preenchido.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
@@ -0,0 +1,202 @@
+"""Renderização de PDFs de IPTU com cache endereçado por conteúdo
+
+O reportlab roda em um pool de processos próprio (nunca no event loop nem
+no threadpool de requisições). Cada PDF é identificado pelo hash dos dados
+que aparecem nele mais a versão do template, então o mesmo carnê é
+renderizado uma única vez e o hash serve como ETag.
+
+Variáveis de ambiente:
+- PDF_WORKERS: número de processos de renderização (padrão: 2)
+- PDF_FILA_MAX: máximo de PDFs aguardando renderização (padrão: 32)
+- PDF_CACHE_MAX_BYTES: tamanho do cache em memória (padrão: 64 MiB)
+- PDF_CACHE_DIR: diretório opcional para persistir PDFs entre reinícios
+  (lido e gravado no threadpool, fora do event loop)
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from services.executor import ExecutorProcessos
+
+# Incrementar sempre que o layout do PDF mudar (invalida o cache)
+TEMPLATE_VERSAO = "1"
+
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "2"))
+PDF_FILA_MAX = int(os.getenv("PDF_FILA_MAX", "32"))
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR")
+
+
+def formatar_endereco(rua, numero, bairro, municipio, estado) -> str:
+    return f"{rua}, {numero} - {bairro} / {municipio}-{estado}"
+
+
+def montar_dados_pdf(endereco: str, unidade: Dict, rateio: Optional[Dict], valor_total_iptu: float, desconto_cota_unica: float) -> Dict:
+    """Tudo que aparece no PDF, em tipos simples (serializável e enviável ao processo filho)
+
+    unidade: dict com unidade_id, nome_unidade e area_m2
+    """
+    return {
+        "endereco": endereco,
+        "unidade_id": unidade["unidade_id"],
+        "nome_unidade": unidade["nome_unidade"],
+        "area_m2": unidade["area_m2"],
+        "valor_total_iptu": valor_total_iptu,
+        "desconto_cota_unica": desconto_cota_unica,
+        "iptu": rateio["iptu"] if rateio else None,
+        "iptu_com_desconto": rateio["iptu_com_desconto"] if rateio else None,
+    }
+
+
+def dados_pdf_iptu(imovel, unidade, rateio: Optional[Dict], valor_total_iptu: float, desconto_cota_unica: float) -> Dict:
+    """montar_dados_pdf a partir das entidades Imovel/ImovelUnidade"""
+    endereco = formatar_endereco(imovel.rua, imovel.numero, imovel.bairro, imovel.municipio, imovel.estado)
+    dados_unidade = {"unidade_id": unidade.id, "nome_unidade": unidade.nome_unidade, "area_m2": unidade.area_m2}
+    return montar_dados_pdf(endereco, dados_unidade, rateio, valor_total_iptu, desconto_cota_unica)
+
+
+def chave_pdf(dados: Dict) -> str:
+    """Endereço de conteúdo: sha256 dos dados + versão do template"""
+    bruto = json.dumps([TEMPLATE_VERSAO, dados], sort_keys=True, ensure_ascii=False).encode()
+    return hashlib.sha256(bruto).hexdigest()
+
+
+def renderizar_pdf_iptu(dados: Dict) -> Tuple[bytes, float]:
+    """Executado no processo filho: gera o PDF e retorna (bytes, segundos gastos)"""
+    import io
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.pdfgen import canvas
+
+    inicio = time.perf_counter()
+    buffer = io.BytesIO()
+    # invariant=1: saída determinística (sem data de criação/ID aleatório no arquivo)
+    c = canvas.Canvas(buffer, pagesize=A4, invariant=1)
+    width, height = A4
+
+    margem = 20 * mm
+    y = height - margem
+
+    c.setFont('Helvetica-Bold', 14)
+    c.drawString(margem, y, f'Comprovante de Cálculo de IPTU - {dados["nome_unidade"]}')
+    y -= 12 * mm
+
+    c.setFont('Helvetica', 11)
+    c.drawString(margem, y, f'Imóvel: {dados["endereco"]}')
+    y -= 8 * mm
+    c.drawString(margem, y, f'Unidade: {dados["nome_unidade"]} | Área: {dados["area_m2"]} m²')
+    y -= 8 * mm
+    c.drawString(margem, y, f'Valor total IPTU: R$ {dados["valor_total_iptu"]:.2f}')
+    y -= 8 * mm
+    if dados["desconto_cota_unica"]:
+        c.drawString(margem, y, f'Desconto cota única aplicado: R$ {dados["desconto_cota_unica"]:.2f}')
+        y -= 8 * mm
+
+    if dados["iptu"] is not None:
+        c.drawString(margem, y, f'IPTU proporcional (sem desconto): R$ {dados["iptu"]:.2f}')
+        y -= 8 * mm
+        c.drawString(margem, y, f'IPTU proporcional (com desconto): R$ {dados["iptu_com_desconto"]:.2f}')
+        y -= 12 * mm
+
+    c.setFont('Helvetica-Oblique', 9)
+    c.drawString(margem, y, f'Template v{TEMPLATE_VERSAO}')
+
+    c.showPage()
+    c.save()
+    return buffer.getvalue(), time.perf_counter() - inicio
+
+
+class CachePdf:
+    """LRU em memória limitado por bytes, com persistência opcional em disco"""
+
+    def __init__(self, max_bytes: int = PDF_CACHE_MAX_BYTES, diretorio: Optional[str] = PDF_CACHE_DIR):
+        self.max_bytes = max_bytes
+        self.diretorio = diretorio
+        self._itens: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def _caminho(self, chave: str) -> str:
+        return os.path.join(self.diretorio, f"{chave}.pdf")
+
+    def _guardar_memoria(self, chave: str, conteudo: bytes) -> None:
+        with self._lock:
+            if chave in self._itens or len(conteudo) > self.max_bytes:
+                return
+            self._itens[chave] = conteudo
+            self._bytes += len(conteudo)
+            while self._bytes > self.max_bytes:
+                _, removido = self._itens.popitem(last=False)
+                self._bytes -= len(removido)
+
+    def _ler_disco(self, chave: str) -> Optional[bytes]:
+        try:
+            with open(self._caminho(chave), "rb") as arquivo:
+                return arquivo.read()
+        except FileNotFoundError:
+            return None
+
+    def _gravar_disco(self, chave: str, conteudo: bytes) -> None:
+        os.makedirs(self.diretorio, exist_ok=True)
+        # escrita atômica: leitores concorrentes nunca veem arquivo parcial
+        temporario = f"{self._caminho(chave)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporario, "wb") as arquivo:
+            arquivo.write(conteudo)
+        os.replace(temporario, self._caminho(chave))
+
+    async def obter(self, chave: str) -> Optional[bytes]:
+        """Memória no próprio event loop; disco (se configurado) no threadpool"""
+        with self._lock:
+            conteudo = self._itens.get(chave)
+            if conteudo is not None:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return conteudo
+        if self.diretorio:
+            conteudo = await run_in_threadpool(self._ler_disco, chave)
+            if conteudo is not None:
+                self._guardar_memoria(chave, conteudo)
+                with self._lock:
+                    self.acertos += 1
+                return conteudo
+        with self._lock:
+            self.falhas += 1
+        return None
+
+    async def guardar(self, chave: str, conteudo: bytes) -> None:
+        self._guardar_memoria(chave, conteudo)
+        if self.diretorio:
+            await run_in_threadpool(self._gravar_disco, chave, conteudo)
+
+    def metricas(self) -> Dict:
+        with self._lock:
+            return {
+                "itens": len(self._itens),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "diretorio": self.diretorio,
+            }
+
+
+executor_pdf = ExecutorProcessos(PDF_WORKERS, PDF_FILA_MAX)
+cache_pdf = CachePdf()
+
+
+async def obter_pdf_iptu(dados: Dict, chave: Optional[str] = None) -> bytes:
+    """PDF do cache ou renderizado no pool de processos (ExecutorSobrecarregado se a fila estiver cheia)"""
+    chave = chave or chave_pdf(dados)
+    conteudo = await cache_pdf.obter(chave)
+    if conteudo is None:
+        conteudo = await executor_pdf.executar(renderizar_pdf_iptu, dados)
+        await cache_pdf.guardar(chave, conteudo)
+    return conteudo
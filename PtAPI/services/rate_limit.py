@@ -0,0 +1,205 @@
+"""Rate limiting por rota (token bucket) com backend plugável
+
+Cada política define N requisições por janela; o balde de cada cliente
+(IP) recarrega continuamente a N/janela tokens por segundo. A checagem é
+O(1) e roda como dependency antes de qualquer acesso a banco ou hash.
+
+Backends:
+- BackendMemoria (padrão): por processo, contadores em shards com lock próprio
+- BackendRedis: compartilhado entre processos/hosts (RATE_LIMIT_REDIS_URL);
+  aceita qualquer cliente assíncrono compatível com `eval`, inclusive um
+  redis-server local para testes
+
+Variáveis de ambiente:
+- RATE_LIMIT_ATIVO: liga/desliga o limitador (padrão: true)
+- RATE_LIMIT_CADASTRO / RATE_LIMIT_LOGIN: políticas no formato "5/minute"
+- RATE_LIMIT_REDIS_URL: usa o backend Redis em vez do de memória (pip install redis)
+- RATE_LIMIT_PROXIES: quantos proxies reversos confiáveis ficam na frente da
+  API (padrão: 0, usa o IP da conexão). Com N > 0, o cliente é a N-ésima
+  entrada do X-Forwarded-For contando da direita: a que o proxy mais externo
+  anotou. As entradas à esquerda vêm do próprio cliente e não são usadas.
+  RATE_LIMIT_CONFIAR_PROXY=true (configuração antiga) equivale a 1
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+from fastapi import HTTPException, Request, status
+
+RATE_LIMIT_ATIVO = os.getenv("RATE_LIMIT_ATIVO", "true").lower() in ("1", "true", "sim", "yes")
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL")
+RATE_LIMIT_PROXIES = int(os.getenv(
+    "RATE_LIMIT_PROXIES",
+    "1" if os.getenv("RATE_LIMIT_CONFIAR_PROXY", "false").lower() in ("1", "true", "sim", "yes") else "0",
+))
+
+_UNIDADES = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class PoliticaLimite:
+    """N requisições por janela, aplicadas como token bucket"""
+
+    def __init__(self, nome: str, limite: int, janela_s: float):
+        self.nome = nome
+        self.limite = limite
+        self.janela_s = janela_s
+        self.taxa = limite / janela_s  # tokens recarregados por segundo
+
+    @classmethod
+    def de_texto(cls, nome: str, texto: str) -> "PoliticaLimite":
+        """Interpreta "5/minute", "100/hour" etc."""
+        quantidade, unidade = texto.strip().split("/")
+        unidade = unidade.strip().lower().rstrip("s")
+        if unidade not in _UNIDADES:
+            raise ValueError(f"Unidade de rate limit inválida: {texto}")
+        return cls(nome, int(quantidade), _UNIDADES[unidade])
+
+
+class BackendMemoria:
+    """Baldes em memória divididos em shards para reduzir contenção de lock"""
+
+    def __init__(self, shards: int = 16, max_chaves_por_shard: int = 50000):
+        self._shards = [(threading.Lock(), OrderedDict()) for _ in range(shards)]
+        self.max_chaves_por_shard = max_chaves_por_shard
+
+    async def consumir(self, chave: str, politica: PoliticaLimite) -> Tuple[bool, float]:
+        """Retorna (permitido, segundos até haver um token)"""
+        lock, baldes = self._shards[hash(chave) % len(self._shards)]
+        agora = time.monotonic()
+        with lock:
+            tokens, ultimo = baldes.get(chave, (politica.limite, agora))
+            tokens = min(politica.limite, tokens + (agora - ultimo) * politica.taxa)
+            if tokens >= 1:
+                tokens -= 1
+                permitido, espera = True, 0.0
+            else:
+                permitido, espera = False, (1 - tokens) / politica.taxa
+            baldes[chave] = (tokens, agora)
+            baldes.move_to_end(chave)
+            # clientes inativos há mais tempo saem primeiro (balde cheio = estado padrão)
+            if len(baldes) > self.max_chaves_por_shard:
+                baldes.popitem(last=False)
+        return permitido, espera
+
+
+# Mesmo algoritmo do BackendMemoria, atômico no servidor e com o relógio do Redis
+_SCRIPT_TOKEN_BUCKET = """
+local limite = tonumber(ARGV[1])
+local taxa = tonumber(ARGV[2])
+local ttl = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local agora = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local balde = redis.call('HMGET', KEYS[1], 't', 'u')
+local tokens = tonumber(balde[1]) or limite
+local ultimo = tonumber(balde[2]) or agora
+tokens = math.min(limite, tokens + (agora - ultimo) * taxa)
+local permitido = 0
+local espera = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  permitido = 1
+else
+  espera = (1 - tokens) / taxa
+end
+redis.call('HSET', KEYS[1], 't', tostring(tokens), 'u', tostring(agora))
+redis.call('EXPIRE', KEYS[1], ttl)
+return {permitido, tostring(espera)}
+"""
+
+
+class BackendRedis:
+    """Baldes compartilhados em um Redis (ou servidor compatível)"""
+
+    def __init__(self, cliente, prefixo: str = "ptapi:rl:"):
+        self.cliente = cliente
+        self.prefixo = prefixo
+
+    @classmethod
+    def de_url(cls, url: str) -> "BackendRedis":
+        import redis.asyncio as redis_async
+        return cls(redis_async.from_url(url))
+
+    async def consumir(self, chave: str, politica: PoliticaLimite) -> Tuple[bool, float]:
+        ttl = int(politica.janela_s) + 1
+        permitido, espera = await self.cliente.eval(
+            _SCRIPT_TOKEN_BUCKET, 1, self.prefixo + chave, politica.limite, politica.taxa, ttl
+        )
+        return bool(int(permitido)), float(espera)
+
+
+class Limitador:
+    """Aplica políticas nomeadas sobre um backend e conta decisões"""
+
+    def __init__(self, backend, politicas: Dict[str, PoliticaLimite], ativo: bool = True):
+        self.backend = backend
+        self.politicas = politicas
+        self.ativo = ativo
+        self._lock = threading.Lock()
+        self.contadores: Dict[str, Dict[str, int]] = {
+            nome: {"permitidas": 0, "rejeitadas": 0} for nome in politicas
+        }
+
+    async def verificar(self, nome_politica: str, cliente: str) -> Tuple[bool, float]:
+        if not self.ativo:
+            return True, 0.0
+        politica = self.politicas[nome_politica]
+        permitido, espera = await self.backend.consumir(f"{politica.nome}:{cliente}", politica)
+        with self._lock:
+            self.contadores[nome_politica]["permitidas" if permitido else "rejeitadas"] += 1
+        return permitido, espera
+
+    def metricas(self) -> Dict:
+        with self._lock:
+            contadores = {nome: dict(valores) for nome, valores in self.contadores.items()}
+        return {
+            "ativo": self.ativo,
+            "backend": type(self.backend).__name__,
+            "politicas": {
+                nome: {"limite": p.limite, "janela_s": p.janela_s, **contadores[nome]}
+                for nome, p in self.politicas.items()
+            },
+        }
+
+
+def identificar_cliente(request: Request, proxies: int = RATE_LIMIT_PROXIES) -> str:
+    """IP do cliente: da conexão, ou do X-Forwarded-For anotado pelos `proxies` confiáveis"""
+    if proxies > 0:
+        encaminhado = [p.strip() for p in request.headers.get("x-forwarded-for", "").split(",") if p.strip()]
+        if encaminhado:
+            # Cada proxy acrescenta à direita o IP de quem o chamou; o que está
+            # `proxies` posições da direita foi anotado pelo proxy mais externo
+            return encaminhado[-proxies] if len(encaminhado) >= proxies else encaminhado[0]
+    return request.client.host if request.client else "desconhecido"
+
+
+limitador = Limitador(
+    BackendRedis.de_url(RATE_LIMIT_REDIS_URL) if RATE_LIMIT_REDIS_URL else BackendMemoria(),
+    {
+        "cadastro": PoliticaLimite.de_texto("cadastro", os.getenv("RATE_LIMIT_CADASTRO", "5/minute")),
+        "login": PoliticaLimite.de_texto("login", os.getenv("RATE_LIMIT_LOGIN", "10/minute")),
+    },
+    ativo=RATE_LIMIT_ATIVO,
+)
+
+
+def limitar(nome_politica: str):
+    """Dependency de rota: 429 quando o cliente excede a política
+
+    Usar em `dependencies=[Depends(limitar("login"))]` no decorator da rota,
+    para que a checagem rode antes das demais dependencies.
+    """
+    if nome_politica not in limitador.politicas:
+        raise ValueError(f"Política de rate limit desconhecida: {nome_politica}")
+
+    async def _verificar_limite(request: Request) -> None:
+        permitido, espera = await limitador.verificar(nome_politica, identificar_cliente(request))
+        if not permitido:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Muitas requisições, tente novamente mais tarde",
+                headers={"Retry-After": str(max(1, int(espera + 0.999)))},
+            )
+
+    return _verificar_limite
@@ -0,0 +1,48 @@
+"""Rateio de IPTU por área com arredondamento exato em centavos
+
+O rateio usa o método do maior resto: cada unidade recebe o piso da sua
+cota em centavos e os centavos que sobram vão para as maiores frações,
+de modo que a soma das unidades é sempre igual ao valor do carnê.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, List, Sequence
+
+
+def para_centavos(valor: float) -> int:
+    return int((Decimal(str(valor)) * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+def ratear_centavos(total_centavos: int, pesos: Sequence[float]) -> List[int]:
+    """Divide total_centavos proporcionalmente aos pesos; a soma do resultado é exata"""
+    soma_pesos = sum(pesos)
+    if soma_pesos <= 0 or total_centavos <= 0:
+        return [0] * len(pesos)
+
+    cotas = [total_centavos * p / soma_pesos for p in pesos]
+    partes = [int(c) for c in cotas]
+    sobra = total_centavos - sum(partes)
+    # maiores restos primeiro; empate resolvido pela ordem original
+    por_resto = sorted(range(len(pesos)), key=lambda i: partes[i] - cotas[i])
+    for i in por_resto[:sobra]:
+        partes[i] += 1
+    return partes
+
+
+def distribuir_iptu(unidades: Sequence[Dict], valor_total_iptu: float, desconto_cota_unica: float = 0.0) -> List[Dict]:
+    """unidades: dicts com unidade_id, nome_unidade e area_m2 (> 0)"""
+    areas = [u["area_m2"] for u in unidades]
+    cheio = ratear_centavos(para_centavos(valor_total_iptu), areas)
+    if desconto_cota_unica:
+        descontado = ratear_centavos(para_centavos(valor_total_iptu - desconto_cota_unica), areas)
+    else:
+        descontado = cheio
+    return [
+        {
+            "unidade_id": u["unidade_id"],
+            "nome_unidade": u["nome_unidade"],
+            "area_m2": u["area_m2"],
+            "iptu": c / 100,
+            "iptu_com_desconto": d / 100,
+        }
+        for u, c, d in zip(unidades, cheio, descontado)
+    ]
@@ -0,0 +1,281 @@
+"""Latência por rota, consultas SQL por requisição e exposição Prometheus
+
+- MiddlewareTelemetria (ASGI puro, sem BaseHTTPMiddleware): mede cada
+  requisição e agrupa pelo template da rota (/imoveis/{imovel_id}), nunca
+  pelo caminho concreto, para manter a cardinalidade fixa.
+- Listeners before/after_cursor_execute e handle_error em todo Engine
+  (síncrono e o sync_engine do assíncrono) somam consultas, inclusive as que
+  falham, e tempo de banco na requisição corrente via ContextVar. O
+  ContextVar acompanha o threadpool das rotas síncronas; o início de cada
+  consulta fica no contexto do statement, nunca na conexão do pool.
+- Requisições acima de REQUISICAO_LENTA_MS vão para o log com as consultas
+  mais demoradas (só o SQL, sem parâmetros).
+- texto_prometheus() gera o formato de texto 0.0.4 servido em GET /metrics.
+
+Custo por consulta: um ContextVar.get e dois perf_counter; por requisição,
+três observações em histogramas sob locks curtos.
+
+Variáveis de ambiente:
+- REQUISICAO_LENTA_MS: limite para o log de requisição lenta, 0 desativa (padrão: 1000)
+- TELEMETRIA_MAX_SQL: consultas guardadas por requisição para o log (padrão: 50)
+"""
+import contextvars
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from services.metricas import Histograma
+
+logger = logging.getLogger(__name__)
+
+REQUISICAO_LENTA_MS = float(os.getenv("REQUISICAO_LENTA_MS", "1000"))
+TELEMETRIA_MAX_SQL = int(os.getenv("TELEMETRIA_MAX_SQL", "50"))
+
+# Consultas por requisição: contagens inteiras
+BUCKETS_CONSULTAS = (1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+ROTA_DESCONHECIDA = "<sem rota>"
+
+
+class RequisicaoAtual:
+    """Acumulado de banco da requisição em andamento"""
+
+    __slots__ = ("consultas", "tempo_db", "sql")
+
+    def __init__(self):
+        self.consultas = 0
+        self.tempo_db = 0.0
+        self.sql: List[Tuple[float, str]] = []
+
+
+_requisicao_atual: contextvars.ContextVar[Optional[RequisicaoAtual]] = contextvars.ContextVar(
+    "requisicao_atual", default=None
+)
+
+
+class MetricasRota:
+    def __init__(self):
+        self.latencia = Histograma()
+        self.tempo_db = Histograma()
+        self.consultas = Histograma(BUCKETS_CONSULTAS)
+
+
+class Telemetria:
+    """Histogramas por (método, rota) e contadores por status"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rotas: Dict[Tuple[str, str], MetricasRota] = {}
+        self._status: Dict[Tuple[str, str, int], int] = {}
+        self.em_andamento = 0
+        self.lentas = 0
+        self.consultas_fora_de_requisicao = 0
+
+    def _rota(self, chave: Tuple[str, str]) -> MetricasRota:
+        metricas = self._rotas.get(chave)
+        if metricas is None:
+            with self._lock:
+                metricas = self._rotas.setdefault(chave, MetricasRota())
+        return metricas
+
+    def registrar(self, metodo: str, rota: str, status: int, duracao: float, requisicao: RequisicaoAtual) -> None:
+        metricas = self._rota((metodo, rota))
+        metricas.latencia.observar(duracao)
+        metricas.tempo_db.observar(requisicao.tempo_db)
+        metricas.consultas.observar(requisicao.consultas)
+        with self._lock:
+            chave = (metodo, rota, status)
+            self._status[chave] = self._status.get(chave, 0) + 1
+
+    def incrementar(self, campo: str, quantidade: int = 1) -> None:
+        with self._lock:
+            setattr(self, campo, getattr(self, campo) + quantidade)
+
+    def copiar(self) -> Tuple[Dict, Dict, Dict]:
+        """(gerais, rotas, status) copiados sob o lock; snapshots dos histogramas fora dele"""
+        with self._lock:
+            rotas = list(self._rotas.items())
+            status = dict(self._status)
+            gerais = {
+                "em_andamento": self.em_andamento,
+                "lentas": self.lentas,
+                "consultas_fora_de_requisicao": self.consultas_fora_de_requisicao,
+            }
+        return gerais, {
+            chave: {
+                "latencia_s": m.latencia.snapshot(),
+                "tempo_db_s": m.tempo_db.snapshot(),
+                "consultas": m.consultas.snapshot(),
+            }
+            for chave, m in rotas
+        }, status
+
+    def snapshot(self) -> Dict:
+        gerais, rotas, status = self.copiar()
+        return {
+            **gerais,
+            "rotas": {f"{metodo} {rota}": metricas for (metodo, rota), metricas in rotas.items()},
+            "status": {f"{metodo} {rota} {codigo}": qtd for (metodo, rota, codigo), qtd in status.items()},
+        }
+
+
+telemetria = Telemetria()
+
+
+# ---- SQL ----
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    if _requisicao_atual.get() is not None and context is not None:
+        # no contexto do statement: some com ele, mesmo quando a consulta falha
+        context._telemetria_inicio = time.perf_counter()
+
+
+def _registrar_consulta(context, statement: str, erro: bool = False) -> None:
+    requisicao = _requisicao_atual.get()
+    if requisicao is None:
+        telemetria.consultas_fora_de_requisicao += 1  # aproximado (sem lock) para não pesar nos jobs
+        return
+    inicio = getattr(context, "_telemetria_inicio", None)
+    if inicio is None:
+        return
+    context._telemetria_inicio = None
+    duracao = time.perf_counter() - inicio
+    requisicao.consultas += 1
+    requisicao.tempo_db += duracao
+    if len(requisicao.sql) < TELEMETRIA_MAX_SQL:
+        requisicao.sql.append((duracao, f"[erro] {statement}" if erro else statement))
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _depois_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    _registrar_consulta(context, statement)
+
+
+@event.listens_for(Engine, "handle_error")
+def _consulta_com_erro(contexto):
+    # after_cursor_execute não dispara quando o statement falha (duplicidade, FK, timeout)
+    if contexto.execution_context is not None and contexto.statement is not None:
+        _registrar_consulta(contexto.execution_context, contexto.statement, erro=True)
+
+
+# ---- HTTP ----
+
+def _rota_da_requisicao(scope) -> str:
+    rota = scope.get("route")
+    return getattr(rota, "path", None) or ROTA_DESCONHECIDA
+
+
+def _registrar_lenta(metodo: str, rota: str, status: int, duracao: float, requisicao: RequisicaoAtual) -> None:
+    telemetria.incrementar("lentas")
+    mais_lentas = sorted(requisicao.sql, key=lambda item: item[0], reverse=True)[:10]
+    linhas = "\n".join(f"  {tempo * 1000:8.1f} ms  {' '.join(sql.split())[:500]}" for tempo, sql in mais_lentas)
+    logger.warning(
+        f"Requisição lenta: {metodo} {rota} -> {status} em {duracao * 1000:.0f} ms "
+        f"({requisicao.consultas} consultas, {requisicao.tempo_db * 1000:.0f} ms no banco)\n{linhas}"
+    )
+
+
+class MiddlewareTelemetria:
+    """Mede latência, consultas e tempo de banco de cada requisição HTTP"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        requisicao = RequisicaoAtual()
+        token = _requisicao_atual.set(requisicao)
+        status = 500
+        inicio = time.perf_counter()
+
+        async def enviar(mensagem):
+            nonlocal status
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+            await send(mensagem)
+
+        telemetria.incrementar("em_andamento")
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracao = time.perf_counter() - inicio
+            _requisicao_atual.reset(token)
+            telemetria.incrementar("em_andamento", -1)
+            metodo, rota = scope["method"], _rota_da_requisicao(scope)
+            telemetria.registrar(metodo, rota, status, duracao, requisicao)
+            if REQUISICAO_LENTA_MS > 0 and duracao * 1000 >= REQUISICAO_LENTA_MS:
+                _registrar_lenta(metodo, rota, status, duracao, requisicao)
+
+
+# ---- Prometheus ----
+
+def _rotulos(**valores) -> str:
+    def escapar(valor) -> str:
+        return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    return ",".join(f'{nome}="{escapar(valor)}"' for nome, valor in valores.items())
+
+
+def _histograma(linhas: List[str], nome: str, rotulos: str, snapshot: Dict) -> None:
+    separador = "," if rotulos else ""
+    for limite, acumulado in snapshot["buckets"].items():
+        linhas.append(f'{nome}_bucket{{{rotulos}{separador}le="{limite}"}} {acumulado}')
+    linhas.append(f"{nome}_sum{{{rotulos}}} {snapshot['soma']}")
+    linhas.append(f"{nome}_count{{{rotulos}}} {snapshot['total']}")
+
+
+def texto_prometheus(pools: Optional[Dict[str, Dict]] = None) -> str:
+    """Métricas no formato de texto do Prometheus (pools: nome -> status_pool)"""
+    gerais, rotas, status = telemetria.copiar()
+    linhas: List[str] = []
+
+    series = (
+        ("ptapi_http_request_duration_seconds", "latencia_s", "Latência das requisições HTTP por rota"),
+        ("ptapi_http_request_db_seconds", "tempo_db_s", "Tempo de banco por requisição"),
+        ("ptapi_http_request_db_queries", "consultas", "Consultas SQL por requisição"),
+    )
+    for nome, campo, ajuda in series:
+        linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} histogram"]
+        for (metodo, rota), metricas in rotas.items():
+            _histograma(linhas, nome, _rotulos(method=metodo, route=rota), metricas[campo])
+
+    linhas += ["# HELP ptapi_http_responses_total Respostas HTTP por rota e status", "# TYPE ptapi_http_responses_total counter"]
+    for (metodo, rota, codigo), quantidade in status.items():
+        linhas.append(f"ptapi_http_responses_total{{{_rotulos(method=metodo, route=rota, status=codigo)}}} {quantidade}")
+
+    for nome, campo, tipo, ajuda in (
+        ("ptapi_http_requests_in_progress", "em_andamento", "gauge", "Requisições em andamento"),
+        ("ptapi_http_slow_requests_total", "lentas", "counter", "Requisições acima de REQUISICAO_LENTA_MS"),
+        ("ptapi_db_queries_outside_request_total", "consultas_fora_de_requisicao", "counter",
+         "Consultas SQL fora de requisições HTTP"),
+    ):
+        linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} {tipo}", f"{nome} {gerais[campo]}"]
+
+    if pools:
+        linhas += ["# HELP ptapi_db_pool_checked_out Conexões do pool em uso", "# TYPE ptapi_db_pool_checked_out gauge"]
+        for engine, estado in pools.items():
+            if "em_uso" in estado:
+                linhas.append(f"ptapi_db_pool_checked_out{{{_rotulos(engine=engine)}}} {estado['em_uso']}")
+        linhas += ["# HELP ptapi_db_pool_timeouts_total Timeouts esperando conexão", "# TYPE ptapi_db_pool_timeouts_total counter"]
+        for engine, estado in pools.items():
+            if "eventos" in estado:
+                linhas.append(f"ptapi_db_pool_timeouts_total{{{_rotulos(engine=engine)}}} {estado['eventos']['timeouts']}")
+        linhas += ["# HELP ptapi_db_pool_checkout_errors_total Falhas no checkout que não são timeout",
+                   "# TYPE ptapi_db_pool_checkout_errors_total counter"]
+        for engine, estado in pools.items():
+            if "eventos" in estado:
+                linhas.append(f"ptapi_db_pool_checkout_errors_total{{{_rotulos(engine=engine)}}} {estado['eventos']['erros_checkout']}")
+        nome = "ptapi_db_pool_checkout_wait_seconds"
+        linhas += [f"# HELP {nome} Espera por conexão no checkout", f"# TYPE {nome} histogram"]
+        for engine, estado in pools.items():
+            if "eventos" in estado:
+                _histograma(linhas, nome, _rotulos(engine=engine), estado["eventos"]["espera_checkout_s"])
+
+    return "\n".join(linhas) + "\n"
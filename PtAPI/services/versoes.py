@@ -0,0 +1,122 @@
+"""Versão dos imóveis para GET condicional (ETag / If-None-Match)
+
+Imovel, ImovelUnidade, RegistroMatricula e ContaServico têm `versao`
+(version_id_col: controle otimista, sobe a cada UPDATE pelo ORM). Como a
+representação do imóvel inclui os filhos, qualquer mudança em um filho
+também sobe a versão do imóvel, na mesma transação. Assim a versão do
+imóvel sozinha identifica o recurso e vira o ETag.
+
+Por padrão cada revalidação faz um SELECT só da coluna pela PK: o ETag é
+forte, então o 304 precisa refletir a versão gravada. Com IMOVEL_VERSAO_TTL
+> 0 a versão vem de um cache por processo, invalidado só no commit das
+alterações do próprio processo: use apenas com um único processo (com
+vários workers, um deles responderia 304 por até TTL segundos depois de uma
+alteração feita em outro; serve.py avisa). Versões lidas de uma réplica
+(config/replicas.py) não entram no cache: podem estar atrasadas e o cache é
+compartilhado com quem lê do primário.
+
+INSERT em lote de filhos via insert(Modelo) é acompanhado; UPDATE/DELETE
+em lote por critério (update(Modelo).where(...)) não sobe a versão do
+imóvel, a menos que a mesma transação também altere um filho pelo ORM ou
+insira um filho.
+
+Variáveis de ambiente:
+- IMOVEL_VERSAO_TTL: segundos que uma versão fica no cache; 0 desliga (padrão: 0)
+"""
+import os
+from typing import Iterable, Optional
+
+from sqlalchemy import event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from models.contratos import Imovel, ImovelUnidade, RegistroMatricula, ContaServico
+from services.cache_ttl import CacheTTL
+
+IMOVEL_VERSAO_TTL = float(os.getenv("IMOVEL_VERSAO_TTL", "0"))
+
+FILHOS_IMOVEL = (ImovelUnidade, RegistroMatricula, ContaServico)
+
+cache_versoes = CacheTTL(IMOVEL_VERSAO_TTL, max_itens=50000)
+
+
+async def versao_imovel(db: AsyncSession, imovel_id: int) -> Optional[int]:
+    """Versão atual do imóvel (cache ou SELECT só da coluna); None se não existe"""
+    if IMOVEL_VERSAO_TTL <= 0:
+        return await db.scalar(select(Imovel.versao).where(Imovel.id == imovel_id))
+    versao = cache_versoes.obter(imovel_id)
+    if versao is None:
+        versao = await db.scalar(select(Imovel.versao).where(Imovel.id == imovel_id))
+        if versao is not None and db.info.get("replica") is None:
+            cache_versoes.guardar(imovel_id, versao)
+    return versao
+
+
+def lembrar_versao(imovel: Imovel) -> None:
+    if IMOVEL_VERSAO_TTL <= 0:
+        return
+    sessao = object_session(imovel)
+    if sessao is None or sessao.info.get("replica") is None:
+        cache_versoes.guardar(imovel.id, imovel.versao)
+
+
+def _marcar(sessao: Optional[Session], chave: str, ids: Iterable[int]) -> None:
+    if sessao is not None:
+        sessao.info.setdefault(chave, set()).update(i for i in ids if i is not None)
+
+
+def _subir_versao(sessao: Session, ids: set) -> None:
+    """UPDATE direto na conexão (sem eventos do ORM) e expira a versão dos objetos já carregados"""
+    if not ids:
+        return
+    sessao.connection().execute(
+        update(Imovel.__table__).where(Imovel.__table__.c.id.in_(ids)).values(versao=Imovel.__table__.c.versao + 1)
+    )
+    for objeto in list(sessao.identity_map.values()):
+        if isinstance(objeto, Imovel) and objeto.id in ids:
+            sessao.expire(objeto, ["versao"])
+    _marcar(sessao, "imoveis_alterados", ids)
+
+
+def _filho_alterado(mapper, connection, target):
+    _marcar(Session.object_session(target), "imoveis_filhos_alterados", [target.imovel_id])
+
+
+def _imovel_alterado(mapper, connection, target):
+    _marcar(Session.object_session(target), "imoveis_alterados", [target.id])
+
+
+for _filho in FILHOS_IMOVEL:
+    for _evento in ("after_insert", "after_update", "after_delete"):
+        event.listen(_filho, _evento, _filho_alterado)
+
+for _evento in ("after_update", "after_delete"):
+    event.listen(Imovel, _evento, _imovel_alterado)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _subir_versao_apos_flush(sessao, contexto):
+    _subir_versao(sessao, sessao.info.pop("imoveis_filhos_alterados", set()))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _insert_de_filhos_em_lote(estado):
+    """insert(Filho) não passa pelos eventos de mapper: subir a versão pelos imovel_id dos parâmetros"""
+    if not estado.is_insert or estado.bind_mapper is None or estado.bind_mapper.class_ not in FILHOS_IMOVEL:
+        return None
+    parametros = estado.parameters if isinstance(estado.parameters, list) else [estado.parameters or {}]
+    resultado = estado.invoke_statement()
+    _subir_versao(estado.session, {valores.get("imovel_id") for valores in parametros} - {None})
+    return resultado
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_versoes(sessao):
+    for imovel_id in sessao.info.pop("imoveis_alterados", ()):
+        cache_versoes.remover(imovel_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_alterados(sessao):
+    sessao.info.pop("imoveis_alterados", None)
+    sessao.info.pop("imoveis_filhos_alterados", None)
@@ -0,0 +1,154 @@
+"""ZIP em streaming com os PDFs de IPTU de todas as unidades
+
+Os PDFs são renderizados em paralelo no pool de PDFs (services/pdf_iptu) e
+cada um entra no ZIP assim que fica pronto. Só uma janela de PDFs fica em
+memória por vez e o arquivo nunca é montado inteiro: memória de pico e
+tempo até o primeiro byte não crescem com o tamanho da carteira.
+"""
+import asyncio
+import os
+import re
+import time
+import zipfile
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select
+
+from config.db import nova_sessao_async
+from models.contratos import Imovel, ImovelUnidade
+from services.executor import ExecutorSobrecarregado
+from services.pdf_iptu import (
+    cache_pdf, chave_pdf, executor_pdf, formatar_endereco, montar_dados_pdf, renderizar_pdf_iptu
+)
+from services.rateio import distribuir_iptu
+
+# Imóveis carregados por consulta
+ZIP_LOTE_CONSULTA = 200
+
+
+class ItemZip(NamedTuple):
+    """Imóvel a incluir no ZIP (mesmos campos de IPTULoteItem)"""
+    imovel_id: int
+    valor_total_iptu: float
+    desconto_cota_unica: Optional[float] = 0.0
+
+
+class _SaidaZip:
+    """Destino não-seekable do ZipFile: acumula bytes até serem drenados para a resposta"""
+
+    def __init__(self):
+        self._partes: List[bytes] = []
+
+    def write(self, dados) -> int:
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self) -> None:
+        pass
+
+    def drenar(self) -> bytes:
+        dados = b"".join(self._partes)
+        self._partes.clear()
+        return dados
+
+
+def _nome_arquivo(imovel_id: int, unidade: Dict) -> str:
+    nome = re.sub(r"[^A-Za-z0-9._-]+", "_", unidade["nome_unidade"]).strip("_") or "unidade"
+    return f"imovel_{imovel_id}/unidade_{unidade['unidade_id']}_{nome}.pdf"
+
+
+def _nome_unico(nome: str, usados: Set[str]) -> str:
+    """Mesmo nome duas vezes (ex.: imóvel repetido nos itens) vira nome_2.pdf, nome_3.pdf..."""
+    candidato, base, extensao, n = nome, *os.path.splitext(nome), 2
+    while candidato in usados:
+        candidato, n = f"{base}_{n}{extensao}", n + 1
+    usados.add(candidato)
+    return candidato
+
+
+async def _pdfs_a_gerar(db, itens: Sequence) -> AsyncIterator[Tuple[str, Dict]]:
+    """(nome no ZIP, dados do PDF) de cada unidade, lendo os imóveis em blocos"""
+    for inicio in range(0, len(itens), ZIP_LOTE_CONSULTA):
+        bloco = itens[inicio:inicio + ZIP_LOTE_CONSULTA]
+        consulta = (
+            select(
+                Imovel.id, Imovel.rua, Imovel.numero, Imovel.bairro, Imovel.municipio, Imovel.estado,
+                ImovelUnidade.id, ImovelUnidade.nome_unidade, ImovelUnidade.area_m2,
+            )
+            .join(ImovelUnidade, ImovelUnidade.imovel_id == Imovel.id)
+            .where(Imovel.id.in_({item.imovel_id for item in bloco}))
+            .order_by(Imovel.id, ImovelUnidade.id)
+        )
+        enderecos: Dict[int, str] = {}
+        unidades: Dict[int, List[Dict]] = {}
+        for imovel_id, rua, numero, bairro, municipio, estado, unidade_id, nome, area in (await db.execute(consulta)).all():
+            enderecos[imovel_id] = formatar_endereco(rua, numero, bairro, municipio, estado)
+            unidades.setdefault(imovel_id, []).append({"unidade_id": unidade_id, "nome_unidade": nome, "area_m2": area})
+
+        for item in bloco:
+            lista = unidades.get(item.imovel_id, [])
+            desconto = item.desconto_cota_unica or 0.0
+            rateio = {
+                d["unidade_id"]: d
+                for d in distribuir_iptu([u for u in lista if u["area_m2"] and u["area_m2"] > 0], item.valor_total_iptu, desconto)
+            }
+            for unidade in lista:
+                dados = montar_dados_pdf(
+                    enderecos[item.imovel_id], unidade, rateio.get(unidade["unidade_id"]), item.valor_total_iptu, desconto
+                )
+                yield _nome_arquivo(item.imovel_id, unidade), dados
+
+
+async def _renderizar(dados: Dict) -> bytes:
+    """Como obter_pdf_iptu, mas espera vaga no pool em vez de falhar (o stream já começou)"""
+    chave = chave_pdf(dados)
+    conteudo = await cache_pdf.obter(chave)
+    if conteudo is not None:
+        return conteudo
+    while True:
+        try:
+            conteudo = await executor_pdf.executar(renderizar_pdf_iptu, dados)
+            break
+        except ExecutorSobrecarregado:
+            await asyncio.sleep(0.05)
+    await cache_pdf.guardar(chave, conteudo)
+    return conteudo
+
+
+async def stream_zip_iptu(itens: Sequence) -> AsyncIterator[bytes]:
+    """Gera o ZIP em pedaços; itens: objetos com imovel_id, valor_total_iptu e desconto_cota_unica"""
+    saida = _SaidaZip()
+    data_hora = time.localtime()[:6]
+    # no máximo dois PDFs por processo do pool em voo por resposta
+    janela = max(1, executor_pdf.workers * 2)
+    pendentes = {}
+    usados: Set[str] = set()
+
+    with zipfile.ZipFile(saida, mode="w", compression=zipfile.ZIP_STORED) as arquivo_zip:
+
+        def gravar(tarefa):
+            info = zipfile.ZipInfo(pendentes.pop(tarefa), date_time=data_hora)
+            arquivo_zip.writestr(info, tarefa.result())
+
+        try:
+            async with nova_sessao_async() as db:
+                async for nome, dados in _pdfs_a_gerar(db, itens):
+                    pendentes[asyncio.ensure_future(_renderizar(dados))] = _nome_unico(nome, usados)
+                    if len(pendentes) < janela:
+                        continue
+                    prontas, _ = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+                    for tarefa in prontas:
+                        gravar(tarefa)
+                    yield saida.drenar()
+
+            while pendentes:
+                prontas, _ = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+                for tarefa in prontas:
+                    gravar(tarefa)
+                yield saida.drenar()
+        finally:
+            # cliente desconectou ou erro: não deixar renderizações órfãs
+            for tarefa in pendentes:
+                tarefa.cancel()
+
+    yield saida.drenar()
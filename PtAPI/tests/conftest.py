@@ -0,0 +1,11 @@
+"""Banco SQLite descartável para os testes (antes de qualquer import do projeto)"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+_diretorio = tempfile.mkdtemp(prefix="ptapi-testes-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_diretorio, 'testes.db')}"
+os.environ["RATE_LIMIT_ATIVO"] = "false"
+os.environ.pop("DATABASE_REPLICA_URLS", None)
@@ -0,0 +1,84 @@
+"""GET /clientes: número de consultas fixo, qualquer que seja o tamanho da página"""
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config.auth import obter_usuario_atual
+from config.db import SessionLocal, criar_tabelas
+from main import create_app
+from models.cliente import ClienteFisica, ClienteJuridica
+from models.socio import SocioRepresentante
+
+INCLUDES = "participacoes,socios_representantes"
+
+
+@pytest.fixture(scope="module")
+def cliente():
+    criar_tabelas()
+    with SessionLocal() as sessao:
+        pessoas = [
+            ClienteFisica(
+                nome=f"Pessoa {n}", email=f"pf{n}@exemplo.com", senha="x", telefone="1", endereco="Rua A",
+                cpf=f"{n:011d}", rg=f"rg{n}", data_de_nascimento=date(1990, 1, 1),
+            )
+            for n in range(30)
+        ]
+        empresas = [
+            ClienteJuridica(
+                nome=f"Empresa {n}", email=f"pj{n}@exemplo.com", senha="x", telefone="1", endereco="Rua B",
+                cnpj=f"{n:014d}", razao_social=f"Empresa {n} Ltda", nome_fantasia=f"Empresa {n}",
+                endereco_comercial="Rua B",
+            )
+            for n in range(30)
+        ]
+        # PF e PJ alternados: toda página tem os dois tipos
+        for pessoa, empresa in zip(pessoas, empresas):
+            sessao.add_all([pessoa, empresa])
+        sessao.flush()
+        # Dois sócios por empresa: os dois lados do relacionamento têm linhas
+        for n, empresa in enumerate(empresas):
+            for pessoa in (pessoas[n], pessoas[(n + 1) % len(pessoas)]):
+                sessao.add(SocioRepresentante(empresa_id=empresa.id, pessoa_fisica_id=pessoa.id, cargo="socio"))
+        sessao.commit()
+
+    aplicacao = create_app()
+    aplicacao.dependency_overrides[obter_usuario_atual] = lambda: None
+    with TestClient(aplicacao) as cliente:
+        yield cliente
+
+
+def _consultas(cliente: TestClient, url: str):
+    contagem = []
+
+    def contar(*args):
+        contagem.append(1)
+
+    event.listen(Engine, "before_cursor_execute", contar)
+    try:
+        resposta = cliente.get(url)
+    finally:
+        event.remove(Engine, "before_cursor_execute", contar)
+    assert resposta.status_code == 200, resposta.text
+    return len(contagem), resposta.json()
+
+
+def test_consultas_nao_crescem_com_o_limit(cliente):
+    cliente.get("/clientes/?limit=1")  # engine assíncrono criado fora da contagem
+
+    pequena, itens_pequena = _consultas(cliente, f"/clientes/?limit=5&include={INCLUDES}")
+    grande, itens_grande = _consultas(cliente, f"/clientes/?limit=60&include={INCLUDES}")
+
+    assert len(itens_pequena) == 5 and len(itens_grande) == 60
+    assert pequena == grande == 3  # página + um SELECT ... IN por relacionamento
+    assert all(len(item["socios_representantes"]) == 2 for item in itens_grande if item["tipo"] == "juridica")
+    assert sum(len(item["participacoes"]) for item in itens_grande if item["tipo"] == "fisica") == 60
+
+
+def test_sem_include_uma_consulta(cliente):
+    consultas, itens = _consultas(cliente, "/clientes/?limit=60")
+
+    assert consultas == 1
+    assert {item["tipo"] for item in itens} == {"fisica", "juridica"}
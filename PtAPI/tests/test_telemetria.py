@@ -0,0 +1,48 @@
+"""Telemetria: consultas que falham entram na conta e não deixam estado na conexão"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from config.db import criar_tabelas, obter_engine
+from main import create_app
+from services.telemetria import telemetria
+
+ROTA = "POST /auth/CadastroUsuarios"
+USUARIO = {
+    "nome": "Joao Silva", "senha": "Senha123!", "email": "telemetria@exemplo.com",
+    "cpf": "52998224725", "rg": "TL123456", "data_de_nascimento": "1990-01-15",
+}
+
+
+@pytest.fixture(scope="module")
+def cliente():
+    criar_tabelas()
+    with TestClient(create_app()) as cliente:
+        yield cliente
+
+
+def _consultas_da_rota():
+    consultas = telemetria.snapshot()["rotas"].get(ROTA, {}).get("consultas", {})
+    return consultas.get("total", 0), consultas.get("soma", 0)
+
+
+def test_insert_duplicado_e_contado_sem_sobras_na_conexao(cliente):
+    devolvidas = []
+
+    def ao_devolver(dbapi_conn, registro):
+        devolvidas.append(dict(registro.info))
+
+    engine = obter_engine()
+    event.listen(engine, "checkin", ao_devolver)
+    try:
+        assert cliente.post("/auth/CadastroUsuarios", json=USUARIO).status_code == 201
+        total_antes, soma_antes = _consultas_da_rota()
+        assert cliente.post("/auth/CadastroUsuarios", json=USUARIO).status_code == 400
+    finally:
+        event.remove(engine, "checkin", ao_devolver)
+
+    total, soma = _consultas_da_rota()
+    assert total == total_antes + 1
+    assert soma == soma_antes + 1  # o INSERT que violou o índice único
+    assert devolvidas
+    assert not any("_telemetria_inicio" in info for info in devolvidas)